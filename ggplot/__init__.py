@@ -19,7 +19,7 @@ _set_mpl_backend()
 __version__ = '0.4.7'
 
 from .ggplot import *
-from .components import aes
+from .components import aes, chunked_data
 from .geoms import *
 from .scales import *
 from .themes import *
@@ -1,27 +1,36 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from .aes import aes
+from .stream import chunked_data
 from . import colors, shapes, size, linestyles
 
 
 def assign_visual_mapping(data, aes, gg):
-    """Assigns the visual mapping to the given data and adds the right legend
+    """Computes the visual mapping for the given data and adds the right legend
+
+    The data is not changed, the visual values are returned in a separate
+    table.
 
     Parameters
     ----------
     data : DataFrame
-        dataframe which should have shapes assigned to
+        dataframe which should have the visual values assigned to
     aes : aesthetic
         mapping, visual value to variable
     gg : ggplot object, which holds information and gets a legend assigned
 
     Returns
     -------
-    data : DataFrame
-        the changed dataframe with visual values added
+    visual : dict
+        {aes: array} with one visual value (color, size, line style or
+        marker) per row of data; only mapped aes are included
     """
-    data = colors.assign_colors(data, aes, gg)
-    data = size.assign_sizes(data, aes, gg)
-    data = linestyles.assign_linestyles(data, aes, gg)
-    data = shapes.assign_shapes(data, aes, gg)
-    return data
+    visual = {}
+    for ae, assign in [("color", colors.assign_colors),
+                       ("size", size.assign_sizes),
+                       ("linestyle", linestyles.assign_linestyles),
+                       ("shape", shapes.assign_shapes)]:
+        values = assign(data, aes, gg)
+        if values is not None:
+            visual[ae] = values
+    return visual
@@ -0,0 +1,196 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+import numpy as np
+
+
+def bin_edges(x, binwidth=None, bins=30):
+    """Returns the bin edges for the values x
+
+    Parameters
+    ----------
+    x : ndarray
+        the (float) values, non-finite values are ignored
+    binwidth : float
+        the width of the bins, starting at the minimum of x
+    bins : int or str
+        the number of bins or a rule ("fd" or "sturges"); used if
+        binwidth is None
+
+    Returns
+    -------
+    edges : ndarray
+        the bin edges, ascending
+    """
+    x = x[np.isfinite(x)]
+    if not len(x):
+        return np.array([0., 1.])
+    bottom, top = x.min(), x.max()
+    if binwidth is None and bins == "fd":
+        q25, q75 = np.percentile(x, [25, 75])
+        binwidth = 2 * (q75 - q25) * len(x) ** (-1. / 3)
+        if binwidth <= 0:
+            bins = "sturges"
+    if bins == "sturges":
+        bins = int(np.ceil(np.log2(len(x)))) + 1
+    if binwidth:
+        binwidth = float(binwidth)
+        return np.arange(bottom, top + binwidth, binwidth)
+    if bottom == top:
+        bottom, top = bottom - 0.5, top + 0.5
+    return np.linspace(bottom, top, int(bins) + 1)
+
+
+def bin_counts(values, edges, weights=None):
+    """Counts the values of several groups in the same bins
+
+    All groups are counted in one searchsorted and one np.bincount call on
+    the combined (group, bin) index. The last bin includes its right edge,
+    values outside of the edges are not counted.
+
+    Parameters
+    ----------
+    values : list of ndarray
+        the values of each group
+    edges : ndarray
+        the ascending bin edges
+    weights : list
+        the weights of each group (or None for counts)
+
+    Returns
+    -------
+    counts : ndarray
+        (groups x bins) array of the counts (or summed weights)
+    """
+    n_bins = len(edges) - 1
+    n_groups = len(values)
+    if not n_groups:
+        return np.zeros((0, n_bins))
+    lengths = [len(x) for x in values]
+    x = np.concatenate(values)
+    group = np.repeat(np.arange(n_groups), lengths)
+    if weights is None or all(w is None for w in weights):
+        weights = None
+    else:
+        weights = np.concatenate([np.ones(n) if w is None
+                                  else np.asarray(w, dtype=float)
+                                  for w, n in zip(weights, lengths)])
+    bins = bin_index(x, edges)
+    valid = bins >= 0
+    codes = group[valid] * n_bins + bins[valid]
+    if weights is not None:
+        weights = weights[valid]
+    counts = np.bincount(codes, weights, minlength=n_groups * n_bins)
+    return counts.reshape(n_groups, n_bins)
+
+
+def bin_index(x, edges):
+    """Returns the bin of each value
+
+    The last bin includes its right edge; values outside of the edges (and
+    nan) get -1.
+    """
+    n_bins = len(edges) - 1
+    bins = np.searchsorted(edges, x, side="right") - 1
+    bins[x == edges[-1]] = n_bins - 1
+    bins[bins >= n_bins] = -1
+    return bins
+
+
+def hex_index(x, y, xlim, ylim, n_x):
+    """Returns the hexagon of each point of a hexagonal grid
+
+    The grid is the one of matplotlib's hexbin: n_x hexagons wide, the
+    centers lie on two interleaved rectangular lattices, and each point
+    belongs to the nearer of its two candidate centers (in units where the
+    hexagons are regular).
+
+    Parameters
+    ----------
+    x, y : ndarray
+        the (float) coordinates
+    xlim, ylim : tuple
+        (min, max) of the grid
+    n_x : int
+        the number of hexagons in x direction
+
+    Returns
+    -------
+    codes : ndarray
+        the hexagon of each point, -1 for non-finite points
+    centers : ndarray
+        (n, 2) array of the centers of all hexagons
+    size : tuple
+        (width, height) of the lattice cells
+    """
+    n_y = max(int(n_x / np.sqrt(3)), 1)
+    width = (xlim[1] - xlim[0]) / n_x or 1.
+    height = (ylim[1] - ylim[0]) / n_y or 1.
+    ix = (x - xlim[0]) / width
+    iy = (y - ylim[0]) / height
+    valid = np.isfinite(ix) & np.isfinite(iy)
+    ix = np.where(valid, ix, 0)
+    iy = np.where(valid, iy, 0)
+    # first lattice: the grid points, second one: the cell centers
+    ix1, iy1 = np.round(ix), np.round(iy)
+    ix2, iy2 = np.floor(ix), np.floor(iy)
+    d1 = (ix - ix1) ** 2 + 3 * (iy - iy1) ** 2
+    d2 = (ix - ix2 - .5) ** 2 + 3 * (iy - iy2 - .5) ** 2
+    n_x1, n_y1 = n_x + 1, n_y + 1
+    ix1 = np.clip(ix1, 0, n_x1 - 1).astype(np.intp)
+    iy1 = np.clip(iy1, 0, n_y1 - 1).astype(np.intp)
+    ix2 = np.clip(ix2, 0, n_x - 1).astype(np.intp)
+    iy2 = np.clip(iy2, 0, n_y - 1).astype(np.intp)
+    codes = np.where(d1 < d2, ix1 * n_y1 + iy1,
+                     n_x1 * n_y1 + ix2 * n_y + iy2)
+    codes[~valid] = -1
+
+    gx1, gy1 = np.meshgrid(np.arange(n_x1), np.arange(n_y1), indexing="ij")
+    gx2, gy2 = np.meshgrid(np.arange(n_x) + .5, np.arange(n_y) + .5,
+                           indexing="ij")
+    centers = np.column_stack([np.concatenate([gx1.ravel(), gx2.ravel()]),
+                               np.concatenate([gy1.ravel(), gy2.ravel()])])
+    centers = centers * [width, height] + [xlim[0], ylim[0]]
+    return codes, centers, (width, height)
+
+
+def summarize(codes, n, weights=None, z=None, fun="count"):
+    """Summarizes the values per bin with bincounts
+
+    Parameters
+    ----------
+    codes : ndarray
+        the bin of each row, rows with a negative code are left out
+    n : int
+        the number of bins
+    weights : ndarray
+        weight of each row or None
+    z : ndarray
+        the values to summarize for "sum" and "mean"
+    fun : str
+        "count" (the summed weights), "sum" (the weighted sum of z) or
+        "mean" (the weighted mean of z, nan for empty bins)
+
+    Returns
+    -------
+    values : ndarray
+        the result per bin
+    """
+    valid = codes >= 0
+    codes = codes[valid]
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)[valid]
+    if fun == "count":
+        return np.bincount(codes, weights, minlength=n)
+    if z is None:
+        raise Exception("'%s' needs the z aes" % fun)
+    z = np.asarray(z, dtype=float)[valid]
+    zw = z if weights is None else z * weights
+    sums = np.bincount(codes, zw, minlength=n)
+    if fun == "sum":
+        return sums
+    if fun == "mean":
+        counts = np.bincount(codes, weights, minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+    raise Exception("Unknown summary '%s', use 'count', 'sum' or 'mean'"
+                    % fun)
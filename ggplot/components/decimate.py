@@ -0,0 +1,111 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+import numpy as np
+
+
+def decimate(x, ys, n_columns, offsets=None, method="minmax"):
+    """Returns the rows of a line which are needed at a given resolution
+
+    Parameters
+    ----------
+    x : ndarray
+        the (float) x values, ascending within each group
+    ys : list of ndarray
+        the y values; "minmax" keeps the envelope of each of them, "lttb"
+        uses their mean
+    n_columns : int
+        the width of the output in pixels
+    offsets : ndarray
+        the rows of group i are offsets[i]:offsets[i + 1] (default: a
+        single group)
+    method : str
+        "minmax" or "lttb" (see minmax_indices() and lttb_indices())
+
+    Returns
+    -------
+    rows : ndarray
+        the ascending indices of the kept rows
+    offsets : ndarray
+        the offsets of the groups in the kept rows
+    """
+    if offsets is None:
+        offsets = np.array([0, len(x)])
+    if method == "minmax":
+        rows = minmax_indices(x, ys, n_columns, offsets)
+    elif method == "lttb":
+        y = np.mean(ys, axis=0)
+        # two vertices per pixel, like minmax
+        rows = np.concatenate([
+            start + lttb_indices(x[start:end], y[start:end], 2 * n_columns)
+            for start, end in zip(offsets[:-1], offsets[1:])] or [[]])
+        rows = rows.astype(np.intp)
+    else:
+        raise Exception("Unknown decimation '%s', use 'minmax' or 'lttb'"
+                        % method)
+    return rows, np.searchsorted(rows, offsets)
+
+
+def minmax_indices(x, ys, n_columns, offsets):
+    """Keeps the first, last, lowest and highest row per pixel column
+
+    The x range of all rows is split into n_columns columns. Within each
+    column (and group), the first and the last row keep the line connected
+    and the minimum and maximum of each y keep its envelope, so at most
+    2 + 2 * len(ys) rows per column and group remain.
+    """
+    n = len(x)
+    if n == 0:
+        return np.zeros(0, dtype=np.intp)
+    finite = x[np.isfinite(x)]
+    low, high = (finite.min(), finite.max()) if len(finite) else (0., 1.)
+    scale = n_columns / (high - low) if high > low else 0.
+    columns = np.clip(np.nan_to_num((x - low) * scale), 0,
+                      n_columns - 1).astype(np.int64)
+    group = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    keys = group * n_columns + columns
+    # x is ascending in each group, so each key is a contiguous block
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+    ends = np.append(starts[1:], n) - 1
+    keep = [starts, ends]
+    for y in ys:
+        # sorted by key, then by y: the first and last of a block are the
+        # lowest and the highest row
+        order = np.lexsort((y, keys))
+        keep.append(order[starts])
+        keep.append(order[ends])
+    return np.unique(np.concatenate(keep))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and the last point and one point per bucket of the
+    ones in between: the one forming the largest triangle with the point
+    kept in the previous bucket and the mean of the next bucket.
+
+    Returns
+    -------
+    rows : ndarray
+        the ascending indices of the n_out kept points (all points if
+        there are not more than n_out)
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    # bucket boundaries of the n - 2 inner points
+    bounds = (np.linspace(0, n - 2, n_out - 1) + 1).astype(np.intp)
+    rows = np.zeros(n_out, dtype=np.intp)
+    rows[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_start, next_end = end, bounds[i + 2] if i + 2 < len(bounds) else n
+        next_end = max(next_end, next_start + 1)
+        mean_x = x[next_start:next_end].mean()
+        mean_y = y[next_start:next_end].mean()
+        px, py = x[previous], y[previous]
+        area = np.abs((px - mean_x) * (y[start:end] - py) -
+                      (px - x[start:end]) * (mean_y - py))
+        previous = start + int(np.argmax(area))
+        rows[i + 1] = previous
+    return rows
@@ -0,0 +1,139 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+import numpy as np
+import six
+
+
+def bandwidth(x, rule="scott", weights=None):
+    """Returns the bandwidth of a gaussian kernel density estimate
+
+    Parameters
+    ----------
+    x : ndarray
+        the (finite) values
+    rule : str or float
+        "scott" or "silverman" (the rules of scipy.stats.gaussian_kde,
+        based on the standard deviation of x), or the bandwidth itself
+    weights : ndarray
+        weight of each value or None
+
+    Returns
+    -------
+    bw : float
+        the standard deviation of the kernel
+    """
+    if not isinstance(rule, six.string_types):
+        return float(rule)
+    if weights is None:
+        weights = np.ones(len(x))
+    weights = np.asarray(weights, dtype=float)
+    total = weights.sum()
+    squares = np.dot(weights, weights)
+    mean = np.dot(weights, x) / total
+    # the unbiased (weighted) variance, like np.cov
+    denominator = total - squares / total
+    if denominator > 0:
+        std = np.sqrt(np.dot(weights, (x - mean) ** 2) / denominator)
+    else:
+        std = 0
+    # the effective number of values
+    n_eff = total ** 2 / squares
+    if rule == "scott":
+        factor = n_eff ** (-1. / 5)
+    elif rule == "silverman":
+        factor = (n_eff * 3 / 4.) ** (-1. / 5)
+    else:
+        raise Exception("Unknown bandwidth rule '%s', use 'scott', "
+                        "'silverman' or a number" % rule)
+    if std == 0:
+        # a single value: any positive width works
+        std = abs(mean) or 1.
+    return std * factor
+
+
+def kde_exact(x, grid, bw, weights=None, chunk_size=1000000):
+    """Gaussian kernel density estimate, evaluated exactly at each grid point
+
+    Takes O(n * m) for n values and m grid points; the pairwise
+    differences are computed for blocks of at most chunk_size pairs.
+    Parameters and result are those of kde_fft(), but the grid does not
+    need to be even.
+    """
+    x = np.asarray(x, dtype=float)
+    grid = np.asarray(grid, dtype=float)
+    if weights is None:
+        weights = np.ones(len(x))
+    weights = np.asarray(weights, dtype=float)
+    total = weights.sum()
+    result = np.zeros(len(grid))
+    if total <= 0:
+        return result
+    step = max(chunk_size // max(len(x), 1), 1)
+    for start in range(0, len(grid), step):
+        diff = (grid[start:start + step, None] - x[None, :]) / bw
+        result[start:start + step] = np.dot(np.exp(-0.5 * diff ** 2), weights)
+    return result / (total * bw * np.sqrt(2 * np.pi))
+
+
+def kde_fft(x, grid, bw, weights=None):
+    """Gaussian kernel density estimate on an even grid
+
+    The values are distributed linearly onto the grid points (two
+    bincounts) and convolved with the sampled kernel by FFT, which takes
+    O(n + m log m) for n values and m grid points instead of the O(n * m)
+    of an exact evaluation. The error is small as long as the grid spacing
+    is below the bandwidth. For a smaller bandwidth, the sampled kernel is
+    normalized, so the density still integrates to one: it is then the
+    density at the resolution of the grid.
+
+    Parameters
+    ----------
+    x : ndarray
+        the values
+    grid : ndarray
+        evenly spaced, ascending points at which the density is returned;
+        values outside of the grid are counted at the nearest end
+    bw : float
+        the bandwidth (standard deviation of the kernel)
+    weights : ndarray
+        weight of each value or None
+
+    Returns
+    -------
+    density : ndarray
+        the density at each grid point
+    """
+    x = np.asarray(x, dtype=float)
+    m = len(grid)
+    if weights is None:
+        weights = np.ones(len(x))
+    weights = np.asarray(weights, dtype=float)
+    total = weights.sum()
+    if m < 2 or total <= 0:
+        return np.zeros(m)
+    delta = (grid[-1] - grid[0]) / (m - 1)
+    if delta <= 0:
+        return kde_exact(x, grid, bw, weights)
+
+    # linear binning: each value is split between its two grid points
+    pos = np.clip((x - grid[0]) / delta, 0, m - 1)
+    left = np.minimum(np.floor(pos).astype(np.intp), m - 2)
+    frac = pos - left
+    counts = (np.bincount(left, weights * (1 - frac), minlength=m) +
+              np.bincount(left + 1, weights * frac, minlength=m))
+
+    # the kernel is negligible beyond 5 bandwidths; at least one sample on
+    # each side of the center
+    n_kernel = int(min(m - 1, max(np.ceil(5 * bw / delta), 1)))
+    offsets = np.arange(-n_kernel, n_kernel + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2)
+    # normalized on the grid: for a bandwidth below the grid spacing, the
+    # samples are far off the integral of the kernel
+    kernel /= kernel.sum() * delta
+
+    # zero padded, so the circular convolution is a linear one
+    size = 1 << int(np.ceil(np.log2(m + 2 * n_kernel + 1)))
+    density = np.fft.irfft(np.fft.rfft(counts, size) *
+                           np.fft.rfft(kernel, size), size)
+    density = density[n_kernel:n_kernel + m]
+    return np.maximum(density, 0) / total
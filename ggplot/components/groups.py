@@ -0,0 +1,88 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+import numpy as np
+import pandas as pd
+
+
+def factorize(values):
+    """Converts values to integer codes
+
+    Parameters
+    ----------
+    values : array-like
+        the values to encode
+
+    Returns
+    -------
+    codes : ndarray
+        the code of each value; missing values get the code -1
+    levels : array-like
+        the sorted unique values, levels[code] is the original value
+    """
+    codes, levels = pd.factorize(values, sort=True)
+    return codes, levels
+
+
+def combine_codes(codes, sizes, n_rows):
+    """Combines several code arrays into one key per row
+
+    The combined keys are ordered like the tuples of the single codes, so
+    sorting by the key is the same as sorting by all codes.
+
+    Parameters
+    ----------
+    codes : list of ndarray
+        code arrays as returned by factorize
+    sizes : list of int
+        the number of levels for each code array
+    n_rows : int
+        number of rows (needed if codes is empty)
+
+    Returns
+    -------
+    keys : ndarray
+        the combined key of each row; -1 if any of the codes is missing
+    n_keys : int
+        the number of possible keys
+    """
+    keys = np.zeros(n_rows, dtype=np.int64)
+    missing = np.zeros(n_rows, dtype=bool)
+    n_keys = 1
+    for _codes, size in zip(codes, sizes):
+        missing |= _codes < 0
+        keys = keys * size + _codes
+        n_keys *= size
+    keys[missing] = -1
+    return keys, n_keys
+
+
+def sorted_groups(keys):
+    """Sorts the rows once so that each group is a contiguous slice
+
+    Parameters
+    ----------
+    keys : ndarray
+        integer group key per row, as returned by combine_codes; rows with
+        a negative key are left out
+
+    Returns
+    -------
+    order : ndarray
+        row order which makes all groups contiguous
+    offsets : ndarray
+        group i consists of the rows order[offsets[i]:offsets[i + 1]]
+    group_keys : ndarray
+        the (ascending) key of each group
+    """
+    # stable, so the rows keep their order within a group
+    order = np.argsort(keys, kind="mergesort")
+    sorted_keys = keys[order]
+    first = np.searchsorted(sorted_keys, 0)
+    order = order[first:]
+    sorted_keys = sorted_keys[first:]
+    if len(order) == 0:
+        return order, np.zeros(1, dtype=np.int64), sorted_keys
+    starts = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+    starts = np.concatenate([[0], starts])
+    offsets = np.append(starts, len(order))
+    return order, offsets, sorted_keys[starts]
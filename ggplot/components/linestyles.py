@@ -42,8 +42,8 @@ def assign_linestyles(data, aes, gg):
 
     Returns
     -------
-    data : DataFrame
-        the changed dataframe
+    linestyle_mapping : ndarray or None
+        the line style of each row, None if linestyle is not mapped
     """
 
     if 'linestyle' in aes:
@@ -51,7 +51,5 @@ def assign_linestyles(data, aes, gg):
         possible_linestyles = np.unique(data[linestyle_col])
         linestyle = line_gen()
         linestyle_mapping = dict((value, six.next(linestyle)) for value in possible_linestyles)
-        data['linestyle_mapping'] = data[linestyle_col].apply(lambda x: linestyle_mapping[x])
         gg.add_to_legend('linestyle', dict((v, k) for k, v in linestyle_mapping.items()))
-
-    return data
+        return data[linestyle_col].map(linestyle_mapping).values
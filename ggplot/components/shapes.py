@@ -37,8 +37,8 @@ def assign_shapes(data, aes, gg):
 
     Returns
     -------
-    data : DataFrame
-        the changed dataframe
+    shape_mapping : ndarray or None
+        the marker of each row, None if shape is not mapped
     """
     if 'shape' in aes:
         shape_col = aes['shape']
@@ -46,6 +46,5 @@ def assign_shapes(data, aes, gg):
         shape = shape_gen()
         # marker in matplotlib are not unicode ready in 1.3.1 :-( -> use explicit str()...
         shape_mapping = dict((value, str(six.next(shape))) for value in possible_shapes)
-        data['shape_mapping'] = data[shape_col].apply(lambda x: shape_mapping[x])
         gg.add_to_legend("marker", dict((v, k) for k, v in shape_mapping.items()))
-    return data
+        return data[shape_col].map(shape_mapping).values
@@ -18,19 +18,18 @@ def assign_sizes(data, aes, gg):
 
     Returns
     -------
-    data : DataFrame
-        the changed dataframe
+    size_mapping : ndarray or None
+        the size of each row, None if size is not mapped
     """
     # We need to normalize size so that the points aren't really big or
     # really small.
     # TODO: add different types of normalization (log, inverse, etc.)
     if 'size' in aes:
         size_col = aes['size']
-        data["size_mapping"] = data[size_col].astype(np.float)
-        data["size_mapping"] = 200.0 * \
-                                  (data[size_col] - data[size_col].min() + .15) / \
-                                  (data[size_col].max() - data[size_col].min())
-        labels = np.percentile(data[size_col], [5, 25, 50, 75, 95])
-        quantiles = np.percentile(data["size_mapping"], [5, 25, 50, 75, 95])
+        values = data[size_col].values.astype(float)
+        size_mapping = 200.0 * (values - values.min() + .15) / \
+                               (values.max() - values.min())
+        labels = np.percentile(values, [5, 25, 50, 75, 95])
+        quantiles = np.percentile(size_mapping, [5, 25, 50, 75, 95])
         gg.add_to_legend("size", dict(zip(quantiles, labels)))
-    return data
+        return size_mapping
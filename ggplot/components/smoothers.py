@@ -1,8 +1,8 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 import numpy as np
-from pandas.lib import Timestamp
 import pandas as pd
+from pandas import Timestamp
 import statsmodels.api as sm
 from statsmodels.nonparametric.smoothers_lowess import lowess as smlowess
 from statsmodels.sandbox.regression.predstd import wls_prediction_std
@@ -59,8 +59,18 @@ def lowess(x, y, span=SPAN):
     y2 = pd.Series(upper * std +  y).tolist()
     return (y, y1, y2)
 
-def mavg(x,y, window):
-    "compute moving average"
+def mavg(x,y, window, weights=None):
+    """compute moving average
+
+    With weights, each y is the mean of weights rows (e.g. of a bin of
+    chunked data) and the window is a number of rows, not of values: the
+    mean of each value is taken over the fewest preceding values (itself
+    included) which hold at least `window` rows. The standard error then
+    only reflects the spread of these means.
+    """
+    if weights is not None:
+        return _weighted_mavg(np.asarray(y, dtype=float),
+                              np.asarray(weights, dtype=float), window)
     x, y = map(plot_friendly, [x,y])
     if _isdate(x[0]):
         x = np.array([i.toordinal() for i in x])
@@ -69,3 +79,26 @@ def mavg(x,y, window):
     y1 = y - std_err
     y2 = y + std_err
     return (y, y1.tolist(), y2.tolist())
+
+def _weighted_mavg(y, weights, window):
+    def cumsum(values):
+        # the sums before (exclusive) and up to (inclusive) each value
+        total = np.concatenate([[0.], np.cumsum(values)])
+        return total[:-1], total[1:]
+    rows_before, rows = cumsum(weights)
+    sum_before, sums = cumsum(weights * y)
+    sq_before, sqs = cumsum(weights * y * y)
+    # the first value of each window: the last one which leaves at least
+    # window rows, -1 if there are less rows so far
+    first = np.searchsorted(rows_before, rows - window, side="right") - 1
+    valid = first >= 0
+    first = np.maximum(first, 0)
+    n = rows - rows_before[first]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (sums - sum_before[first]) / n
+        var = ((sqs - sq_before[first]) / n - mean ** 2) * n / (n - 1)
+    std_err = np.sqrt(np.maximum(var, 0))
+    mean[~valid] = np.nan
+    std_err[~valid] = np.nan
+    y = pd.Series(mean)
+    return (y, (mean - std_err).tolist(), (mean + std_err).tolist())
@@ -0,0 +1,261 @@
+"""Plot data which is read in chunks
+
+The chunks are read exactly once and reduced while they are read: geoms
+which plot a statistic (counts, bins, means) get a mergeable reduction of
+all rows, all other geoms a bounded random sample of the rows.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import six
+
+__ALL__ = ["chunked_data", "count_reducer", "bin_reducer", "sample_reducer"]
+
+
+class chunked_data(object):
+    """Plot data which is given as an iterable of dataframes
+
+    Use this to plot data which does not fit into memory, e.g. the result
+    of `pd.read_csv(..., chunksize=...)`. The chunks are read once, when the
+    plot is built for the first time.
+
+    Parameters
+    ----------
+    chunks : iterable of DataFrames
+        the data; all chunks must have the same columns
+    sample_size : int
+        the maximal number of rows which are kept for geoms which plot
+        each row (geom_point, geom_line, ...)
+    seed : int
+        seed of the random sample
+
+    Examples
+    --------
+    >>> chunks = pd.read_csv("big.csv", chunksize=100000)
+    >>> ggplot(aes(x="price"), chunked_data(chunks)) + geom_histogram()
+    """
+
+    def __init__(self, chunks, sample_size=100000, seed=0):
+        try:
+            self._chunks = iter(chunks)
+        except TypeError:
+            raise Exception("Data must be a DataFrame or an iterable of "
+                            "DataFrames, not %s" % type(chunks).__name__)
+        try:
+            self._first = next(self._chunks)
+        except StopIteration:
+            raise Exception("chunked_data needs at least one chunk")
+        if not isinstance(self._first, pd.DataFrame):
+            raise Exception("The chunks of the data must be DataFrames, not %s"
+                            % type(self._first).__name__)
+        self.columns = self._first.columns
+        self.sample_size = sample_size
+        self.seed = seed
+        self._read = False
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __iter__(self):
+        if self._read:
+            raise Exception("The chunks of the data can only be read once")
+        self._read = True
+        first, self._first = self._first, None
+        return itertools.chain([first], self._chunks)
+
+
+class reducer(object):
+    """Base class of the reductions of chunked data
+
+    A reducer is fed with the (transformed) chunks and merges them into a
+    small result dataframe, which has a column for each string aes.
+
+    Parameters
+    ----------
+    aes : dict
+        the aes mapping of the geom
+    columns : list
+        the columns which are reduced
+    valid_aes : list
+        the aes which are used by the geom; the other columns of aes (e.g.
+        a `y` of the plot, which geom_bar doesn't use) get the first value
+        in the result instead of being used as a group key
+    """
+
+    def __init__(self, aes, columns, valid_aes=None):
+        self.columns = [col for col in columns if col is not None]
+        self.keys, self.other = [], []
+        for ae, name in aes.items():
+            if (not isinstance(name, six.string_types) or
+                    name in self.columns or
+                    name in self.keys or name in self.other):
+                continue
+            if valid_aes is None or ae in valid_aes:
+                self.keys.append(name)
+            else:
+                self.other.append(name)
+        self._first = None
+
+    def update(self, frame):
+        """Adds a chunk (with all columns of aes) to the reduction"""
+        if self._first is None and len(frame):
+            self._first = dict((col, frame[col].iloc[0]) for col in self.other)
+        self._update(frame)
+
+    def result(self):
+        """Returns the reduced data as dataframe"""
+        result = self._result()
+        for col in self.other:
+            result[col] = (self._first or {}).get(col, np.nan)
+        return result
+
+
+class count_reducer(reducer):
+    """Counts the rows per value of `column` (and of the other aes)
+
+    The count (or the sum of `weight`) is the "..count.." column of the
+    result.
+    """
+
+    def __init__(self, aes, column, weight=None, valid_aes=None):
+        super(count_reducer, self).__init__(aes, [column, weight], valid_aes)
+        self.column = column
+        self.weight = weight
+        self._counts = None
+
+    def _update(self, frame):
+        groups = frame.groupby(self.keys + [self.column], sort=False)
+        if self.weight is None:
+            counts = groups.size()
+        else:
+            counts = groups[self.weight].sum()
+        if self._counts is not None:
+            counts = self._counts.add(counts, fill_value=0)
+        self._counts = counts
+
+    def _result(self):
+        if self._counts is None:
+            return pd.DataFrame(columns=self.keys + [self.column, "..count.."])
+        return self._counts.rename("..count..").reset_index()
+
+
+class bin_reducer(reducer):
+    """Counts the rows on a grid of bins over `columns`
+
+    The bins have a width of a power of two, which is doubled (two bins are
+    merged) whenever the values span more than `n_bins` bins, so the result
+    never has more than n_bins bins per column and group. The result holds
+    the bin centers in `columns` and the count (or the sum of `weight`) in
+    "..count..". If `mean` is given, the result also holds the mean of that
+    column per bin (and the count is the number of rows).
+    """
+
+    def __init__(self, aes, columns, mean=None, weight=None, n_bins=1024,
+                 valid_aes=None):
+        super(bin_reducer, self).__init__(aes, list(columns) + [mean, weight],
+                                          valid_aes)
+        self.bin_columns = list(columns)
+        self.mean = mean
+        self.weight = weight
+        self.n_bins = n_bins
+        self._widths = None
+        self._bins = None
+
+    def _update(self, frame):
+        values = [np.asarray(frame[col], dtype=float)
+                  for col in self.bin_columns]
+        if self._widths is None:
+            self._widths = [_bin_width(v, self.n_bins) for v in values]
+        part = pd.DataFrame(dict((col, frame[col].values)
+                                 for col in self.keys),
+                            columns=self.keys)
+        bins = ["..bin%d.." % i for i in range(len(values))]
+        for name, v, width in zip(bins, values, self._widths):
+            v = np.floor(v / width)
+            # inf would never fit into n_bins bins
+            v[~np.isfinite(v)] = np.nan
+            part[name] = v
+        if self.mean is not None:
+            part["..count.."] = 1.0
+            part["..sum.."] = np.asarray(frame[self.mean], dtype=float)
+        elif self.weight is not None:
+            part["..count.."] = np.asarray(frame[self.weight], dtype=float)
+        else:
+            part["..count.."] = 1.0
+        part = part.dropna()
+        if self._bins is not None:
+            part = pd.concat([self._bins, part], ignore_index=True)
+        for i, name in enumerate(bins):
+            if not len(part):
+                break
+            while part[name].max() - part[name].min() >= self.n_bins:
+                self._widths[i] *= 2
+                part[name] = np.floor(part[name] / 2)
+        self._bins = part.groupby(self.keys + bins, sort=False,
+                                  as_index=False).sum()
+
+    def _result(self):
+        columns = self.keys + self.bin_columns
+        if self.mean is not None:
+            columns.append(self.mean)
+        columns.append("..count..")
+        if self._bins is None:
+            return pd.DataFrame(columns=columns)
+        bins = self._bins
+        result = pd.DataFrame(dict((col, bins[col].values)
+                                   for col in self.keys),
+                              columns=self.keys)
+        for i, (col, width) in enumerate(zip(self.bin_columns, self._widths)):
+            result[col] = (bins["..bin%d.." % i].values + 0.5) * width
+        if self.mean is not None:
+            result[self.mean] = (bins["..sum.."] / bins["..count.."]).values
+        result["..count.."] = bins["..count.."].values
+        return result[columns]
+
+
+class sample_reducer(object):
+    """Keeps a uniform random sample of at most `size` rows
+
+    Each row gets a random priority and the rows with the smallest
+    priorities are kept, in the order of the chunks.
+    """
+
+    def __init__(self, columns, size, seed=0):
+        self.columns = list(columns)
+        self.size = size
+        self._random = np.random.RandomState(seed)
+        self._sample = None
+        self._priority = None
+
+    def update(self, frame):
+        frame = pd.DataFrame(frame, columns=self.columns)
+        priority = self._random.random_sample(len(frame))
+        if self._sample is not None:
+            frame = pd.concat([self._sample, frame], ignore_index=True)
+            priority = np.concatenate([self._priority, priority])
+        if len(frame) > self.size:
+            keep = np.sort(np.argpartition(priority, self.size)[:self.size])
+            frame = frame.take(keep)
+            priority = priority[keep]
+        self._sample = frame.reset_index(drop=True)
+        self._priority = priority
+
+    def result(self):
+        if self._sample is None:
+            return pd.DataFrame(columns=self.columns)
+        return self._sample
+
+
+def _bin_width(values, n_bins):
+    """Returns a power of two, so that values span about n_bins bins"""
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return 1.0
+    span = values.max() - values.min()
+    if span <= 0:
+        span = abs(values[0]) or 1.0
+    return 2.0 ** np.floor(np.log2(span / n_bins))
@@ -1,13 +1,13 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-from copy import deepcopy
+from copy import copy
 
 class ggtitle(object):
     def __init__(self, title):
         self.title = title
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         gg.title = self.title
         return gg
 
@@ -16,7 +16,7 @@ class xlab(object):
         self.xlab = xlab
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         gg.xlab = self.xlab
         return gg
 
@@ -25,7 +25,7 @@ class xlim(object):
         self.low, self.high = low, high
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         gg.xlimits = [self.low, self.high]
         return gg
 
@@ -34,7 +34,7 @@ class ylim(object):
         self.low, self.high = low, high
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         gg.ylimits = [self.low, self.high]
         return gg
 
@@ -43,7 +43,7 @@ class ylab(object):
         self.ylab = ylab
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         gg.ylab = self.ylab
         return gg
 
@@ -54,7 +54,7 @@ class labs(object):
         self.title = title
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         if self.x:
             gg.xlab = self.x
         if self.y:
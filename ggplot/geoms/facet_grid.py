@@ -1,7 +1,8 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-from copy import deepcopy
+from copy import copy
 import math
+from ..components.stream import chunked_data
 from ..utils.utils import add_ggplotrc_params
 from .facet_wrap import facet_wrap
 
@@ -16,14 +17,16 @@ class facet_grid(object):
         self.scales = scales
 
     def __radd__(self, gg):
-        x = gg.data.get(self.x)
-        y = gg.data.get(self.y)
+        if isinstance(gg._data, chunked_data):
+            raise Exception("Faceting is not supported for chunked data")
+        x = gg._data.get(self.x)
+        y = gg._data.get(self.y)
 
         if x is None and y is None:
             raise Exception("No facets provided!")
         
-        # only do the deepcopy after the check
-        gg = deepcopy(gg)
+        # only do the copy after the check
+        gg = copy(gg)
 
         if x is None:
             n_dim_x = 1
@@ -1,7 +1,8 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-from copy import deepcopy
+from copy import copy
 import math
+from ..components.stream import chunked_data
 from ..utils.utils import add_ggplotrc_params
 
 class facet_wrap(object):
@@ -16,18 +17,20 @@ class facet_wrap(object):
         self.scales = scales
 
     def __radd__(self, gg):
-        # deepcopy must be the first thing to not change the original object
-        gg = deepcopy(gg)
+        if isinstance(gg._data, chunked_data):
+            raise Exception("Faceting is not supported for chunked data")
+        # copy must be the first thing to not change the original object
+        gg = copy(gg)
         
         x, y = None, None
         gg.n_dim_x = 1
         facets = []
         if self.x:
-            x = gg.data.get(self.x)
+            x = gg._data.get(self.x)
             gg.n_dim_x = x.nunique()
             facets.append(self.x)
         if self.y:
-            y = gg.data.get(self.y)
+            y = gg._data.get(self.y)
             gg.n_dim_x *= y.nunique()
             facets.append(self.y)
 
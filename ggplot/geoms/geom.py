@@ -1,8 +1,12 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-from copy import deepcopy
+from copy import copy, deepcopy
 from ggplot.components import aes
+import matplotlib as mpl
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
+import six
 
 __ALL__ = ["geom"]
 
@@ -14,6 +18,8 @@ class geom(object):
     def __init__(self, *args, **kwargs):
         # new dict for each geom
         self.aes = {}
+        # evaluated aes expressions on self.data, see _apply_transforms
+        self._transform_cache = {}
         for arg in args:
             if isinstance(arg, aes):
                 for k, v in arg.items():
@@ -38,8 +44,148 @@ class geom(object):
             if k in self.VALID_AES:
                 self.manual_aes[k] = v
 
+    def __deepcopy__(self, memo):
+        '''deepcopy support for geoms'''
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        for key, item in self.__dict__.items():
+            # don't make a deepcopy of data! A geom only reads its data, so
+            # all copies of a plot can share the (maybe huge) layer dataframe.
+            if key in ("data", "_transform_cache"):
+                result.__dict__[key] = self.__dict__[key]
+                continue
+            result.__dict__[key] = deepcopy(self.__dict__[key], memo)
+        return result
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the cached aes expressions hold their eval environment
+        state["_transform_cache"] = {}
+        return state
+
+    def compute_layer(self, layer):
+        """Computes the statistics of a layer
+
+        Everything which only depends on the data (and not on the axes the
+        layer is drawn on) is done here, so that the result can be drawn
+        more than once. The returned layer is passed to
+        plot_layer(layer, ax, settings), which draws it on the matplotlib
+        axes `ax` (see render_settings for `settings`); the default
+        implementation returns the layer unchanged.
+        """
+        return layer
+
+    def compute_panels(self, panels):
+        """Computes the statistics of the layers of all panels
+
+        `panels` is a list with the layers of each panel (after
+        combine_layers()). Geoms whose statistics need all the data at once,
+        e.g. bins which are shared by all facets, override this; the default
+        calls compute_layer() on each layer.
+
+        Returns
+        -------
+        panels : list of lists
+            the computed layers of each panel
+        """
+        return [[self.compute_layer(layer) for layer in layers]
+                for layers in panels]
+
+    def combine_layers(self, layers):
+        """Returns the layers of a panel which are drawn by this geom
+
+        The data of a panel is split into one layer per combination of the
+        discrete aes (color, shape, ...), each with a single value of those
+        aes. Geoms which can draw several of them at once (with per-row
+        values) can merge them here, to create fewer matplotlib artists. The
+        default returns the layers unchanged.
+        """
+        return layers
+
+    def chunk_reducer(self, aes):
+        """Returns how this geom reduces data which is read in chunks
+
+        Geoms which plot a statistic of their data can return a reducer
+        (see ggplot.components.stream), which merges all chunks into the
+        data of the geom, together with the aes which map the reduced
+        columns (e.g. {"weight": "..count.."}). The default is None: the
+        geom plots a random sample of the rows.
+
+        Parameters
+        ----------
+        aes : dict
+            the aes mapping of the geom (plot aes and geom aes)
+
+        Returns
+        -------
+        reduction : tuple or None
+            (reducer, aes) tuple or None
+        """
+        return None
+
     def __radd__(self, gg):
-        gg = deepcopy(gg)
-        gg.geoms.append(self)
+        gg = copy(gg)
+        # never append in place: the list is shared with the original plot
+        gg.geoms = gg.geoms + [self]
         return gg
 
+
+
+def _is_array(value):
+    """Returns whether a layer value is one value per row (not a scalar)"""
+    return (hasattr(value, "__len__") and
+            not isinstance(value, six.string_types + (bytes, tuple)))
+
+
+def _to_rgba(color, n):
+    """Returns the (n, 4) array of rgba values of a color or color array"""
+    if not _is_array(color):
+        return np.tile(mpl.colors.colorConverter.to_rgba(color), (n, 1))
+    color = np.asarray(color)
+    if color.ndim == 2:
+        return color.astype(float)
+    # only convert each color once
+    codes, uniques = pd.factorize(color)
+    return mpl.colors.colorConverter.to_rgba_array(list(uniques))[codes]
+
+
+def _convert_units(axis, values):
+    """Converts dates and categories to the float values of the axis"""
+    if values.dtype.kind in "biuf":
+        return values
+    axis.update_units(values)
+    return np.asarray(axis.convert_units(values), dtype=float)
+
+
+def _layer_length(layer):
+    """Returns the number of rows of a layer"""
+    for value in layer.values():
+        if _is_array(value):
+            return len(value)
+    return 1
+
+
+def _merge_layers(layers):
+    """Merges layers with the same aes into one layer
+
+    Arrays are concatenated; scalars which differ between the layers become
+    arrays with one value per row.
+    """
+    if len(layers) == 1:
+        return layers[0]
+    lengths = [_layer_length(layer) for layer in layers]
+    merged = {}
+    for ae in layers[0]:
+        values = [layer[ae] for layer in layers]
+        if _is_array(values[0]):
+            merged[ae] = np.concatenate(values)
+        elif all(value == values[0] for value in values[1:]):
+            merged[ae] = values[0]
+        else:
+            values = np.asarray(values)
+            if values.ndim != 1:
+                # rgb tuples: keep one color per layer
+                values = np.empty(len(layers), dtype=object)
+                values[:] = [layer[ae] for layer in layers]
+            merged[ae] = np.repeat(values, lengths)
+    return merged
@@ -1,36 +1,52 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
-from matplotlib.dates import drange, date2num
-from pandas.lib import Timestamp
-from datetime import timedelta
+from matplotlib.collections import LineCollection
 import numpy as np
 from .geom import geom
-import pandas as pd
+from .geom_hline import _add_lines
 
 class geom_abline(geom):
+    """Lines y = slope * x + intercept
+
+    `slope` (default 1) and `intercept` (default 0) can be lists (or
+    arrays) for several lines. The end points are taken from the x limits
+    of the axes when the lines are drawn, so the lines span the whole plot
+    whatever the limits end up to be; they are clipped to the axes and
+    don't change the limits. All lines are drawn as one LineCollection.
+    """
     VALID_AES = ['x', 'slope', 'intercept', 'color', 'linestyle', 'alpha', 'label']
-    def plot_layer(self, layer):
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
-        if 'x' in layer:
-            x = layer.pop('x')
-        if 'slope' in layer:
-            slope = layer.pop('slope')
-        else:
-            slope = 1.0
-        if 'intercept' in layer:
-            intercept = layer.pop('intercept')
-        else:
-            intercept = 0.0
-        if isinstance(x[0], Timestamp):
-            gca = plt.gca()
-            gca.set_autoscale_on(False)
-            gca.plot(gca.get_xlim(),gca.get_ylim())
-        else:
-            start, stop = np.max(x), np.min(x)
-            step = ((stop-start))  / 100.0
-            x_rng = np.arange(start, stop, step)
-            y_rng = x_rng * slope + intercept
-            plt.plot(x_rng, y_rng, **layer)
+        layer.pop('x', None)
+        slope, intercept = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(layer.pop('slope', 1.), dtype=float)),
+            np.asarray(layer.pop('intercept', 0.), dtype=float))
+        lines = _add_lines(ax, _segments(slope, intercept, ax.get_xlim()),
+                           layer, settings, ax.transData, cls=_abline_collection)
+        lines.set_lines(slope, intercept)
+
+
+def _segments(slope, intercept, xlim):
+    """Returns the (n, 2, 2) segments of the lines between the x limits"""
+    start, stop = xlim
+    return np.stack([
+        np.column_stack([np.full(len(slope), start), slope * start + intercept]),
+        np.column_stack([np.full(len(slope), stop), slope * stop + intercept])],
+        axis=1)
+
+
+class _abline_collection(LineCollection):
+    """The lines of geom_abline, which span the x view limits when drawn"""
+    _slope = None
+    _intercept = None
+
+    def set_lines(self, slope, intercept):
+        self._slope = slope
+        self._intercept = intercept
 
+    def draw(self, renderer):
+        if self._slope is not None and self.axes is not None:
+            self.set_segments(_segments(self._slope, self._intercept,
+                                        self.axes.get_xlim()))
+        LineCollection.draw(self, renderer)
@@ -1,20 +1,66 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
 import numpy as np
 import pandas as pd
 from .geom import geom
-
+from .geom_line import _decimate, _redecimated
 
 
 class geom_area(geom):
-    VALID_AES = ['x', 'ymin', 'ymax', 'color', 'alpha', 'label']
+    """Area between ymin and ymax
+
+    Areas with more than DECIMATE_THRESHOLD points are decimated to the
+    resolution of the axes, keeping the lowest ymin and the highest ymax
+    of each pixel column; `decimate` selects the method ("minmax" or
+    "lttb") or turns it off (False). Like geom_line, the decimation is
+    repeated when the area is drawn.
+    """
+    VALID_AES = ['x', 'ymin', 'ymax', 'color', 'alpha', 'label', 'decimate']
+    DECIMATE_THRESHOLD = 100000
 
-    def plot_layer(self, layer):
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
         x = layer.pop('x')
         y1 = layer.pop('ymin')
         y2 = layer.pop('ymax')
-        plt.fill_between(x, y1, y2, **layer)
+        decimated = _decimate(ax, x, [y1, y2], layer.pop('decimate', None),
+                              self.DECIMATE_THRESHOLD)
+        if decimated is None:
+            ax.fill_between(x, y1, y2, **layer)
+            return
+        x, (y1, y2), _ = decimated.get(ax)
+        area = _decimated_area(_area_polygons(x, y1, y2), **layer)
+        ax.add_collection(area, autolim=False)
+        area.set_decimation(decimated, _set_area_vertices)
+        finite = np.isfinite(x) & np.isfinite(y1) & np.isfinite(y2)
+        ax.update_datalim(np.concatenate([
+            np.column_stack([x[finite], y1[finite]]),
+            np.column_stack([x[finite], y2[finite]])]))
+        ax.autoscale_view()
+
+
+class _decimated_area(_redecimated, PolyCollection):
+    pass
+
+
+def _set_area_vertices(area, x, ys, offsets):
+    area.set_verts(_area_polygons(x, *ys))
+
+
+def _area_polygons(x, y1, y2):
+    """Returns the polygons between y1 and y2, like fill_between()
 
+    There is one polygon per run of rows with finite values.
+    """
+    finite = np.isfinite(x) & np.isfinite(y1) & np.isfinite(y2)
+    # the starts and ends of the runs of finite rows
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], finite, [0]])))
+    polygons = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        xs, y1s, y2s = x[start:end], y1[start:end], y2[start:end]
+        polygons.append(np.concatenate([
+            [(xs[0], y2s[0])], np.column_stack([xs, y1s]),
+            [(xs[-1], y2s[-1])], np.column_stack([xs[::-1], y2s[::-1]])]))
+    return polygons
@@ -1,43 +1,55 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
+from datetime import datetime
 import numpy as np
 import pandas as pd
 from .geom import geom
-from pandas.lib import Timestamp
+from ggplot.components import stream
 
 
 class geom_bar(geom):
-    VALID_AES = ['x', 'color', 'alpha', 'fill', 'label', 'weight', 'position']
+    """Bar chart of the counts (or the summed `weight`) per x value
 
-    def plot_layer(self, layer):
+    Weighted dates are summed per time bucket of width `bucket` (anything
+    pd.to_timedelta() understands, default "7D": weeks starting on
+    Monday); empty buckets get a zero bar.
+    """
+    VALID_AES = ['x', 'color', 'alpha', 'fill', 'label', 'weight', 'position',
+                 'bucket']
+    # the weeks of the default bucket start on a monday
+    BUCKET_ORIGIN = np.datetime64("1970-01-05T00:00:00", "ns")
+
+    def chunk_reducer(self, aes):
+        reducer = stream.count_reducer(aes, aes['x'], weight=aes.get('weight'),
+                                       valid_aes=self.VALID_AES)
+        return reducer, {'weight': '..count..'}
+
+    def compute_layer(self, layer):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
         x = layer.pop('x')
-        if 'weight' not in layer:
-            counts = pd.value_counts(x)
-            labels = counts.index.tolist()
-            weights = counts.tolist()
+        weights = layer.pop('weight', None)
+        bucket = layer.pop('bucket', None)
+        if (len(x) and isinstance(x[0], (datetime, np.datetime64)) and
+                (weights is not None or bucket is not None)):
+            labels, counts = _count_buckets(x, weights, bucket or "7D",
+                                            self.BUCKET_ORIGIN)
         else:
-            # TODO: pretty sure this isn't right
-            weights = layer.pop('weight')
-            if not isinstance(x[0], Timestamp):
-                labels = x
-            else:
-                df = pd.DataFrame({'weights':weights, 'timepoint': pd.to_datetime(x)})
-                df = df.set_index('timepoint')
-                ts = pd.TimeSeries(df.weights, index=df.index)
-                ts = ts.resample('W', how='sum')
-                ts = ts.fillna(0)
-                weights = ts.values.tolist()
-                labels = ts.index.to_pydatetime().tolist()
+            # sorted levels: the bars and the tick labels use this order
+            codes, labels = pd.factorize(x, sort=True)
+            counts = _bincount(codes, weights, len(labels))
+        layer['labels'] = labels
+        layer['counts'] = counts
+        return layer
+
+    def plot_layer(self, layer, ax, settings):
+        layer = dict(layer)
+        labels = layer.pop('labels')
+        weights = layer.pop('counts')
 
         indentation = np.arange(len(labels)) + 0.2
         width = 0.9
-        idx = np.argsort(labels)
-        labels, weights = np.array(labels)[idx], np.array(weights)[idx]
-        labels = sorted(labels)
 
         if 'color' in layer:
             layer['edgecolor'] = layer['color']
@@ -51,9 +63,40 @@ class geom_bar(geom):
         else:
             layer['color'] = '#333333'
 
-        plt.bar(indentation, weights, width, **layer)
-        plt.autoscale()
+        ax.bar(indentation, weights, width, **layer)
+        ax.autoscale()
         return [
                 {"function": "set_xticks", "args": [indentation+width/2]},
                 {"function": "set_xticklabels", "args": [labels]}
             ]
+
+
+def _bincount(codes, weights, n):
+    """Counts (or sums the weights of) the codes, leaving out codes < 0"""
+    valid = codes >= 0
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)[valid]
+    return np.bincount(codes[valid], weights, minlength=n)
+
+
+def _count_buckets(x, weights, bucket, origin):
+    """Counts dates per time bucket
+
+    The buckets are [origin + i * bucket, origin + (i + 1) * bucket); all
+    buckets between the first and the last date are returned.
+
+    Returns
+    -------
+    labels : list of datetime
+        the start of each bucket
+    counts : ndarray
+        the count (or summed weight) per bucket
+    """
+    width = pd.to_timedelta(bucket).value
+    times = pd.to_datetime(pd.Series(x)).values.astype(np.int64)
+    buckets = (times - origin.astype(np.int64)) // width
+    first = buckets.min()
+    codes = buckets - first
+    counts = _bincount(codes, weights, codes.max() + 1)
+    starts = origin + (first + np.arange(len(counts))) * np.timedelta64(width, "ns")
+    return pd.to_datetime(starts).to_pydatetime().tolist(), counts
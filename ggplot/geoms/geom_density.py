@@ -1,26 +1,32 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
 from .geom import geom
-from scipy.stats import gaussian_kde
+from ggplot.components import density
 import numpy as np
 
 
 class geom_density(geom):
-    VALID_AES = ['x', 'color', 'alpha', 'linestyle', 'fill', 'label']
+    """Kernel density estimate
 
-    def plot_layer(self, layer):
+    The bandwidth is given by `bw`, a rule ("scott", the default, or
+    "silverman") or a number; `weight` weights the values. The density is
+    evaluated at 1000 points between the smallest and the largest value.
+    Layers with more than FFT_THRESHOLD values (or with `fft=True`) use the
+    binned FFT estimate of components.density, the others are evaluated
+    exactly.
+    """
+    VALID_AES = ['x', 'color', 'alpha', 'linestyle', 'fill', 'label', 'bw',
+                 'weight', 'fft']
+    FFT_THRESHOLD = 100000
+    N_POINTS = 1000
+
+    def compute_layer(self, layer):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
         if 'x' in layer:
             x = layer.pop('x')
         else:
             raise Exception("geom_density(): Need a aesthetic x mapping!")
-            
-        if 'fill' in layer:
-            fill = layer.pop('fill')
-        else:
-            fill = None
         try:
             float(x[0])
         except:
@@ -28,13 +34,33 @@ class geom_density(geom):
                 # try to use it as a pandas.tslib.Timestamp
                 x = [ts.toordinal() for ts in x]
             except:
-                raise Exception("geom_density(): aesthetic x mapping needs to be convertable to float!")         
-        kde = gaussian_kde(x)
-        bottom = np.min(x)
-        top = np.max(x)
-        step = (top - bottom) / 1000.0
-        x = np.arange(bottom, top, step)
-        y = kde.evaluate(x)
-        plt.plot(x, y, **layer)
+                raise Exception("geom_density(): aesthetic x mapping needs to be convertable to float!")
+        x = np.asarray(x, dtype=float)
+        weights = layer.pop('weight', None)
+        rule = layer.pop('bw', "scott")
+        fft = layer.pop('fft', None)
+        if fft is None:
+            fft = len(x) > self.FFT_THRESHOLD
+        bw = density.bandwidth(x, rule, weights)
+        # exactly N_POINTS points, np.arange(bottom, top, step) gave one
+        # more or less depending on rounding
+        grid = np.linspace(np.min(x), np.max(x), self.N_POINTS)
+        if fft:
+            y = density.kde_fft(x, grid, bw, weights)
+        else:
+            y = density.kde_exact(x, grid, bw, weights)
+        layer['x'] = grid
+        layer['y'] = y
+        return layer
+
+    def plot_layer(self, layer, ax, settings):
+        layer = dict(layer)
+        x = layer.pop('x')
+        y = layer.pop('y')
+        if 'fill' in layer:
+            fill = layer.pop('fill')
+        else:
+            fill = None
+        ax.plot(x, y, **layer)
         if fill:
-            plt.fill_between(x, y1=np.zeros(len(x)), y2=y, **layer)
+            ax.fill_between(x, y1=np.zeros(len(x)), y2=y, **layer)
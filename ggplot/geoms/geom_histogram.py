@@ -1,34 +1,67 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
+import numpy as np
 import sys
 from .geom import geom
+from ggplot.components import bins as binning, stream
 
 
 class geom_histogram(geom):
-    VALID_AES = ['x', 'color', 'alpha', 'label', 'binwidth']
-    
+    """Histogram
+
+    The bin edges are computed once from the x values of all panels and
+    layers, so the bars of facets and color groups line up. They are given
+    by `binwidth`, or by `bins`: a number of bins or one of the rules "fd"
+    (Freedman-Diaconis) and "sturges". The default is 30 bins.
+
+    The counts of all layers are computed in one pass and kept in the
+    computed layer as "edges" and "counts", so they are part of the plot
+    plan (and the render cache).
+    """
+    VALID_AES = ['x', 'color', 'alpha', 'label', 'binwidth', 'bins', 'weight']
+
     def __init__(self, *args, **kwargs):
         super(geom_histogram, self).__init__(*args, **kwargs)
         self._warning_printed = False
 
-    def plot_layer(self, layer):
-        layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
-        layer.update(self.manual_aes)
-        if 'binwidth' in layer:
-            binwidth = layer.pop('binwidth')
-            try:
-                binwidth = float(binwidth)
-                bottom = plt.np.nanmin(layer['x'])
-                top = plt.np.nanmax(layer['x'])
-                layer['bins'] = plt.np.arange(bottom, top + binwidth, binwidth)
-            except:
-                pass
-        if 'bins' not in layer:
-            layer['bins'] = 30
+    def chunk_reducer(self, aes):
+        reducer = stream.bin_reducer(aes, [aes['x']], weight=aes.get('weight'),
+                                     valid_aes=self.VALID_AES)
+        return reducer, {'weight': '..count..'}
+
+    def compute_panels(self, panels):
+        layers = [dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
+                  for layers in panels for layer in layers]
+        for layer in layers:
+            layer.update(self.manual_aes)
+        if not layers:
+            return [[] for _ in panels]
+        x = [np.asarray(layer.pop('x'), dtype=float) for layer in layers]
+        weights = [layer.pop('weight', None) for layer in layers]
+        binwidth = layers[0].pop('binwidth', None)
+        bins = layers[0].pop('bins', None)
+        for layer in layers[1:]:
+            layer.pop('binwidth', None)
+            layer.pop('bins', None)
+        if binwidth is None and bins is None:
+            bins = 30
             if not self._warning_printed:
                 sys.stderr.write("binwidth defaulted to range/30. " +
                              "Use 'binwidth = x' to adjust this.\n")
                 self._warning_printed = True
-                
-        plt.hist(**layer)
+
+        edges = binning.bin_edges(np.concatenate(x), binwidth=binwidth,
+                                  bins=bins)
+        counts = binning.bin_counts(x, edges, weights)
+        for layer, layer_counts in zip(layers, counts):
+            layer['edges'] = edges
+            layer['counts'] = layer_counts
+        computed = iter(layers)
+        return [[next(computed) for _ in layers] for layers in panels]
+
+    def plot_layer(self, layer, ax, settings):
+        layer = dict(layer)
+        edges = layer.pop('edges')
+        counts = layer.pop('counts')
+        # one (weighted) value per bin gives the bars of the counts
+        ax.hist(edges[:-1], bins=edges, weights=counts, **layer)
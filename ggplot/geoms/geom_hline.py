@@ -1,31 +1,52 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
-from .geom import geom
+from matplotlib.collections import LineCollection
+import numpy as np
+from .geom import geom, _convert_units, _is_array, _to_rgba
 
 class geom_hline(geom):
+    """Horizontal lines at `y`
+
+    `y` can be a list (or array) of positions; `xmin` and `xmax` are the
+    start and end of the lines as fractions of the axes width (default 0
+    and 1) and can be lists as well. All lines are drawn as one
+    LineCollection.
+    """
     VALID_AES = ['y', 'xmin', 'xmax', 'color', 'linestyle', 'alpha', 'label']
-    def plot_layer(self, layer):
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
-        if 'y' in layer:
-            y = layer.pop('y')
-        xmin, xmax = None, None
-        if 'xmin' in layer:
-            xmin = layer.pop('xmin')
-        else:
-            xmin = 0
-        if 'xmax' in layer:
-            xmax = layer.pop('xmax')
-        else:
-            xmax = 0
-        if xmin and xmax:
-            plt.axhline(y=y, xmin=xmin, xmax=xmax, **layer)
-        elif xmin:
-            plt.axhline(y=y, xmin=xmin, **layer)
-        elif xmax:
-            plt.axhline(y=y, xmax=xmax, **layer)
-        else:
-            plt.axhline(y=y, **layer)
+        y, xmin, xmax = np.broadcast_arrays(
+            _convert_units(ax.yaxis, np.atleast_1d(layer.pop('y'))),
+            layer.pop('xmin', 0.), layer.pop('xmax', 1.))
+        segments = np.stack([np.column_stack([xmin, y]),
+                             np.column_stack([xmax, y])], axis=1)
+        # x in axes coordinates, y in data coordinates
+        _add_lines(ax, segments, layer, settings, ax.get_yaxis_transform())
+        ax.update_datalim(np.column_stack([y, y]), updatex=False)
+        ax.autoscale_view(scalex=False)
+
 
+def _add_lines(ax, segments, layer, settings, transform, cls=LineCollection):
+    """Draws the (n, 2, 2) segments as one LineCollection
 
+    The color, alpha and linestyle of the layer can be one value or one per
+    line. cls is the class of the collection, a subclass of LineCollection.
+    """
+    n = len(segments)
+    color = layer.get('color')
+    if color is None:
+        color = settings.get("axes.color_cycle", ["#333333"])[0]
+    colors = _to_rgba(color, n)
+    if 'alpha' in layer:
+        colors[:, 3] = layer['alpha']
+    kwargs = {}
+    if 'linestyle' in layer:
+        linestyle = layer['linestyle']
+        kwargs['linestyles'] = (list(linestyle) if _is_array(linestyle)
+                                else [linestyle])
+    if 'label' in layer:
+        kwargs['label'] = layer['label']
+    lines = cls(segments, colors=colors, transform=transform, **kwargs)
+    ax.add_collection(lines, autolim=False)
+    return lines
@@ -1,30 +1,48 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
-from itertools import groupby
-from operator import itemgetter
+from collections import OrderedDict
 import sys
-from .geom import geom
+from matplotlib.collections import LineCollection
+import numpy as np
+from ggplot.components import decimate as decimation, groups
+from .geom import (geom, _convert_units, _is_array, _merge_layers,
+                   _to_rgba)
 
 
 class geom_line(geom):
-    VALID_AES = ['x', 'y', 'color', 'alpha', 'group', 'linestyle', 'linewidth' 'label', 'size']
-    
+    """Line chart
+
+    Layers with a `group` aes, or with several colors, are drawn as one
+    LineCollection with a line (and a style) per group instead of one plot
+    call per group. A mapped `size` is not supported (yet), such lines get
+    a width of 4.
+
+    Lines with more than DECIMATE_THRESHOLD points are decimated to the
+    resolution of the axes (see _decimate()); `decimate` selects the
+    method ("minmax" or "lttb") or turns it off (False). Decimated lines
+    are drawn as a LineCollection, which is decimated again whenever it is
+    drawn, so the vertices fit the size and dpi of the saved figure.
+    """
+    VALID_AES = ['x', 'y', 'color', 'alpha', 'group', 'linestyle', 'linewidth',
+                 'label', 'size', 'decimate']
+    DECIMATE_THRESHOLD = 100000
+
     def __init__(self, *args, **kwargs):
         super(geom_line, self).__init__(*args, **kwargs)
         self._warning_printed = False
-    
-    def plot_layer(self, layer):
+
+    def combine_layers(self, layers):
+        return _combine_line_layers(layers)
+
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
-        if 'x' in layer:
-            x = layer.pop('x')
-        if 'y' in layer:
-            y = layer.pop('y')
+        x = layer.pop('x')
+        y = layer.pop('y')
         if 'size' in layer:
-            # ggplot also supports aes(size=...) but the current mathplotlib is not. See 
+            # ggplot also supports aes(size=...) but the current mathplotlib is not. See
             # https://github.com/matplotlib/matplotlib/issues/2658
-            if isinstance(layer['size'], list):
+            if _is_array(layer['size']):
                 layer['size'] = 4
                 if not self._warning_printed:
                     msg = "'geom_line()' currenty does not support the mapping of " +\
@@ -32,14 +50,239 @@ class geom_line(geom):
                           "Use 'geom_line(size=x)' to set the size for the whole line.\n"
                     sys.stderr.write(msg)
                     self._warning_printed = True
-            layer['linewidth'] = layer['size']
-            del layer['size']
+            layer['linewidth'] = layer.pop('size')
         if 'linestyle' in layer and 'color' not in layer:
             layer['color'] = 'k'
-        if 'group' not in layer:
-            plt.plot(x, y, **layer)
+        method = layer.pop('decimate', None)
+        grouped = 'group' in layer or _has_arrays(layer)
+        order, offsets = _group_order(layer.pop('group', None), len(x))
+        if grouped:
+            x = np.asarray(x).take(order)
+            y = np.asarray(y).take(order)
+        decimated = _decimate(ax, x, [y], method, self.DECIMATE_THRESHOLD,
+                              offsets)
+        if decimated is None and not grouped:
+            ax.plot(x, y, **layer)
+            return
+        first_rows = order[offsets[:-1]]
+        if decimated is not None:
+            x, (y,), offsets = decimated.get(ax)
+        _plot_line_collection(ax, x, y, offsets, first_rows, layer, settings,
+                              decimated)
+
+
+def _combine_line_layers(layers):
+    """Merges the layers of a panel into one layer per set of aes
+
+    Each layer gets its own group codes, so the lines of different layers
+    are never joined.
+    """
+    merged = OrderedDict()
+    n_groups = 0
+    for layer in layers:
+        layer = dict(layer)
+        n = len(layer['x'])
+        if 'group' in layer:
+            codes, levels = groups.factorize(layer['group'])
+            layer['group'] = np.where(codes >= 0, codes + n_groups, -1)
+            n_groups += len(levels)
         else:
-            g = layer.pop('group')
-            for k, v in groupby(sorted(zip(x, y, g), key=itemgetter(2)), key=itemgetter(2)):
-                x_g, y_g, _ = zip(*v) 
-                plt.plot(x_g, y_g, **layer)
+            layer['group'] = np.repeat(n_groups, n)
+            n_groups += 1
+        merged.setdefault(tuple(sorted(layer)), []).append(layer)
+    if len(layers) == 1:
+        # nothing to merge, keep the layer as it is
+        return layers
+    return [_merge_layers(group) for group in merged.values()]
+
+
+def _has_arrays(layer):
+    return any(_is_array(value) for ae, value in layer.items()
+               if ae != 'label')
+
+
+def _group_order(group, n):
+    """Returns the row order which makes each group a contiguous slice
+
+    Returns
+    -------
+    order : ndarray
+        the rows of group i are order[offsets[i]:offsets[i + 1]]; the rows
+        keep their order within a group
+    offsets : ndarray
+        the start of each group in order and the total length
+    """
+    if group is None:
+        return np.arange(n), np.array([0, n])
+    codes, _ = groups.factorize(group)
+    order, offsets, _ = groups.sorted_groups(codes)
+    return order, offsets
+
+
+def _decimate(ax, x, ys, method, threshold, offsets=None):
+    """Prepares the decimation of lines to the pixel width of the axes
+
+    Parameters
+    ----------
+    x, ys : ndarray, list of ndarray
+        the vertices of the lines
+    method : str, bool or None
+        "minmax" or "lttb" (see components.decimate), False for no
+        decimation or None for "minmax" if there are more than `threshold`
+        vertices
+    offsets : ndarray
+        the lines are x[offsets[i]:offsets[i + 1]] (default: one line)
+
+    Returns
+    -------
+    decimated : _decimated_vertices or None
+        all vertices (as floats), or None if the lines are not decimated;
+        lines whose x is not ascending are never decimated
+    """
+    if method is None:
+        method = "minmax" if len(x) > threshold else False
+    if not method or not len(x):
+        return None
+    x = _convert_units(ax.xaxis, np.asarray(x))
+    ys = [_convert_units(ax.yaxis, np.asarray(y)) for y in ys]
+    if offsets is None:
+        offsets = np.array([0, len(x)])
+    steps = np.diff(x)
+    # the jumps between two lines don't count
+    steps[offsets[1:-1] - 1] = 0
+    if (steps < 0).any():
+        return None
+    return _decimated_vertices(x, ys, offsets, method)
+
+
+class _decimated_vertices(object):
+    """All vertices of decimated lines, see _decimate()
+
+    get(ax) returns the vertices (x, ys, offsets) which are kept at the
+    current pixel width of ax; the result for the last width is cached.
+    """
+
+    def __init__(self, x, ys, offsets, method):
+        self.x = x
+        self.ys = ys
+        self.offsets = offsets
+        self.method = method
+        self._n_columns = None
+        self._kept = None
+
+    def get(self, ax):
+        n_columns = max(int(np.ceil(ax.bbox.width)), 1)
+        if n_columns != self._n_columns:
+            rows, offsets = decimation.decimate(self.x, self.ys, n_columns,
+                                                self.offsets, self.method)
+            self._kept = (self.x[rows], [y[rows] for y in self.ys], offsets)
+            self._n_columns = n_columns
+        return self._kept
+
+
+class _redecimated(object):
+    """Mixin for artists whose vertices are decimated when they are drawn
+
+    The axes width at plot time is not the one of the saved figure (size
+    and dpi change in savefig), so the vertices are decimated again at
+    draw time. set_decimation() must be called after the artist is added
+    to the axes, with the vertices which are kept at the current width.
+    """
+    _decimated = None
+    _kept = None
+
+    def set_decimation(self, decimated, set_vertices):
+        """Sets the _decimated_vertices of the artist
+
+        set_vertices(artist, x, ys, offsets) sets the kept vertices.
+        """
+        self._decimated = decimated
+        self._set_vertices = set_vertices
+        self._kept = decimated.get(self.axes)
+
+    def draw(self, renderer):
+        if self._decimated is not None and self.axes is not None:
+            kept = self._decimated.get(self.axes)
+            if kept is not self._kept:
+                self._kept = kept
+                self._set_vertices(self, *kept)
+        super(_redecimated, self).draw(renderer)
+
+
+class _decimated_lines(_redecimated, LineCollection):
+    pass
+
+
+def _set_line_vertices(lines, x, ys, offsets):
+    lines.set_segments(_segments(x, ys[0], offsets))
+
+
+def _segments(x, y, offsets):
+    """Returns the vertices of each line with vertices as a list"""
+    vertices = np.column_stack([x, y])
+    segments = np.split(vertices, offsets[1:-1])
+    return [segment for segment, size in zip(segments, np.diff(offsets))
+            if size > 0]
+
+
+def _plot_line_collection(ax, x, y, offsets, first_rows, layer, settings,
+                          decimated=None, set_vertices=_set_line_vertices):
+    """Draws the groups of (sorted) x and y as one LineCollection
+
+    x[offsets[i]:offsets[i + 1]] are the vertices of line i. Style values
+    with one value per row are taken from the row first_rows[i] (in the
+    original order of the layer); lines without vertices are left out.
+
+    If decimated (see _decimate()) is given, x, y and offsets are its
+    vertices at the current axes width; the lines are decimated again when
+    they are drawn and set_vertices(lines, x, ys, offsets) sets the kept
+    vertices.
+    """
+    keep = np.diff(offsets) > 0
+    first_rows = first_rows[keep]
+
+    def per_line(value):
+        if _is_array(value):
+            return np.asarray(value)[first_rows]
+        return value
+
+    x = _convert_units(ax.xaxis, x)
+    y = _convert_units(ax.yaxis, y)
+    segments = _segments(x, y, offsets)
+
+    kwargs = {}
+    color = layer.get('color')
+    if color is None:
+        color = settings.get("axes.color_cycle", ["#333333"])[0]
+    alpha = per_line(layer.get('alpha'))
+    if _is_array(color) or _is_array(alpha):
+        color = per_line(color)
+        rgba = _to_rgba(color, len(segments))
+        if alpha is not None:
+            rgba[:, 3] = alpha
+        kwargs['colors'] = rgba
+    else:
+        kwargs['colors'] = [color]
+        kwargs['alpha'] = alpha
+    if 'linewidth' in layer:
+        kwargs['linewidths'] = _as_list(per_line(layer['linewidth']))
+    if 'linestyle' in layer:
+        kwargs['linestyles'] = _as_list(per_line(layer['linestyle']))
+    if 'label' in layer and not _is_array(layer['label']):
+        kwargs['label'] = layer['label']
+
+    if decimated is None:
+        lines = LineCollection(segments, **kwargs)
+    else:
+        lines = _decimated_lines(segments, **kwargs)
+    ax.add_collection(lines)
+    if decimated is not None:
+        lines.set_decimation(decimated, set_vertices)
+    ax.autoscale_view()
+    return lines
+
+
+def _as_list(value):
+    if _is_array(value):
+        return list(value)
+    return [value]
@@ -1,6 +1,5 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
 import numpy as np
 from .geom import geom
@@ -12,7 +11,7 @@ _ROOT = os.path.abspath(os.path.dirname(__file__))
 class geom_now_its_art(geom):
     VALID_AES = ['x', 'y']
 
-    def plot_layer(self, layer):
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
@@ -20,6 +19,6 @@ class geom_now_its_art(geom):
         y = np.array(layer['y'])
 
         img = mpimg.imread(os.path.join(_ROOT, 'bird.png'))
-        # plt.imshow(img, alpha=0.5, extent=[x.min(), x.max(), y.min(), y.max()])
-        plt.imshow(img, alpha=0.5)
+        # ax.imshow(img, alpha=0.5, extent=[x.min(), x.max(), y.min(), y.max()])
+        ax.imshow(img, alpha=0.5)
         print ("Put a bird on it!")
@@ -1,17 +1,41 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
+from collections import OrderedDict
 import matplotlib as mpl
 from matplotlib.colors import Normalize
+from matplotlib.image import AxesImage
 import numpy as np
-from .geom import geom
-import numpy as np
+import pandas as pd
+from scipy.signal import fftconvolve
+from .geom import geom, _is_array, _merge_layers, _to_rgba
 
 class geom_point(geom):
+    """Scatter plot
+
+    With `raster=True` (the default for layers with more than
+    RASTER_THRESHOLD points), the points are not drawn as markers but
+    aggregated on a grid with the pixel size of the axes, which is drawn as
+    one image: each pixel gets the mean color of its points and an opacity
+    which grows with their count (see _point_raster). The grid is
+    recomputed at the resolution of each drawing, e.g. at the dpi of ggsave.
+
+    All layers with the same shape are drawn at once, with per-point colors,
+    sizes and alphas (see combine_layers()).
+    """
     VALID_AES = ['x', 'y', 'size', 'color', 'alpha', 'shape', 'label', 'cmap',
-                 'position']
+                 'position', 'raster']
+    RASTER_THRESHOLD = 1000000
 
-    def plot_layer(self, layer):
+    def combine_layers(self, layers):
+        # one scatter call per marker: matplotlib can't mix markers in one
+        # collection, but everything else can be given per point
+        groups = OrderedDict()
+        for layer in layers:
+            key = (layer.get("shape"), tuple(sorted(layer)))
+            groups.setdefault(key, []).append(layer)
+        return [_merge_layers(group) for group in groups.values()]
+
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
@@ -26,12 +50,160 @@ class geom_point(geom):
         # for some reason, scatter doesn't default to the same color styles
         # as the axes.color_cycle
         if "color" not in layer and "cmap" not in layer:
-            layer["color"] = mpl.rcParams.get("axes.color_cycle", ["#333333"])[0]
-        
+            layer["color"] = settings.get("axes.color_cycle", ["#333333"])[0]
+
         if "position" in layer:
             del layer["position"]
-            layer['x'] *= np.random.uniform(.9, 1.1, len(layer['x']))
-            layer['y'] *= np.random.uniform(.9, 1.1, len(layer['y']))
+            # no inplace changes: the layer arrays are shared with the plot data
+            layer['x'] = layer['x'] * np.random.uniform(.9, 1.1, len(layer['x']))
+            layer['y'] = layer['y'] * np.random.uniform(.9, 1.1, len(layer['y']))
+
+        raster = layer.pop("raster", None)
+        if raster is None:
+            raster = len(layer['x']) > self.RASTER_THRESHOLD
+        if raster and _is_numeric(layer['x']) and _is_numeric(layer['y']):
+            self._plot_raster(layer, ax)
+        else:
+            if _is_array(layer.get("alpha")):
+                # scatter only takes one alpha, but rgba colors
+                rgba = _to_rgba(layer.get("color"), len(layer['x']))
+                rgba[:, 3] = np.asarray(layer.pop("alpha"), dtype=float)
+                layer["color"] = rgba
+            elif _is_array(layer.get("color")):
+                layer["color"] = _to_rgba(layer["color"], len(layer['x']))
+            ax.scatter(**layer)
+
+    def _plot_raster(self, layer, ax):
+        x = np.asarray(layer['x'], dtype=float)
+        y = np.asarray(layer['y'], dtype=float)
+        valid = np.isfinite(x) & np.isfinite(y)
+        x, y = x[valid], y[valid]
+        if not len(x):
+            return
+        color = layer.get("color")
+        if _is_array(color):
+            rgb = _to_rgba(color, len(valid))[valid, :3]
+        else:
+            rgb = np.asarray(mpl.colors.colorConverter.to_rgb(color))
+        alpha = layer.get("alpha", 1)
+        if _is_array(alpha):
+            alpha = np.asarray(alpha, dtype=float)[valid]
+        # the default size of scatter; a mapped size is summarized by its
+        # median, all points of a layer are spread to the same disk
+        size = layer.get("s", 20)
+        if _is_array(size):
+            size = np.median(np.asarray(size, dtype=float)[valid])
+        ax.add_image(_point_raster(ax, x, y, rgb, alpha, size))
+        # like scatter, the points add to the data limits of the axes
+        ax.update_datalim([(x.min(), y.min()), (x.max(), y.max())])
+        ax.autoscale_view()
+
+
+class _point_raster(AxesImage):
+    """The points of a layer, aggregated on the pixels of the axes
+
+    The image always covers the view limits of the axes and has one pixel
+    per pixel of the renderer; it is recomputed when the limits or the size
+    of the axes in pixels change, so ggsave at a higher dpi gives a finer
+    raster.
+
+    Each point is spread to a disk with the diameter of its marker (the
+    marker shape is not drawn). Each pixel gets the mean color of its
+    points; its opacity grows with the log of their count, from almost
+    transparent to `alpha` for the most crowded pixel.
+
+    Parameters
+    ----------
+    ax : Axes
+        the axes of the image
+    x, y : ndarray
+        the (finite) positions of the points
+    rgb : ndarray
+        one color for all points, or a color per point
+    alpha : float or ndarray
+        one alpha for all points, or an alpha per point
+    size : float
+        the marker size in points^2, like the `s` of scatter
+    """
+
+    def __init__(self, ax, x, y, rgb, alpha, size):
+        super(_point_raster, self).__init__(ax, origin="lower",
+                                            interpolation="nearest", zorder=1)
+        self.set_clip_path(ax.patch)
+        self._x, self._y = x, y
+        self._rgb = rgb
+        self._alpha = alpha
+        self._size = size
+        self._key = None
+        self._rasterize()
+
+    def get_extent(self):
+        x0, x1 = self.axes.get_xlim()
+        y0, y1 = self.axes.get_ylim()
+        return x0, x1, y0, y1
+
+    def _rasterize(self):
+        bbox = self.axes.bbox
+        width = max(int(np.ceil(bbox.width)), 1)
+        height = max(int(np.ceil(bbox.height)), 1)
+        extent = self.get_extent()
+        dpi = self.axes.figure.dpi
+        key = (height, width, extent, dpi)
+        if key == self._key:
+            return
+        self._key = key
+        # the radius of a marker in pixels, a pixel more is kept around the
+        # view so the markers of points just outside of it are drawn
+        radius = np.sqrt(self._size) / 2 * dpi / 72.
+        pad = int(np.ceil(radius))
+        x0, x1, y0, y1 = extent
+        col = np.floor((self._x - x0) / (x1 - x0) * width).astype(np.intp) + pad
+        row = np.floor((self._y - y0) / (y1 - y0) * height).astype(np.intp) + pad
+        n_cols, n_rows = width + 2 * pad, height + 2 * pad
+        inside = (col >= 0) & (col < n_cols) & (row >= 0) & (row < n_rows)
+        pixel = (row * n_cols + col)[inside]
+        n_pixels = n_cols * n_rows
+
+        def aggregate(weights=None):
+            grid = np.bincount(pixel, weights, n_pixels).astype(float)
+            grid = grid.reshape(n_rows, n_cols)
+            if radius > 0.5:
+                grid = fftconvolve(grid, _disk(radius), mode="same")
+            return grid[pad:pad + height, pad:pad + width].ravel()
+
+        counts = aggregate()
+        # the convolution leaves some rounding noise in the empty pixels
+        filled = counts > 0.5
+        rgb, alpha = self._rgb, self._alpha
+        image = np.zeros((height * width, 4))
+        if rgb.ndim == 2:
+            # the mean color of the points in each pixel
+            for i in range(3):
+                image[filled, i] = (aggregate(rgb[inside, i])[filled]
+                                    / counts[filled])
+        else:
+            image[:, :3] = rgb
+        if _is_array(alpha):
+            alpha = aggregate(alpha[inside])[filled] / counts[filled]
+        if filled.any():
+            level = np.log1p(counts[filled]) / np.log1p(counts[filled].max())
+            image[filled, 3] = np.clip(alpha * level, 0, 1)
+        self.set_data(image.reshape(height, width, 4))
+
+    def draw(self, renderer, *args, **kwargs):
+        # the view limits and the pixels of this renderer (e.g. in the dpi
+        # of savefig) are only final when the figure is drawn
+        self._rasterize()
+        super(_point_raster, self).draw(renderer, *args, **kwargs)
+
+
+def _disk(radius):
+    """Returns the pixels of a disk with this radius as 0/1 kernel"""
+    r = int(np.ceil(radius))
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    return (dx ** 2 + dy ** 2 <= radius ** 2).astype(float)
+
 
-        plt.scatter(**layer)
+def _is_numeric(values):
+    return np.asarray(values).dtype.kind in "biuf"
 
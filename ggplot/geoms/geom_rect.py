@@ -1,7 +1,11 @@
-import matplotlib as mpl
-import matplotlib.pyplot as plt
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from collections import OrderedDict
+from matplotlib.collections import PolyCollection
+import numpy as np
 
-from .geom import geom
+from .geom import geom, _convert_units, _is_array, _merge_layers, _to_rgba
+from .geom_line import _as_list
 
 
 class geom_rect(geom):
@@ -20,13 +24,22 @@ class geom_rect(geom):
     fill
     linetype
     size
+
+    All rectangles of a panel are drawn as one PolyCollection with a fill,
+    edge color, alpha, line type and line width per rectangle.
     """
 
     VALID_AES = ['xmax', 'xmin', 'ymax', 'ymin', 'color', 'fill',
                  'linetype', 'size', 'alpha']
     REQUIRED_AES = ['xmax', 'xmin', 'ymax', 'ymin']
 
-    def plot_layer(self, layer):
+    def combine_layers(self, layers):
+        merged = OrderedDict()
+        for layer in layers:
+            merged.setdefault(tuple(sorted(layer)), []).append(layer)
+        return [_merge_layers(group) for group in merged.values()]
+
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
@@ -35,50 +48,34 @@ class geom_rect(geom):
             msg = 'geom_rect requires the following missing aesthetics: {}'
             raise Exception(msg.format(', '.join(missing_aes)))
 
-        if 'xmin' in layer:
-            layer['left'] = layer['xmin']
-            del layer['xmin']
-
-        if 'xmax' in layer:
-            if isinstance(layer['xmax'], list):
-                xcoords = zip(layer['left'], layer['xmax'])
-                width = [xmax - xmin for xmin, xmax in xcoords]
-            else:
-                width = layer['xmax'] - layer['left']
-            layer['width'] = width
-            del layer['xmax']
-
-        if 'ymin' in layer:
-            layer['bottom'] = layer['ymin']
-            del layer['ymin']
-
-        if 'ymax' in layer:
-            if isinstance(layer['ymax'], list):
-                ycoords = zip(layer['bottom'], layer['ymax'])
-                height = [ymax - ymin for ymin, ymax in ycoords]
-            else:
-                height = layer['ymax'] - layer['bottom']
-            layer['height'] = height
-            del layer['ymax']
-
-        if 'color' in layer:
-            layer['edgecolor'] = layer['color']
-            del layer['color']
-        else:
-            layer['edgecolor'] = '#333333'
-
+        n = max([len(v) for v in layer.values() if _is_array(v)] or [1])
+        xmin, xmax, ymin, ymax = [
+            _convert_units(axis, np.broadcast_to(np.asarray(layer.pop(ae)), n))
+            for axis, ae in [(ax.xaxis, 'xmin'), (ax.xaxis, 'xmax'),
+                             (ax.yaxis, 'ymin'), (ax.yaxis, 'ymax')]]
+        # the corners of all rectangles, (n, 4, 2)
+        verts = np.empty((n, 4, 2))
+        verts[:, 0, 0] = verts[:, 1, 0] = xmin
+        verts[:, 2, 0] = verts[:, 3, 0] = xmax
+        verts[:, 0, 1] = verts[:, 3, 1] = ymin
+        verts[:, 1, 1] = verts[:, 2, 1] = ymax
+
+        alpha = layer.get('alpha')
+        facecolors = _to_rgba(layer.get('fill', '#333333'), n)
+        edgecolors = _to_rgba(layer.get('color', '#333333'), n)
+        if alpha is not None:
+            # like bar(), alpha applies to the fill and the edge
+            facecolors[:, 3] = alpha
+            edgecolors[:, 3] = alpha
+        kwargs = {}
         if 'linetype' in layer:
-            layer['linestyle'] = layer['linetype']
-            del layer['linetype']
-
+            kwargs['linestyles'] = _as_list(layer['linetype'])
         if 'size' in layer:
-            layer['linewidth'] = layer['size']
-            del layer['size']
-
-        if 'fill' in layer:
-            layer['color'] = layer['fill']
-            del layer['fill']
-        else:
-            layer['color'] = '#333333'
-
-        plt.bar(**layer)
+            kwargs['linewidths'] = _as_list(layer['size'])
+
+        rects = PolyCollection(verts, facecolors=facecolors,
+                               edgecolors=edgecolors, **kwargs)
+        ax.add_collection(rects)
+        if n:
+            ax.update_datalim(verts.reshape(-1, 2))
+        ax.autoscale_view()
@@ -1,15 +1,25 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
-from itertools import groupby
-from operator import itemgetter
+import numpy as np
 from .geom import geom
+from .geom_line import (_combine_line_layers, _decimate, _group_order,
+                        _has_arrays, _plot_line_collection, _segments)
 
 
 class geom_step(geom):
+    """Step chart
+
+    Grouped steps are drawn as one LineCollection and long series are
+    decimated (`decimate`) when they are drawn, like geom_line.
+    """
     VALID_AES = ['x', 'y', 'color', 'alpha', 'linestyle', 'label', 'size',
-                 'group']
-    def plot_layer(self, layer):
+                 'group', 'decimate']
+    DECIMATE_THRESHOLD = 100000
+
+    def combine_layers(self, layers):
+        return _combine_line_layers(layers)
+
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
         if 'x' in layer:
@@ -22,18 +32,60 @@ class geom_step(geom):
         if 'linestyle' in layer and 'color' not in layer:
             layer['color'] = 'k'
 
-        x_stepped = []
-        y_stepped = []
-        for i in range(len(x) - 1):
-            x_stepped.append(x[i])
-            x_stepped.append(x[i+1])
-            y_stepped.append(y[i])
-            y_stepped.append(y[i])
-
-        if 'group' not in layer:
-            plt.plot(x_stepped, y_stepped, **layer)
-        else:
-            g = layer.pop('group')
-            for k, v in groupby(sorted(zip(x_stepped, y_stepped, g), key=itemgetter(2)), key=itemgetter(2)):
-                x_g, y_g, _ = zip(*v) 
-                plt.plot(x_g, y_g, **layer)
+        method = layer.pop('decimate', None)
+        grouped = 'group' in layer or _has_arrays(layer)
+        order, offsets = _group_order(layer.pop('group', None), len(x))
+        if grouped:
+            x = np.asarray(x).take(order)
+            y = np.asarray(y).take(order)
+        decimated = _decimate(ax, x, [y], method, self.DECIMATE_THRESHOLD,
+                              offsets)
+        if decimated is None and not grouped:
+            x_stepped, y_stepped = _steps(x, y)
+            ax.plot(x_stepped, y_stepped, **layer)
+            return
+        first_rows = order[offsets[:-1]]
+        if decimated is not None:
+            x, (y,), offsets = decimated.get(ax)
+        x_stepped, y_stepped, step_offsets = _grouped_steps(x, y, offsets)
+        # a line can't have a width of markers
+        layer.pop('markersize', None)
+        _plot_line_collection(ax, x_stepped, y_stepped, step_offsets,
+                              first_rows, layer, settings, decimated,
+                              _set_step_vertices)
+
+
+def _steps(x, y):
+    """Returns the vertices of the steps through the points x, y
+
+    Each point gets a horizontal step to the x of the next point:
+    (x0, y0), (x1, y0), (x1, y1), (x2, y1), ...
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) < 2:
+        return x[:0], y[:0]
+    return np.repeat(x, 2)[1:-1], np.repeat(y, 2)[:-2]
+
+
+def _grouped_steps(x, y, offsets):
+    """Returns the steps of all groups at once
+
+    The rows of group i are x[offsets[i]:offsets[i + 1]]. Returns the
+    stepped x and y and the offsets of each group in them.
+    """
+    # the steps between the last row of a group and the next group go away
+    within = np.ones(max(len(x) - 1, 0), dtype=bool)
+    within[offsets[1:-1] - 1] = False
+    rows = np.flatnonzero(within)
+    x_stepped = np.column_stack([x[rows], x[rows + 1]]).ravel()
+    y_stepped = np.repeat(y[rows], 2)
+    sizes = 2 * np.maximum(np.diff(offsets) - 1, 0)
+    step_offsets = np.concatenate([[0], np.cumsum(sizes)])
+    return x_stepped, y_stepped, step_offsets
+
+
+def _set_step_vertices(lines, x, ys, offsets):
+    """Sets the steps through the kept vertices of decimated lines"""
+    x_stepped, y_stepped, step_offsets = _grouped_steps(x, ys[0], offsets)
+    lines.set_segments(_segments(x_stepped, y_stepped, step_offsets))
@@ -1,17 +1,28 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
 import matplotlib as mpl
 import numpy as np
 import pandas as pd
+from matplotlib.artist import Artist
+from matplotlib.font_manager import FontProperties
+from matplotlib.text import Text
 from .geom import geom
 
 class geom_text(geom):
+    """Text labels
+
+    With `check_overlap=True`, labels which would overlap an already placed
+    label are left out. The labels are placed in the order of the `priority`
+    aes (highest first) or in row order, and labels outside of the axes are
+    dropped. The labels are checked when they are drawn, so the final
+    limits, figure size and dpi and the rotation (`angle`) are taken into
+    account; only the surviving labels become matplotlib Text artists.
+    """
     VALID_AES = ['label','x','y','alpha','angle','color','family','fontface',
-                 'hjust','size','vjust']
+                 'hjust','size','vjust','check_overlap','priority']
     REQUIRED_AES = ['label','x','y']
 
-    def plot_layer(self, layer):
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
@@ -34,7 +45,7 @@ class geom_text(geom):
         if len(x) == 0:
             return
 
-        # plt.text does not resize axes, must do manually
+        # ax.text does not resize axes, must do manually
         xmax = max(x)
         xmin = min(x)
         ymax = max(y)
@@ -51,7 +62,6 @@ class geom_text(geom):
         # Take current plotting dimension in account for the case that we
         # work on a special dataframe just for this geom!
         if not self.data is None:
-            ax = plt.gca()
             cxmin, cxmax = ax.get_xlim()
             cymin, cymax = ax.get_ylim()
             # there is a problem if geom_text is the first plot, as
@@ -77,8 +87,133 @@ class geom_text(geom):
             layer['rotation'] = layer['angle']
             del layer['angle']
 
-        for x_g,y_g,s in zip(x,y,label):
-            plt.text(x_g,y_g,s,**layer)
+        check_overlap = layer.pop('check_overlap', False)
+        priority = layer.pop('priority', None)
+        if check_overlap:
+            ax.add_artist(_text_labels(x, y, label, priority, layer))
+        else:
+            for x_g,y_g,s in zip(x,y,label):
+                ax.text(x_g,y_g,s,**layer)
 
         # resize axes
-        plt.axis([xmin, xmax, ymin, ymax])
+        ax.axis([xmin, xmax, ymin, ymax])
+
+
+class _text_labels(Artist):
+    """The labels of geom_text(check_overlap=True)
+
+    When drawn, the labels which don't overlap (see _non_overlapping()) are
+    drawn as Text artists. They are only computed again if the limits, the
+    size or the dpi changed since the last draw.
+    """
+    zorder = 3
+
+    def __init__(self, x, y, label, priority, props):
+        Artist.__init__(self)
+        self._x = np.asarray(x)
+        self._y = np.asarray(y)
+        self._label = np.asarray(label)
+        self._priority = priority
+        self._props = props
+        self._texts = []
+        self._key = None
+
+    def get_texts(self):
+        """Returns the Text artists of the labels shown in the last draw"""
+        return self._texts
+
+    def get_children(self):
+        return self._texts
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        ax = self.axes
+        key = (tuple(ax.viewLim.bounds), tuple(ax.bbox.bounds),
+               renderer.points_to_pixels(1.))
+        if key != self._key:
+            keep = _non_overlapping(ax, renderer, self._x, self._y,
+                                    self._label, self._priority, self._props)
+            self._texts = []
+            for i in keep:
+                text = Text(self._x[i], self._y[i], self._label[i],
+                            **self._props)
+                text.set_figure(self.figure)
+                text.axes = ax
+                text.set_transform(ax.transData)
+                self._texts.append(text)
+            self._key = key
+        for text in self._texts:
+            text.draw(renderer)
+
+
+def _non_overlapping(ax, renderer, x, y, label, priority, layer):
+    """Returns the indices of the labels which don't overlap
+
+    The labels are measured with renderer, the boxes of rotated labels are
+    the bounding boxes of the rotated text. The labels are placed greedily
+    in priority order. The placed bounding boxes are kept in a grid index
+    with cells of the size of the largest box, so each label is only
+    checked against the boxes in the (at most four) cells it touches.
+    """
+    label = np.asarray(label)
+    xy = ax.transData.transform(np.column_stack([np.asarray(x, dtype=float),
+                                                 np.asarray(y, dtype=float)]))
+    # measure each distinct label once, without creating Text artists
+    codes, uniques = pd.factorize(label)
+    font = FontProperties(family=layer.get('family'),
+                          size=layer.get('size'))
+    extents = np.array([renderer.get_text_width_height_descent(
+                            "%s" % s, font, ismath=False)[:2]
+                        for s in uniques]).reshape(-1, 2)
+    text_width, text_height = extents[codes, 0], extents[codes, 1]
+    angle = np.radians(np.asarray(layer.get('rotation', 0.), dtype=float))
+    cos, sin = np.abs(np.cos(angle)), np.abs(np.sin(angle))
+    width = text_width * cos + text_height * sin
+    height = text_width * sin + text_height * cos
+
+    halign = layer.get('horizontalalignment', 'left')
+    x0 = xy[:, 0] - width * {'center': 0.5, 'right': 1.}.get(halign, 0.)
+    valign = layer.get('verticalalignment', 'baseline')
+    y0 = xy[:, 1] - height * {'center': 0.5, 'top': 1.}.get(valign, 0.)
+    boxes = np.column_stack([x0, y0, x0 + width, y0 + height])
+
+    # labels outside of the axes are never shown
+    bbox = ax.bbox
+    inside = ((xy[:, 0] >= bbox.x0) & (xy[:, 0] <= bbox.x1) &
+              (xy[:, 1] >= bbox.y0) & (xy[:, 1] <= bbox.y1) & (codes >= 0))
+    if priority is None:
+        order = np.flatnonzero(inside)
+    else:
+        order = np.argsort(-np.asarray(priority, dtype=float), kind="mergesort")
+        order = order[inside[order]]
+    if not len(order):
+        return order
+
+    cell_width = max(width[order].max(), 1.)
+    cell_height = max(height[order].max(), 1.)
+    first = np.floor(boxes[:, :2] / [cell_width, cell_height]).astype(int)
+    last = np.floor(boxes[:, 2:] / [cell_width, cell_height]).astype(int)
+    boxes, first, last = boxes.tolist(), first.tolist(), last.tolist()
+
+    cells = {}
+    keep = []
+    for i in order.tolist():
+        bx0, by0, bx1, by1 = boxes[i]
+        keys = [(cx, cy) for cx in range(first[i][0], last[i][0] + 1)
+                for cy in range(first[i][1], last[i][1] + 1)]
+        collides = False
+        for key in keys:
+            for j in cells.get(key, ()):
+                other = boxes[j]
+                if (other[0] < bx1 and bx0 < other[2] and
+                        other[1] < by1 and by0 < other[3]):
+                    collides = True
+                    break
+            if collides:
+                break
+        if not collides:
+            keep.append(i)
+            for key in keys:
+                cells.setdefault(key, []).append(i)
+    return np.array(sorted(keep), dtype=np.intp)
@@ -1,31 +1,46 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 from .geom import geom
+from ggplot.components import groups
 
 
 class geom_tile(geom):
+    """Heatmap of `fill` over the levels of x and y
+
+    x and y are factorized once and the fill values are scattered into a
+    dense grid (one row per y level, one column per x level), which is
+    drawn as one image; missing combinations are left empty. If a
+    combination occurs more than once, the last value is used.
+    """
     VALID_AES = ['x', 'y', 'fill']
 
-    def plot_layer(self, layer):
-        layer = dict((k, v) for k, v in layer.iteritems() if k in self.VALID_AES)
+    def compute_layer(self, layer):
+        layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
-        x = layer.pop('x')
-        y = layer.pop('y')
-        fill = layer.pop('fill')
-        X = pd.DataFrame({'x': x,
-                          'y': y,
-                          'fill': fill}).set_index(['x', 'y']).unstack(0)
-        x_ticks = range(0, len(set(x)))
-        y_ticks = range(0, len(set(y)))
+        x_codes, x_levels = groups.factorize(layer.pop('x'))
+        y_codes, y_levels = groups.factorize(layer.pop('y'))
+        fill = np.asarray(layer.pop('fill'), dtype=float)
+        grid = np.full((len(y_levels), len(x_levels)), np.nan)
+        valid = (x_codes >= 0) & (y_codes >= 0)
+        grid[y_codes[valid], x_codes[valid]] = fill[valid]
+        layer['grid'] = grid
+        layer['x_levels'] = x_levels
+        layer['y_levels'] = y_levels
+        return layer
+
+    def plot_layer(self, layer, ax, settings):
+        layer = dict(layer)
+        grid = layer.pop('grid')
+        x_levels = layer.pop('x_levels')
+        y_levels = layer.pop('y_levels')
 
-        plt.imshow(X, interpolation='nearest', **layer)
+        ax.imshow(np.ma.masked_invalid(grid), interpolation='nearest',
+                  **layer)
         return [
-            {'function': 'set_xticklabels', 'args': [x]},
-            {'function': 'set_xticks', 'args': [x_ticks]},
-            {'function': 'set_yticklabels', 'args': [y]},
-            {'function': 'set_yticks', 'args': [y_ticks]}
+            {'function': 'set_xticks', 'args': [np.arange(len(x_levels))]},
+            {'function': 'set_xticklabels', 'args': [list(x_levels)]},
+            {'function': 'set_yticks', 'args': [np.arange(len(y_levels))]},
+            {'function': 'set_yticklabels', 'args': [list(y_levels)]}
         ]
@@ -1,31 +1,27 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
-from .geom import geom
+import numpy as np
+from .geom import geom, _convert_units
+from .geom_hline import _add_lines
 
 class geom_vline(geom):
+    """Vertical lines at `x`
+
+    `x` can be a list (or array) of positions; `ymin` and `ymax` are the
+    start and end of the lines as fractions of the axes height (default 0
+    and 1) and can be lists as well. All lines are drawn as one
+    LineCollection.
+    """
     VALID_AES = ['x', 'ymin', 'ymax', 'color', 'linestyle', 'alpha', 'label']
-    def plot_layer(self, layer):
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
-        if 'x' in layer:
-            x = layer.pop('x')
-        ymin, ymax = None, None
-        if 'ymin' in layer:
-            ymin = layer.pop('ymin')
-        else:
-            ymin = 0
-        if 'ymax' in layer:
-            ymax = layer.pop('ymax')
-        else:
-            ymax = 0
-        if ymin and ymax:
-            plt.axvline(x=x, ymin=ymin, ymax=ymax, **layer)
-        elif ymin:
-            plt.axvline(x=x, ymin=ymin, **layer)
-        elif ymax:
-            plt.axvline(x=x, ymax=ymax, **layer)
-        else:
-            plt.axvline(x=x, **layer)
-
-
+        x, ymin, ymax = np.broadcast_arrays(
+            _convert_units(ax.xaxis, np.atleast_1d(layer.pop('x'))),
+            layer.pop('ymin', 0.), layer.pop('ymax', 1.))
+        segments = np.stack([np.column_stack([x, ymin]),
+                             np.column_stack([x, ymax])], axis=1)
+        # x in data coordinates, y in axes coordinates
+        _add_lines(ax, segments, layer, settings, ax.get_xaxis_transform())
+        ax.update_datalim(np.column_stack([x, x]), updatey=False)
+        ax.autoscale_view(scaley=False)
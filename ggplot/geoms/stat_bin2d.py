@@ -1,23 +1,151 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
-from .geom import geom
-import pandas as pd
-
-if hasattr(plt, 'hist2d'):
-    class stat_bin2d(geom):
-        VALID_AES = ['x', 'y', 'alpha', 'label']
-
-        def plot_layer(self, layer):
-            layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
-            layer.update(self.manual_aes)
-
-            x = layer.pop('x')
-            y = layer.pop('y')
-
-            plt.hist2d(x, y, cmap=plt.cm.Blues, **layer)
-else:
-    def stat_bin2d(*args, **kwargs):
-        import matplotlib
-        print("stat_bin2d only works with newer matplotlib versions, but found only %s" %
-              matplotlib.__version__)
+import numpy as np
+from matplotlib.collections import PolyCollection
+from .geom import geom, _is_array, _merge_layers
+from ggplot.components import bins as binning, stream
+
+
+class stat_bin2d(geom):
+    """2D binning of x and y
+
+    The bins are rectangles (drawn as one image) or, with `hex=True`,
+    hexagons (drawn as one PolyCollection). Their edges are computed once
+    from all panels and layers, from `bins` (a number or (n_x, n_y),
+    default 30) or `binwidth` (a number or (width_x, width_y)); hexagons
+    use the number of bins in x direction. The layers of a panel (e.g. of
+    a mapped color) are binned together into one grid.
+
+    Each bin shows `fun` of its rows: "count" (the default, the sum of the
+    `weight` aes if given), "sum" or "mean" of the `z` aes. The color
+    scale (`cmap`, default "Blues") is shared by all panels. The binned
+    grid is kept in the computed layer, so it is part of the plot plan.
+    """
+    VALID_AES = ['x', 'y', 'alpha', 'label', 'weight', 'z', 'fun', 'bins',
+                 'binwidth', 'hex', 'cmap']
+
+    def combine_layers(self, layers):
+        # the bins don't depend on the discrete aes, so the layers are one
+        # grid instead of several images on top of each other
+        layers = [dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
+                  for layer in layers]
+        if len(layers) < 2:
+            return layers
+        layer = _merge_layers(layers)
+        for ae in ['alpha', 'label']:
+            if _is_array(layer.get(ae)):
+                # differed between the layers, can't be shown on one grid
+                del layer[ae]
+        return [layer]
+
+    def chunk_reducer(self, aes):
+        reducer = stream.bin_reducer(aes, [aes['x'], aes['y']],
+                                     weight=aes.get('weight'), n_bins=256,
+                                     valid_aes=self.VALID_AES)
+        return reducer, {'weight': '..count..'}
+
+    def compute_panels(self, panels):
+        layers = [dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
+                  for layers in panels for layer in layers]
+        if not layers:
+            return [[] for _ in panels]
+        options = dict(self.manual_aes)
+        bins = _pair(options.pop('bins', 30))
+        binwidth = _pair(options.pop('binwidth', None))
+        fun = options.pop('fun', "count")
+        hexagons = options.pop('hex', False)
+        for layer in layers:
+            layer.update(options)
+        x = [np.asarray(layer.pop('x'), dtype=float) for layer in layers]
+        y = [np.asarray(layer.pop('y'), dtype=float) for layer in layers]
+        all_x, all_y = np.concatenate(x), np.concatenate(y)
+
+        if hexagons:
+            xlim, ylim = _limits(all_x), _limits(all_y)
+            for layer, x_l, y_l in zip(layers, x, y):
+                codes, centers, size = binning.hex_index(x_l, y_l, xlim, ylim,
+                                                         bins[0])
+                values = binning.summarize(codes, len(centers),
+                                           layer.pop('weight', None),
+                                           layer.pop('z', None), fun)
+                # empty hexagons are not drawn
+                filled = np.bincount(codes[codes >= 0],
+                                     minlength=len(centers)) > 0
+                layer['centers'] = centers[filled]
+                layer['values'] = values[filled]
+                layer['hex_size'] = size
+        else:
+            xedges = binning.bin_edges(all_x, binwidth[0], bins[0])
+            yedges = binning.bin_edges(all_y, binwidth[1], bins[1])
+            n_x, n_y = len(xedges) - 1, len(yedges) - 1
+            for layer, x_l, y_l in zip(layers, x, y):
+                ix = binning.bin_index(x_l, xedges)
+                iy = binning.bin_index(y_l, yedges)
+                codes = np.where((ix >= 0) & (iy >= 0), iy * n_x + ix, -1)
+                values = binning.summarize(codes, n_x * n_y,
+                                           layer.pop('weight', None),
+                                           layer.pop('z', None), fun)
+                values = values.reshape(n_y, n_x)
+                if fun != "mean":
+                    # empty bins are not drawn
+                    counts = np.bincount(codes[codes >= 0],
+                                         minlength=n_x * n_y)
+                    values = np.where(counts.reshape(n_y, n_x) > 0, values,
+                                      np.nan)
+                layer['xedges'] = xedges
+                layer['yedges'] = yedges
+                layer['values'] = values
+
+        # one color scale for all panels
+        finite = [layer['values'][np.isfinite(layer['values'])]
+                  for layer in layers]
+        finite = np.concatenate(finite)
+        vmin, vmax = (finite.min(), finite.max()) if len(finite) else (0, 1)
+        if fun != "mean":
+            # like the empty bins of a 2D histogram, the scale starts at 0
+            vmin = min(vmin, 0)
+        for layer in layers:
+            layer['vmin'] = vmin
+            layer['vmax'] = vmax
+        computed = iter(layers)
+        return [[next(computed) for _ in layers] for layers in panels]
+
+    def plot_layer(self, layer, ax, settings):
+        layer = dict(layer)
+        layer.setdefault('cmap', "Blues")
+        values = layer.pop('values')
+        if 'centers' in layer:
+            centers = layer.pop('centers')
+            width, height = layer.pop('hex_size')
+            hexagon = np.array([[.5, -.5], [.5, .5], [0., 1.], [-.5, .5],
+                                [-.5, -.5], [0., -1.]]) * [width, height / 3]
+            polygons = centers[:, None, :] + hexagon[None, :, :]
+            vmin, vmax = layer.pop('vmin'), layer.pop('vmax')
+            collection = PolyCollection(polygons, edgecolors="face",
+                                        **layer)
+            collection.set_array(values)
+            collection.set_clim(vmin, vmax)
+            ax.add_collection(collection)
+            if len(centers):
+                ax.update_datalim(polygons.reshape(-1, 2))
+            ax.autoscale_view()
+        else:
+            xedges = layer.pop('xedges')
+            yedges = layer.pop('yedges')
+            ax.imshow(np.ma.masked_invalid(values), origin="lower",
+                      extent=(xedges[0], xedges[-1], yedges[0], yedges[-1]),
+                      aspect="auto", interpolation="nearest", **layer)
+
+
+def _pair(value):
+    """Returns (value, value) for a single value and pairs unchanged"""
+    if isinstance(value, (tuple, list)):
+        return tuple(value)
+    return value, value
+
+
+def _limits(values):
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return 0., 1.
+    return values.min(), values.max()
@@ -1,6 +1,5 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
 import matplotlib.mlab as mlab
 from .geom import geom
 import pandas as pd
@@ -103,7 +102,7 @@ class stat_function(geom):
     VALID_AES = ['x','fun','n','color','args']
     REQUIRED_AES = ['x','fun']
 
-    def plot_layer(self, layer):
+    def plot_layer(self, layer, ax, settings):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
@@ -133,6 +132,6 @@ class stat_function(geom):
         y_values = list(map(fun,x_values))
 
         if color:
-            plt.plot(x_values,y_values,color=color)
+            ax.plot(x_values,y_values,color=color)
         else:
-            plt.plot(x_values,y_values)
+            ax.plot(x_values,y_values)
@@ -1,16 +1,26 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
-import matplotlib.pyplot as plt
 from copy import deepcopy
 from .geom import geom
 import pandas as pd
 import numpy as np
-from ggplot.components import smoothers
+from ggplot.components import smoothers, stream
 
 class stat_smooth(geom):
-    VALID_AES = ['x', 'y', 'color', 'alpha', 'label', 'se', 'linestyle', 'method', 'span', 'level', 'window']
+    VALID_AES = ['x', 'y', 'color', 'alpha', 'label', 'se', 'linestyle', 'method', 'span', 'level', 'window',
+                 'weight']
 
-    def plot_layer(self, layer):
+    def chunk_reducer(self, aes):
+        # only the moving average can be computed from the binned means, the
+        # other methods use a sample. The window counts rows, so the number
+        # of rows of each bin is its weight.
+        if self.manual_aes.get('method') != "ma":
+            return None
+        reducer = stream.bin_reducer(aes, [aes['x']], mean=aes['y'],
+                                     valid_aes=self.VALID_AES)
+        return reducer, {'weight': '..count..'}
+
+    def compute_layer(self, layer):
         layer = dict((k, v) for k, v in layer.items() if k in self.VALID_AES)
         layer.update(self.manual_aes)
 
@@ -26,8 +36,12 @@ class stat_smooth(geom):
             span = layer.pop('span')
         else:
             span = 2/3.
+        # the number of rows of each value, for binned chunked data
+        weight = layer.pop('weight', None)
         if 'window' in layer:
             window = layer.pop('window')
+        elif weight is not None:
+            window = int(np.ceil(np.sum(weight) / 10.0))
         else:
             window = int(np.ceil(len(x) / 10.0))
         if 'level' in layer:
@@ -46,9 +60,21 @@ class stat_smooth(geom):
         if method == "lm":
             y, y1, y2 = smoothers.lm(x, y, 1-level)
         elif method == "ma":
-            y, y1, y2 = smoothers.mavg(x, y, window=window)
+            if weight is not None:
+                weight = np.asarray(weight, dtype=float)[idx]
+            y, y1, y2 = smoothers.mavg(x, y, window=window, weights=weight)
         else:
             y, y1, y2 = smoothers.lowess(x, y, span=span)
-        plt.plot(x, y, **layer)
+        layer.update(x=x, y=y, y1=y1, y2=y2, se=se)
+        return layer
+
+    def plot_layer(self, layer, ax, settings):
+        layer = dict(layer)
+        x = layer.pop('x')
+        y = layer.pop('y')
+        y1 = layer.pop('y1')
+        y2 = layer.pop('y2')
+        se = layer.pop('se')
+        ax.plot(x, y, **layer)
         if se==True:
-            plt.fill_between(x, y1, y2, alpha=0.2, color="grey")
+            ax.fill_between(x, y1, y2, alpha=0.2, color="grey")
@@ -5,21 +5,27 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib as mpl
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 from .components import aes, assign_visual_mapping
-from .components import colors, shapes
+from .components import colors, groups, shapes
+from .components.stream import chunked_data, sample_reducer
 from .components.legend import draw_legend
 from .geoms import *
 from .scales import *
 from .themes.theme_gray import _set_default_theme_rcparams
 from .themes.theme_gray import _theme_grey_post_plot_callback
+from .utils.cache import plot_cache, make_key
+from .utils.utils import get_subplot, render_lock
 import six
 
 __ALL__ = ["ggplot"]
 
+import ast
 import sys
 import warnings
-from copy import deepcopy
+from copy import copy, deepcopy
 
 # Show plots if in interactive mode
 if sys.flags.interactive:
@@ -42,7 +48,8 @@ class ggplot(object):
     aesthetics :  aes (ggplot.components.aes.aes)
         aesthetics of your plot
     data :  pandas DataFrame (pd.DataFrame)
-        a DataFrame with the data you want to plot
+        a DataFrame with the data you want to plot, or an iterable of
+        DataFrames (see chunked_data)
 
     Examples
     ----------
@@ -55,11 +62,13 @@ class ggplot(object):
 
     def __init__(self, aesthetics, data):
         # ggplot should just 'figure out' which is which
-        if not isinstance(data, pd.DataFrame):
+        if isinstance(data, (dict, aes)):
             aesthetics, data = data, aesthetics
 
         self.aesthetics = aesthetics
-        self.data = _apply_transforms(data, self.aesthetics)
+        # The user data is only kept by reference: the transformations are
+        # applied lazily when the data is first needed (see `data`)
+        self.data = data
 
         # defaults
         self.geoms = []
@@ -109,7 +118,7 @@ class ggplot(object):
 
     def __repr__(self):
         """Print/show the plot"""
-        figure = self.draw()
+        figure = self._cached_build().draw()
         # We're going to default to making the plot appear when __repr__ is
         # called.
         #figure.show() # doesn't work in ipython notebook
@@ -117,6 +126,157 @@ class ggplot(object):
         # TODO: We can probably get more sugary with this
         return "<ggplot: (%d)>" % self.__hash__()
 
+    def __copy__(self):
+        '''copy support for ggplot
+
+        Adding a component to a plot (`gg + geom_point()`) works on a copy of
+        the plot. That copy is shallow: all attributes (data, geoms, legend,
+        rcParams, ...) are shared with the original, so components must
+        replace an attribute instead of changing it in place.
+        '''
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        return result
+
+    @property
+    def data(self):
+        """The plot data with all aes transformations applied
+
+        Only the columns which are referenced by the aes (of the plot and of
+        the geoms without their own data) and by the facets are included.
+        The result is computed on first access and cached, and the cache is
+        shared with all copies of this plot. The cache is keyed by a
+        fingerprint of the used columns, so changes of the dataframe in place
+        are picked up.
+
+        For chunked data, this is the random sample of the data, see
+        _reduce_chunks().
+        """
+        if isinstance(self._data, chunked_data):
+            return self._reduce_chunks().data
+        columns = self._data_columns()
+        # changes of the dataframe in place are found by the fingerprints
+        fingerprints = _column_fingerprints(self._data, columns)
+        if (self._data_cache.get("columns") != columns or
+                self._data_cache.get("fingerprints") != fingerprints):
+            transforms = self._data_cache.setdefault("transforms", {})
+            self._data_cache["data"] = _apply_transforms(
+                self._data, self.aesthetics, columns, cache=transforms,
+                fingerprints=fingerprints)
+            self._data_cache["columns"] = columns
+            self._data_cache["fingerprints"] = fingerprints
+            self._data_cache["visual"] = {}
+        return self._data_cache["data"]
+
+    @data.setter
+    def data(self, data):
+        if data is None:
+            raise Exception("ggplot needs data: a DataFrame or an iterable "
+                            "of DataFrames")
+        if not isinstance(data, (pd.DataFrame, chunked_data)):
+            # an iterable of dataframes, e.g. pd.read_csv(..., chunksize=...)
+            data = chunked_data(data)
+        self._data = data
+        # a new cache: the old one is shared with the copies of this plot
+        self._data_cache = {}
+
+    def _get_visual_mapping(self, data=None):
+        """Returns the visual mapping of the plot data and adds the legends
+
+        See assign_visual_mapping. The result (and the legends) is cached
+        next to the plot data, keyed by the visual aes and the color scale,
+        so repeated draws of a plot or its copies don't recompute it.
+
+        data defaults to self.data; pass it if it is already at hand.
+        """
+        if data is None:
+            data = self.data
+        key = (tuple((ae, self.aesthetics.get(ae))
+                     for ae in ("color", "size", "shape", "linestyle")),
+               tuple(self.manual_color_list or ()))
+        try:
+            hash(key)
+        except TypeError:
+            # e.g. a list assigned to an aes, nothing we can cache
+            key = None
+        cache = self._data_cache["visual"]
+        cached = cache.get(key) if key is not None else None
+        if cached is not None and cached[0] is self.colormap:
+            _, visual, legend = cached
+            for legend_type, legend_dict in legend.items():
+                self.add_to_legend(legend_type, legend_dict)
+            return visual
+        legend_before = self.legend
+        visual = assign_visual_mapping(data, self.aesthetics, self)
+        legend = dict((legend_type, legend_dict)
+                      for legend_type, legend_dict in self.legend.items()
+                      if legend_before.get(legend_type) is not legend_dict)
+        if key is not None:
+            cache[key] = (self.colormap, visual, legend)
+        return visual
+
+    def _data_columns(self):
+        """Returns the columns of the user data which are used in this plot"""
+        mappings = [self.aesthetics]
+        mappings += [geom.aes for geom in self.geoms if geom.data is None]
+        columns = _referenced_columns(self._data, mappings)
+        for facet in self.facets:
+            if facet in self._data and facet not in columns:
+                columns.append(facet)
+        return columns
+
+    def _reduce_chunks(self):
+        """Reads the chunked data and returns a copy of the plot on its reduction
+
+        The chunks are read only once, so everything which is needed is
+        computed in that single pass: each geom with a reducer (see
+        geom.chunk_reducer()) gets the reduced data as its own data, the plot
+        data is a random sample of the used columns. The result is cached
+        and shared with all copies of this plot; a copy which needs anything
+        else (e.g. another geom with a reducer) raises an Exception.
+        """
+        stream = self._data
+        columns = self._data_columns()
+        state = self._data_cache.setdefault("chunks", {})
+        new_geoms = [geom for geom in self.geoms if geom.data is None
+                     and geom not in state.get("geoms", {})]
+        reductions = []
+        for geom in new_geoms:
+            _aes = self.aesthetics.copy()
+            _aes.update(geom.aes)
+            reduction = geom.chunk_reducer(_aes)
+            if reduction is not None:
+                reductions.append((geom, _aes) + tuple(reduction))
+        if "sample" in state:
+            if reductions or set(columns) - set(state["sample"].columns):
+                raise Exception("The chunks of the data can only be read "
+                                "once: add all geoms before the plot is drawn")
+            for geom in new_geoms:
+                state["geoms"][geom] = None
+        else:
+            sample = sample_reducer(columns, stream.sample_size, stream.seed)
+            for chunk in stream:
+                sample.update(chunk)
+                for _, _aes, reducer, _ in reductions:
+                    reducer.update(_apply_transforms(chunk, _aes))
+            reduced = {}
+            for geom, _aes, reducer, reduced_aes in reductions:
+                # a plain copy, the geom works on its own data from now on
+                reduced_geom = copy(geom)
+                reduced_geom.data = reducer.result()
+                reduced_geom.aes = dict(geom.aes, **reduced_aes)
+                reduced_geom._transform_cache = {}
+                reduced[geom] = reduced_geom
+            state["geoms"] = dict((geom, reduced.get(geom))
+                                  for geom in new_geoms)
+            state["sample"] = sample.result()
+            state["data_cache"] = {}
+        gg = copy(self)
+        gg._data = state["sample"]
+        gg._data_cache = state["data_cache"]
+        gg.geoms = [state["geoms"].get(geom) or geom for geom in self.geoms]
+        return gg
+
     def __deepcopy__(self, memo):
         '''deepcopy support for ggplot'''
         # This is a workaround as ggplot(None, None) does not really work :-(
@@ -126,295 +286,157 @@ class ggplot(object):
         result.__class__ = self.__class__
         for key, item in self.__dict__.items():
             # don't make a deepcopy of data!
-            if key == "data":
+            if key in ("_data", "_data_cache"):
                 result.__dict__[key] = self.__dict__[key]
                 continue
             result.__dict__[key] = deepcopy(self.__dict__[key], memo)
 
         return result
 
-    def draw(self):
-        # Adding rc=self.rcParams does not validate/parses the params which then
-        # throws an error during plotting!
-        with mpl.rc_context():
-            if not self.theme_applied:
-                _set_default_theme_rcparams(mpl)
-                # will be empty if no theme was applied
-            for key in six.iterkeys(self.rcParams):
-                val = self.rcParams[key]
-                # there is a bug in matplotlib which does not allow None directly
-                # https://github.com/matplotlib/matplotlib/issues/2543
-                try:
-                    if key == 'text.dvipnghack' and val is None:
-                        val = "none"
-                    mpl.rcParams[key] = val
-                except Exception as e:
-                    msg = """Setting "mpl.rcParams['%s']=%s" raised an Exception: %s""" % (key, str(val), str(e))
-                    warnings.warn(msg, RuntimeWarning)
-                    # draw is not allowed to show a plot, so we can use to result for ggsave
-                # This sets a rcparam, so we don't have to undo it after plotting
-            mpl.interactive(False)
-            if self.facet_type == "grid" and len(self.facets) > 1:
-                fig, axs = plt.subplots(self.n_high, self.n_wide,
-                                        sharex=True, sharey=True)
-                plt.subplots_adjust(wspace=.05, hspace=.05)
-            elif self.facet_type == "wrap" or len(self.facets)==1:
-                # add (more than) the needed number of subplots
-                fig, axs = plt.subplots(self.n_high, self.n_wide)
-                # there are some extra, remove the plots
-                subplots_available = self.n_wide * self.n_high
-                if self.n_dim_x:
-                    extra_subplots = subplots_available - self.n_dim_x
-                else:
-                    extra_subplots = 0
-                for extra_plot in axs.flatten()[-extra_subplots:]:
-                    extra_plot.axis('off')
-
-                # plots is a mapping from xth-plot -> subplot position
-                plots = []
-                for x in range(self.n_wide):
-                    for y in range(self.n_high):
-                        plots.append((x, y))
-                plots = sorted(plots, key=lambda x: x[1] + x[0] * self.n_high + 1)
-            else:
-                fig, axs = plt.subplots(self.n_high, self.n_wide)
-            axs = np.atleast_2d(axs)
-            # Set the default plot to the first one
-            plt.subplot(self.n_wide, self.n_high, 1)
+    def build(self):
+        """Computes everything which is needed to draw the plot
 
-            # Aes need to be initialized BEFORE we start faceting. This is b/c
-            # we want to have a consistent aes mapping across facets.
-            self.data = assign_visual_mapping(self.data, self.aesthetics, self)
+        This does all the work which only depends on the data: the aes
+        transformations, the visual mapping (and the legend), the split into
+        panels and layers and the stats of the geoms. The result can be
+        drawn as often as needed, e.g. with different sizes or formats.
 
-            # Faceting just means doing an additional groupby. The
-            # dimensions of the plot remain the same
-            if self.facets:
-                # geom_bar does not work with faceting yet
-                _check_geom_bar = lambda x :isinstance(x, geom_bar)
-                if any(map(_check_geom_bar, self.geoms)):
-                    msg = """Facetting is currently not supported with geom_bar. See
-                    https://github.com/yhat/ggplot/issues/196 for more information"""
-                    warnings.warn(msg, RuntimeWarning)
-                # the current subplot in the axs and plots
-                cntr = 0
-                #first grids: faceting with two variables and defined positions
-                if len(self.facets) == 2 and self.facet_type != "wrap":
-                    # store the extreme x and y coordinates of each pair of axes
-                    axis_extremes = np.zeros(shape=(self.n_high * self.n_wide, 4))
-                    xlab_offset = .15
-                    for _iter, (facets, frame) in enumerate(self.data.groupby(self.facets)):
-                        pos = self.facet_pairs.index(facets) + 1
-                        plt.subplot(self.n_wide, self.n_high, pos)
-                        for layer in self._get_layers(frame):
-                            for geom in self.geoms:
-                                callbacks = geom.plot_layer(layer)
-                        axis_extremes[_iter] = [min(plt.xlim()), max(plt.xlim()),
-                                                min(plt.ylim()), max(plt.ylim())]
-                    # find the grid wide data extremeties
-                    xlab_min, ylab_min = np.min(axis_extremes, axis=0)[[0, 2]]
-                    xlab_max, ylab_max = np.max(axis_extremes, axis=0)[[1, 3]]
-                    # position of vertical labels for facet grid
-                    xlab_pos = xlab_max + xlab_offset
-                    ylab_pos = ylab_max - float(ylab_max - ylab_min) / 2
-                    # This needs to enumerate all possibilities
-                    for pos, facets in enumerate(self.facet_pairs):
-                        pos += 1
-                        # Plot the top and right boxes
-                        if pos <= self.n_high: # first row
-                            plt.subplot(self.n_wide, self.n_high, pos)
-                            plt.table(cellText=[[facets[1]]], loc='top',
-                                      cellLoc='center', cellColours=[['lightgrey']])
-                        if (pos % self.n_high) == 0: # last plot in a row
-                            plt.subplot(self.n_wide, self.n_high, pos)
-                            x = max(plt.xticks()[0])
-                            y = max(plt.yticks()[0])
-                            ax = axs[pos % self.n_high][pos % self.n_wide]
-                            ax = plt.gca()
-                            ax.text(1, 0.5, facets[0],
-                                     bbox=dict(
-                                         facecolor='lightgrey',
-                                         edgecolor='black',
-                                         color='black',
-                                         width=mpl.rcParams['font.size'] * 1.65
-                                     ),
-                                     transform=ax.transAxes,
-                                     fontdict=dict(rotation=-90, verticalalignment="center", horizontalalignment='left')
-                            )
-
-                    plt.subplot(self.n_wide, self.n_high, pos)
-                    # Handle the different scale types here
-                    # (free|free_y|free_x|None) and also make sure that only the
-                    # left column gets y scales and the bottom row gets x scales
-                    scale_facet_grid(self.n_wide, self.n_high,
-                                     self.facet_pairs, self.facet_scales)
-
-                else: # now facet_wrap > 2 or facet_grid w/ only 1 facet
-                    for facet, frame in self.data.groupby(self.facets):
-                        for layer in self._get_layers(frame):
-                            for geom in self.geoms:
-                                if self.facet_type == "wrap" or 1==1:
-                                    if cntr + 1 > len(plots):
-                                        continue
-                                    pos = plots[cntr]
-                                    if pos is None:
-                                        continue
-                                    y_i, x_i = pos
-                                    pos = x_i + y_i * self.n_high + 1
-                                    ax = plt.subplot(self.n_wide, self.n_high, pos)
-                                else:
-                                    ax = plt.subplot(self.n_wide, self.n_high, cntr)
-                                    # TODO: this needs some work
-                                    if (cntr % self.n_high) == -1:
-                                        plt.tick_params(axis='y', which='both',
-                                                        bottom='off', top='off',
-                                                        labelbottom='off')
-                                callbacks = geom.plot_layer(layer)
-                                if callbacks:
-                                    for callback in callbacks:
-                                        fn = getattr(ax, callback['function'])
-                                        fn(*callback['args'])
-                        title = facet
-                        if isinstance(facet, tuple):
-                            title = ", ".join(facet)
-                        plt.table(cellText=[[title]], loc='top',
-                                  cellLoc='center', cellColours=[['lightgrey']])
-                        cntr += 1
-
-                    # NOTE: Passing n_high for cols (instead of n_wide) and
-                    # n_wide for rows because in all previous calls to
-                    # plt.subplot, n_wide is passed as the number of rows, not
-                    # columns.
-                    scale_facet_wrap(self.n_wide, self.n_high, range(cntr), self.facet_scales)
-            else: # no faceting
-                for geom in self.geoms:
-                    _aes = self.aesthetics
-                    if geom.aes:
-                        # update the default mapping with the geom specific one
-                        _aes = _aes.copy()
-                        _aes.update(geom.aes)
-                    if not geom.data is None:
-                        data = _apply_transforms(geom.data, _aes)
-                        data = assign_visual_mapping(data, _aes, self)
-                    else:
-                        data = self.data
-                    for layer in self._get_layers(data, _aes):
-                        ax = plt.subplot(1, 1, 1)
-                        callbacks = geom.plot_layer(layer)
-                        if callbacks:
-                            for callback in callbacks:
-                                fn = getattr(ax, callback['function'])
-                                fn(*callback['args'])
+        Returns
+        -------
+        plan : plot_plan
+            the computed plot, see plot_plan
+        """
+        # work on a copy: the default axis labels and the legend are part of
+        # the plan, but don't change the plot
+        if isinstance(self._data, chunked_data):
+            gg = self._reduce_chunks()
+        else:
+            gg = copy(self)
+        # Aes need to be initialized BEFORE we start faceting. This is b/c
+        # we want to have a consistent aes mapping across facets.
+        data = gg.data
+        visual = gg._get_visual_mapping(data)
 
-            # Handling the details of the chart here; probably be a better
-            # way to do this...
-            if self.title:
-                if self.facets:
-                    # This is currently similar what plt.title uses
-                    plt.gcf().suptitle(self.title, verticalalignment='baseline',
-                                       fontsize=mpl.rcParams['axes.titlesize'])
-                else:
-                    plt.title(self.title)
-            if self.xlab:
-                if self.facet_type == "grid":
-                    fig.text(0.5, 0.025, self.xlab)
-                else:
-                    for ax in plt.gcf().axes:
-                        ax.set_xlabel(self.xlab)
-            if self.ylab:
-                if self.facet_type == "grid":
-                    fig.text(0.025, 0.5, self.ylab, rotation='vertical')
+        if gg.facets:
+            # Faceting just means doing an additional split of the data. The
+            # dimensions of the plot remain the same
+            facet_panels = gg._get_panels(data, facets=gg.facets,
+                                          visual=visual)
+            facets = [facet for facet, _ in facet_panels]
+            items = [[] for _ in facet_panels]
+            for geom in gg.geoms:
+                computed = geom.compute_panels(
+                    [geom.combine_layers(layers) for _, layers in facet_panels])
+                for panel_items, layers in zip(items, computed):
+                    panel_items.extend((geom, layer) for layer in layers)
+            panels = list(zip(facets, items))
+        else:
+            # geoms without their own data and aes share the same layers
+            default_layers = None
+            items = []
+            for geom in gg.geoms:
+                _aes = gg.aesthetics
+                if geom.aes:
+                    # update the default mapping with the geom specific one
+                    _aes = _aes.copy()
+                    _aes.update(geom.aes)
+                if not geom.data is None:
+                    geom_data = _apply_transforms(geom.data, _aes,
+                                                  cache=geom._transform_cache)
+                    geom_visual = assign_visual_mapping(geom_data, _aes, gg)
+                    layers = gg._get_layers(geom_data, _aes, geom_visual)
+                elif geom.aes:
+                    layers = gg._get_layers(data, _aes, visual)
                 else:
-                    for ax in plt.gcf().axes:
-                        ax.set_ylabel(self.ylab)
-            # in case of faceting, this should be applied to all axis!
-            for ax in plt.gcf().axes:
-                if self.xmajor_locator:
-                    ax.xaxis.set_major_locator(self.xmajor_locator)
-                if self.xtick_formatter:
-                    ax.xaxis.set_major_formatter(self.xtick_formatter)
-                    fig.autofmt_xdate()
-                if self.xbreaks: # xbreaks is a list manually provided
-                    ax.xaxis.set_ticks(self.xbreaks)
-                if self.xtick_labels:
-                    if isinstance(self.xtick_labels, dict):
-                        labs = []
-                        for lab in plt.xticks()[1]:
-                            lab = lab.get_text()
-                            lab = self.xtick_labels.get(lab)
-                            labs.append(lab)
-                        ax.xaxis.set_ticklabels(labs)
-                    elif isinstance(self.xtick_labels, list):
-                        ax.xaxis.set_ticklabels(self.xtick_labels)
-                if self.ytick_labels:
-                    if isinstance(self.ytick_labels, dict):
-                        labs = []
-                        for lab in plt.yticks()[1]:
-                            lab = lab.get_text()
-                            lab = self.ytick_labels.get(lab)
-                            labs.append(lab)
-                        ax.yaxis.set_ticklabels(labs)
-                    elif isinstance(self.ytick_labels, list):
-                        ax.yaxis.set_ticklabels(self.ytick_labels)
-                if self.ytick_formatter:
-                    ax.yaxis.set_major_formatter(self.ytick_formatter)
-                if self.xlimits:
-                    if not self.xbreaks and not self.xtick_labels:
-                        labs, minval, maxval= utils.calc_axis_breaks_and_limits(self.xlimits[0], self.xlimits[1])
-                        ax.xaxis.set_ticks(labs)
-                        ax.xaxis.set_ticklabels(labs)
-                    ax.set_xlim(self.xlimits)
-                if self.ylimits:
-                    if not self.ytick_labels:
-                        labs, minval, maxval= utils.calc_axis_breaks_and_limits(self.ylimits[0], self.ylimits[1])
-                        ax.yaxis.set_ticks(labs)
-                        ax.yaxis.set_ticklabels(labs)
-                    ax.set_ylim(self.ylimits)
-                if self.scale_y_reverse:
-                    ax.invert_yaxis()
-                if self.scale_x_reverse:
-                    ax.invert_xaxis()
-                if self.scale_y_log:
-                    ax.set_yscale('log', basey=self.scale_y_log)
-                if self.scale_x_log:
-                    ax.set_xscale('log', basex=self.scale_x_log)
-
-            # TODO: Having some issues here with things that shouldn't have a
-            # legend or at least shouldn't get shrunk to accomodate one. Need
-            # some sort of test in place to prevent this OR prevent legend
-            # getting set to True.
-            if self.legend:
-                # works with faceted and non-faceted plots
-                ax = axs[0][self.n_wide - 1]
-                box = ax.get_position()
-                ax.set_position([box.x0, box.y0, box.width * 0.8, box.height])
-
-                cntr = 0
-                # py3 and py2 have different sorting order in dics, so make that consistent
-                for ltype in sorted(self.legend.keys()):
-                    legend = self.legend[ltype]
-                    lname = self.aesthetics.get(ltype, ltype)
-                    new_legend = draw_legend(ax, legend, ltype, lname, cntr)
-                    ax.add_artist(new_legend)
-                    cntr += 1
+                    if default_layers is None:
+                        default_layers = gg._get_layers(data, _aes, visual)
+                    layers = default_layers
+                layers = geom.compute_panels([geom.combine_layers(layers)])[0]
+                items.extend((geom, layer) for layer in layers)
+            panels = [(None, items)]
+        return plot_plan(gg, panels)
 
-            # Finaly apply any post plot callbacks (theming, etc)
-            if self.theme_applied:
-                for ax in plt.gcf().axes:
-                    self._apply_post_plot_callbacks(ax)
-            else:
-                for ax in plt.gcf().axes:
-                    _theme_grey_post_plot_callback(ax)
+    def draw(self, pyplot=True):
+        """Draws the plot and returns the matplotlib figure
+
+        See plot_plan.draw()
+        """
+        return self.build().draw(pyplot)
 
-        return plt.gcf()
+    def _cached_build(self):
+        """Returns build(), taken from the render cache if possible"""
+        key, refs = self._cache_key()
+        plan = plot_cache.get(key)
+        if plan is None:
+            plan = self.build()
+            nbytes = sum(getattr(values, "nbytes", 0)
+                         for _, items in plan.panels
+                         for _, layer in items for values in layer.values())
+            plot_cache.put(key, plan, nbytes, refs)
+        return plan
 
-    def _get_layers(self, data=None, aes=None):
+    def _cache_key(self):
+        """Returns the key of this plot in the render cache
+
+        The key is a hash of the plot settings, the geoms and the content of
+        the used data columns (see make_key()), so a changed dataframe gets a
+        new key. Names in aes expressions which are not columns are resolved
+        in the environment of the aes.
+
+        Returns
+        -------
+        key : tuple
+            (key, refs) as returned by make_key()
+        """
+        mappings = [self.aesthetics] + [geom.aes for geom in self.geoms]
+        geoms = []
+        for geom in self.geoms:
+            state = dict((name, value) for name, value in geom.__dict__.items()
+                         if name != "data" and not name.startswith("_"))
+            if geom.data is None:
+                data = None
+            else:
+                data = _column_values(geom.data, [self.aesthetics, geom.aes])
+            geoms.append((type(geom).__module__, type(geom).__name__,
+                          state, data))
+        settings = dict((name, getattr(self, name))
+                        for name in plot_plan._SETTINGS if name != "geoms")
+        settings.update(aesthetics=dict(self.aesthetics),
+                        colormap=self.colormap, color_scale=self.color_scale,
+                        manual_color_list=self.manual_color_list)
+        if isinstance(self._data, chunked_data):
+            # the chunks can't be hashed (they are read only once)
+            data = [self._data]
+        else:
+            data = _column_values(self._data, mappings[:1] + [
+                geom.aes for geom in self.geoms if geom.data is None])
+            data += [(facet, self._data[facet]) for facet in self.facets
+                     if facet in self._data]
+        # other names in the aes expressions, e.g. `np` in "np.log(x)"
+        env = getattr(self.aesthetics, "__eval_env__", None)
+        names = []
+        for mapping in mappings:
+            for expr in mapping.values():
+                if isinstance(expr, six.string_types) and expr not in self._data:
+                    names += [name for name in _expression_names(expr)
+                              if name not in self._data]
+        variables = []
+        for name in sorted(set(names)):
+            try:
+                variables.append((name, env.namespace[name]))
+            except (AttributeError, KeyError):
+                pass
+        return make_key(settings, geoms, data, variables)
+
+    def _get_layers(self, data=None, aes=None, visual=None):
         """Get a layer to be plotted."""
-        # Use the default data and aestetics in case no specific ones are supplied
-        if data is None:
-            data = self.data
-        if aes is None:
-            aes = self.aesthetics
+        panels = self._get_panels(data, aes, visual=visual)
+        if not panels:
+            return []
+        return panels[0][1]
 
+    def _get_mapping(self, data, aes, visual):
+        """Returns a dataframe with one column per aes"""
         mapping = {}
         extra = {}
         for ae, key in aes.items():
@@ -437,42 +459,123 @@ class ggplot(object):
 
         # Overwrite the already done mappings to matplotlib understandable
         # values for color/size/etc
-        if "color" in mapping:
-            mapping['color'] = data['color_mapping']
-        if "size" in mapping:
-            mapping['size'] = data['size_mapping']
-        if "shape" in mapping:
-            mapping['shape'] = data['shape_mapping']
-        if "linestyle" in mapping:
-            mapping['linestyle'] = data['linestyle_mapping']
+        for ae in ("color", "size", "shape", "linestyle"):
+            if ae in mapping:
+                mapping[ae] = visual[ae]
 
         # Default the x and y axis labels to the name of the column
         if "x" in aes and self.xlab is None:
             self.xlab = aes['x']
         if "y" in aes and self.ylab is None:
             self.ylab = aes['y']
+        return mapping
 
-        # Automatically drop any row that has an NA value
-        mapping = mapping.dropna()
+    def _get_panels(self, data=None, aes=None, facets=None, visual=None):
+        """Splits the data into panels and each panel into layers
+
+        The rows are sorted once by the facets and the discrete aes, so that
+        each panel and each layer is a contiguous slice of the same sorted
+        arrays.
+
+        Parameters
+        ----------
+        data : DataFrame
+            the data to split (defaults to the plot data)
+        aes : aesthetics
+            the aes mapping (defaults to the plot aes)
+        facets : list
+            the columns of data to facet by
+        visual : dict
+            the visual mapping of data, as returned by assign_visual_mapping;
+            computed if not given
+
+        Returns
+        -------
+        panels : list of (facet, layers) tuples
+            facet is the facet value (a tuple for several facets) and layers
+            the list of layers in this panel; without facets, there is
+            exactly one panel
+        """
+        # Use the default data and aestetics in case no specific ones are supplied
+        if data is None:
+            data = self.data
+        if aes is None:
+            aes = self.aesthetics
+        facets = facets or []
+        if visual is None:
+            visual = assign_visual_mapping(data, aes, self)
+
+        mapping = self._get_mapping(data, aes, visual)
+        n_rows = len(mapping)
+
+        # Each panel gets a code, which is the first part of the sort key
+        facet_codes, facet_levels = [], []
+        for facet in facets:
+            codes, levels = groups.factorize(data[facet].values)
+            facet_codes.append(codes)
+            facet_levels.append(levels)
+        facet_sizes = [len(levels) for levels in facet_levels]
+        panel_codes, n_panels = groups.combine_codes(facet_codes, facet_sizes,
+                                                     n_rows)
+        if not facets:
+            panel_ids = [0]
+        elif n_panels == 0:
+            panel_ids = []
+        else:
+            # a panel is shown even if all of its rows are dropped below
+            present = np.bincount(panel_codes[panel_codes >= 0],
+                                  minlength=n_panels)
+            panel_ids = np.flatnonzero(present)
 
-        discrete_aes = [ae for ae in self.DISCRETE if ae in mapping]
         # TODO: it think this infomation should better be passed in to the plot_layer() and should be based whether the variable is a factor or not
         # -> Use dtypes = object/string or in case we use a proper "factor" function -> compute the levels over the whole dataframe in case of faceting!
-        # TODO: It would be nice if the plot_layer() methods could get a dataframe in case some munging is required
         # TODO: maybe change this to pass in the complete dataframe for the layer and let the plot_layer function work out that it has to plot each series differently.
-        layers = []
-        if len(discrete_aes) == 0:
-            frame = mapping.to_dict('list')
-            layers.append(frame)
-        else:
-            for name, frame in mapping.groupby(discrete_aes):
-                frame = frame.to_dict('list')
-                for ae in self.DISCRETE:
-                    if ae in frame:
-                        frame[ae] = frame[ae][0]
-                layers.append(frame)
+        discrete_aes = [ae for ae in self.DISCRETE if ae in mapping]
+        key_codes, key_sizes = [panel_codes], [n_panels]
+        for ae in discrete_aes:
+            codes, levels = groups.factorize(mapping[ae].values)
+            key_codes.append(codes)
+            key_sizes.append(len(levels))
+        keys, n_keys = groups.combine_codes(key_codes, key_sizes, n_rows)
+        # Automatically drop any row that has an NA value
+        keys[mapping.isnull().values.any(axis=1)] = -1
 
-        return layers
+        # the one and only sort, afterwards everything is a slice
+        order, offsets, group_keys = groups.sorted_groups(keys)
+        columns = _frame_to_layer(mapping)
+        if len(order) != n_rows or facets or discrete_aes:
+            columns = dict((ae, values.take(order))
+                           for ae, values in columns.items())
+
+        layers_per_panel = n_keys // max(n_panels, 1)
+        panels = []
+        layers = {}
+        for i, key in enumerate(group_keys):
+            layer = dict((ae, values[offsets[i]:offsets[i + 1]])
+                         for ae, values in columns.items())
+            for ae in discrete_aes:
+                layer[ae] = layer[ae][0]
+            layers.setdefault(key // layers_per_panel, []).append(layer)
+        for panel_id in panel_ids:
+            if facets:
+                facet = tuple(levels[code] for levels, code in
+                              zip(facet_levels,
+                                  np.unravel_index(panel_id, facet_sizes)))
+            else:
+                # the single panel of an unfaceted plot
+                facet = ()
+            if len(facet) == 1:
+                facet = facet[0]
+            panel_layers = layers.get(panel_id)
+            if panel_layers is None:
+                panel_layers = []
+                if not discrete_aes:
+                    # an empty layer, like the non-empty case a single one
+                    panel_layers.append(dict((ae, values[:0])
+                                             for ae, values in columns.items()))
+            panels.append((facet, panel_layers))
+
+        return panels
 
 
     def add_to_legend(self, legend_type, legend_dict, scale_type="discrete"):
@@ -499,13 +602,408 @@ class ggplot(object):
             pass
             #msg = "Adding a secondary mapping of {0} is unsupported and no legend for this mapping is added.\n"
             #sys.stderr.write(msg.format(str(legend_type)))
-        self.legend[legend_type] = legend_dict
+        # the legend dict may be shared with other ggplot objects (see
+        # __copy__), so never change it in place
+        legend = self.legend.copy()
+        legend[legend_type] = legend_dict
+        self.legend = legend
+
+
+class plot_plan(object):
+    """A computed plot, ready to be drawn
+
+    A plot plan is returned by ggplot.build() and contains the final layer
+    arrays of each panel, the legend and the scale and theme settings of
+    the plot, but not the plot data. Drawing it only does the matplotlib
+    work, so the same plan can be drawn many times (or pickled and drawn
+    in another process).
+
+    Attributes
+    ----------
+    panels : list of (facet, items) tuples
+        facet is the facet value of the panel (None without facets) and
+        items a list of (geom, layer) tuples in drawing order; the layers
+        are the result of geom.compute_layer()
+    geoms : list
+        the geoms of the plot
+    legend : dict
+        the legend entries, see ggplot.add_to_legend()
+    legend_names : dict
+        the title of each legend
+    """
+
+    # the settings of a ggplot which are needed to draw it
+    _SETTINGS = ["geoms", "n_wide", "n_high", "n_dim_x", "n_dim_y",
+                 "facets", "facet_type", "facet_scales", "facet_pairs",
+                 "title", "xlab", "ylab", "xtick_formatter", "xbreaks",
+                 "xtick_labels", "xmajor_locator", "xminor_locator",
+                 "ytick_formatter", "xlimits", "ylimits", "ytick_labels",
+                 "scale_y_reverse", "scale_x_reverse", "scale_y_log",
+                 "scale_x_log", "legend", "theme_applied", "rcParams",
+                 "post_plot_callbacks"]
+
+    def __init__(self, gg, panels):
+        for name in self._SETTINGS:
+            setattr(self, name, getattr(gg, name))
+        self.panels = panels
+        self.legend_names = dict((ltype, gg.aesthetics.get(ltype, ltype))
+                                 for ltype in self.legend)
+
+    def draw(self, pyplot=True):
+        """Draws the plot and returns the matplotlib figure
+
+        Parameters
+        ----------
+        pyplot : bool
+            if True (the default), the figure is created by pyplot, so it is
+            shown by plt.show(). Otherwise it's a figure which is unknown to
+            pyplot; such figures can be drawn from several threads.
+        """
+        settings = render_settings(self)
+        # Adding rc=self.rcParams does not validate/parses the params which then
+        # throws an error during plotting!
+        with render_lock, mpl.rc_context():
+            mpl.rcParams.update(settings.rcParams)
+            if pyplot:
+                # draw is not allowed to show a plot, so we can use to result for ggsave
+                # This sets a rcparam, so we don't have to undo it after plotting
+                mpl.interactive(False)
+                fig = plt.figure()
+            else:
+                fig = Figure()
+                FigureCanvasAgg(fig)
+            self._draw(fig, settings)
+        return fig
+
+    def _draw(self, fig, settings):
+        if self.facet_type == "grid" and len(self.facets) > 1:
+            axs = _add_subplots(fig, self.n_wide, self.n_high, share=True)
+            fig.subplots_adjust(wspace=.05, hspace=.05)
+        elif self.facet_type == "wrap" or len(self.facets)==1:
+            # add (more than) the needed number of subplots
+            axs = _add_subplots(fig, self.n_wide, self.n_high)
+            # there are some extra, remove the plots
+            subplots_available = self.n_wide * self.n_high
+            if self.n_dim_x:
+                extra_subplots = subplots_available - self.n_dim_x
+            else:
+                extra_subplots = 0
+            if extra_subplots > 0:
+                for extra_plot in axs.flatten()[-extra_subplots:]:
+                    fig.delaxes(extra_plot)
+
+            # plots is a mapping from xth-plot -> subplot position
+            plots = []
+            for x in range(self.n_wide):
+                for y in range(self.n_high):
+                    plots.append((x, y))
+            plots = sorted(plots, key=lambda x: x[1] + x[0] * self.n_high + 1)
+        else:
+            axs = _add_subplots(fig, self.n_wide, self.n_high)
+        # Set the default plot to the first one
+        ax = get_subplot(fig, self.n_wide, self.n_high, 1)
+
+        if self.facets:
+            # geom_bar does not work with faceting yet
+            _check_geom_bar = lambda x :isinstance(x, geom_bar)
+            if any(map(_check_geom_bar, self.geoms)):
+                msg = """Facetting is currently not supported with geom_bar. See
+                https://github.com/yhat/ggplot/issues/196 for more information"""
+                warnings.warn(msg, RuntimeWarning)
+            # the current subplot in the axs and plots
+            cntr = 0
+            #first grids: faceting with two variables and defined positions
+            if len(self.facets) == 2 and self.facet_type != "wrap":
+                # store the extreme x and y coordinates of each pair of axes
+                axis_extremes = np.zeros(shape=(self.n_high * self.n_wide, 4))
+                xlab_offset = .15
+                for _iter, (facets, items) in enumerate(self.panels):
+                    pos = self.facet_pairs.index(facets) + 1
+                    ax = get_subplot(fig, self.n_wide, self.n_high, pos)
+                    for geom, layer in items:
+                        callbacks = geom.plot_layer(layer, ax, settings)
+                    axis_extremes[_iter] = [min(ax.get_xlim()), max(ax.get_xlim()),
+                                            min(ax.get_ylim()), max(ax.get_ylim())]
+                # find the grid wide data extremeties
+                xlab_min, ylab_min = np.min(axis_extremes, axis=0)[[0, 2]]
+                xlab_max, ylab_max = np.max(axis_extremes, axis=0)[[1, 3]]
+                # position of vertical labels for facet grid
+                xlab_pos = xlab_max + xlab_offset
+                ylab_pos = ylab_max - float(ylab_max - ylab_min) / 2
+                # This needs to enumerate all possibilities
+                for pos, facets in enumerate(self.facet_pairs):
+                    pos += 1
+                    # Plot the top and right boxes
+                    if pos <= self.n_high: # first row
+                        ax = get_subplot(fig, self.n_wide, self.n_high, pos)
+                        ax.table(cellText=[[facets[1]]], loc='top',
+                                 cellLoc='center', cellColours=[['lightgrey']])
+                    if (pos % self.n_high) == 0: # last plot in a row
+                        ax = get_subplot(fig, self.n_wide, self.n_high, pos)
+                        ax.text(1, 0.5, facets[0],
+                                 bbox=dict(
+                                     facecolor='lightgrey',
+                                     edgecolor='black',
+                                     color='black',
+                                     width=settings.get('font.size') * 1.65
+                                 ),
+                                 transform=ax.transAxes,
+                                 fontdict=dict(rotation=-90, verticalalignment="center", horizontalalignment='left')
+                        )
+
+                ax = get_subplot(fig, self.n_wide, self.n_high, pos)
+                # Handle the different scale types here
+                # (free|free_y|free_x|None) and also make sure that only the
+                # left column gets y scales and the bottom row gets x scales
+                scale_facet_grid(fig, self.n_wide, self.n_high,
+                                 self.facet_pairs, self.facet_scales)
+
+            else: # now facet_wrap > 2 or facet_grid w/ only 1 facet
+                for facet, items in self.panels:
+                    for geom, layer in items:
+                        if self.facet_type == "wrap" or 1==1:
+                            if cntr + 1 > len(plots):
+                                continue
+                            pos = plots[cntr]
+                            if pos is None:
+                                continue
+                            y_i, x_i = pos
+                            pos = x_i + y_i * self.n_high + 1
+                            ax = get_subplot(fig, self.n_wide, self.n_high, pos)
+                        else:
+                            ax = get_subplot(fig, self.n_wide, self.n_high, cntr)
+                            # TODO: this needs some work
+                            if (cntr % self.n_high) == -1:
+                                ax.tick_params(axis='y', which='both',
+                                               bottom='off', top='off',
+                                               labelbottom='off')
+                        callbacks = geom.plot_layer(layer, ax, settings)
+                        if callbacks:
+                            for callback in callbacks:
+                                fn = getattr(ax, callback['function'])
+                                fn(*callback['args'])
+                    title = facet
+                    if isinstance(facet, tuple):
+                        title = ", ".join(facet)
+                    ax.table(cellText=[[title]], loc='top',
+                             cellLoc='center', cellColours=[['lightgrey']])
+                    cntr += 1
+
+                # NOTE: Passing n_high for cols (instead of n_wide) and
+                # n_wide for rows because in all previous calls to
+                # get_subplot, n_wide is passed as the number of rows, not
+                # columns.
+                scale_facet_wrap(fig, self.n_wide, self.n_high, range(cntr), self.facet_scales)
+        else: # no faceting
+            for geom, layer in self.panels[0][1]:
+                ax = get_subplot(fig, 1, 1, 1)
+                callbacks = geom.plot_layer(layer, ax, settings)
+                if callbacks:
+                    for callback in callbacks:
+                        fn = getattr(ax, callback['function'])
+                        fn(*callback['args'])
+
+        # Handling the details of the chart here; probably be a better
+        # way to do this...
+        if self.title:
+            if self.facets:
+                # This is currently similar what plt.title uses
+                fig.suptitle(self.title, verticalalignment='baseline',
+                             fontsize=settings.get('axes.titlesize'))
+            else:
+                ax.set_title(self.title)
+        if self.xlab:
+            if self.facet_type == "grid":
+                fig.text(0.5, 0.025, self.xlab)
+            else:
+                for ax in fig.axes:
+                    ax.set_xlabel(self.xlab)
+        if self.ylab:
+            if self.facet_type == "grid":
+                fig.text(0.025, 0.5, self.ylab, rotation='vertical')
+            else:
+                for ax in fig.axes:
+                    ax.set_ylabel(self.ylab)
+        # in case of faceting, this should be applied to all axis!
+        for ax in fig.axes:
+            if self.xmajor_locator:
+                ax.xaxis.set_major_locator(self.xmajor_locator)
+            if self.xtick_formatter:
+                ax.xaxis.set_major_formatter(self.xtick_formatter)
+                fig.autofmt_xdate()
+            if self.xbreaks: # xbreaks is a list manually provided
+                ax.xaxis.set_ticks(self.xbreaks)
+            if self.xtick_labels:
+                if isinstance(self.xtick_labels, dict):
+                    labs = []
+                    for lab in ax.get_xticklabels():
+                        lab = lab.get_text()
+                        lab = self.xtick_labels.get(lab)
+                        labs.append(lab)
+                    ax.xaxis.set_ticklabels(labs)
+                elif isinstance(self.xtick_labels, list):
+                    ax.xaxis.set_ticklabels(self.xtick_labels)
+            if self.ytick_labels:
+                if isinstance(self.ytick_labels, dict):
+                    labs = []
+                    for lab in ax.get_yticklabels():
+                        lab = lab.get_text()
+                        lab = self.ytick_labels.get(lab)
+                        labs.append(lab)
+                    ax.yaxis.set_ticklabels(labs)
+                elif isinstance(self.ytick_labels, list):
+                    ax.yaxis.set_ticklabels(self.ytick_labels)
+            if self.ytick_formatter:
+                ax.yaxis.set_major_formatter(self.ytick_formatter)
+            if self.xlimits:
+                if not self.xbreaks and not self.xtick_labels:
+                    labs, minval, maxval= utils.calc_axis_breaks_and_limits(self.xlimits[0], self.xlimits[1])
+                    ax.xaxis.set_ticks(labs)
+                    ax.xaxis.set_ticklabels(labs)
+                ax.set_xlim(self.xlimits)
+            if self.ylimits:
+                if not self.ytick_labels:
+                    labs, minval, maxval= utils.calc_axis_breaks_and_limits(self.ylimits[0], self.ylimits[1])
+                    ax.yaxis.set_ticks(labs)
+                    ax.yaxis.set_ticklabels(labs)
+                ax.set_ylim(self.ylimits)
+            if self.scale_y_reverse:
+                ax.invert_yaxis()
+            if self.scale_x_reverse:
+                ax.invert_xaxis()
+            if self.scale_y_log:
+                ax.set_yscale('log', basey=self.scale_y_log)
+            if self.scale_x_log:
+                ax.set_xscale('log', basex=self.scale_x_log)
+
+        # TODO: Having some issues here with things that shouldn't have a
+        # legend or at least shouldn't get shrunk to accomodate one. Need
+        # some sort of test in place to prevent this OR prevent legend
+        # getting set to True.
+        # faceted plots never got a visible legend: plt.subplot() replaced
+        # the subplot it was drawn on
+        if self.legend and not self.facets:
+            ax = axs[0][-1]
+            box = ax.get_position()
+            ax.set_position([box.x0, box.y0, box.width * 0.8, box.height])
+
+            cntr = 0
+            # py3 and py2 have different sorting order in dics, so make that consistent
+            for ltype in sorted(self.legend.keys()):
+                legend = self.legend[ltype]
+                lname = self.legend_names[ltype]
+                new_legend = draw_legend(ax, legend, ltype, lname, cntr)
+                ax.add_artist(new_legend)
+                cntr += 1
+
+        # Finaly apply any post plot callbacks (theming, etc)
+        if self.theme_applied:
+            for ax in fig.axes:
+                self._apply_post_plot_callbacks(ax)
+        else:
+            for ax in fig.axes:
+                _theme_grey_post_plot_callback(ax)
 
     def _apply_post_plot_callbacks(self, axis):
         for cb in self.post_plot_callbacks:
             cb(axis)
 
 
+class render_settings(object):
+    """The settings of one drawing of a plot
+
+    The geoms and scales get these settings instead of reading them from the
+    global matplotlib state.
+
+    Attributes
+    ----------
+    rcParams : RcParams
+        the (validated) matplotlib settings of the plot's theme, which are
+        used on top of the global matplotlib settings
+    """
+
+    def __init__(self, plan):
+        # the themes set their rcParams as strings
+        self.rcParams = {}
+        if not plan.theme_applied:
+            _set_default_theme_rcparams(self)
+        self.rcParams.update(plan.rcParams)
+        params, self.rcParams = self.rcParams, mpl.RcParams()
+        for key in six.iterkeys(params):
+            val = params[key]
+            # there is a bug in matplotlib which does not allow None directly
+            # https://github.com/matplotlib/matplotlib/issues/2543
+            try:
+                if key == 'text.dvipnghack' and val is None:
+                    val = "none"
+                self.rcParams[key] = val
+            except Exception as e:
+                msg = """Setting "mpl.rcParams['%s']=%s" raised an Exception: %s""" % (key, str(val), str(e))
+                warnings.warn(msg, RuntimeWarning)
+
+    def get(self, key, default=None):
+        """Returns a matplotlib setting of this drawing"""
+        if key in self.rcParams:
+            return self.rcParams[key]
+        return mpl.rcParams.get(key, default)
+
+
+def _add_subplots(fig, rows, cols, share=False):
+    """Adds a grid of subplots to fig, like plt.subplots() does
+
+    Returns
+    -------
+    axs : array
+        2D array (rows x cols) of the subplots
+    """
+    axs = np.empty((rows, cols), dtype=object)
+    for row in range(rows):
+        for col in range(cols):
+            kwargs = {}
+            if share and (row, col) != (0, 0):
+                kwargs = dict(sharex=axs[0, 0], sharey=axs[0, 0])
+            axs[row, col] = fig.add_subplot(rows, cols, row * cols + col + 1,
+                                            **kwargs)
+    if share:
+        # only the outer subplots get tick labels
+        for ax in axs[:-1, :].flat:
+            for label in ax.get_xticklabels():
+                label.set_visible(False)
+        for ax in axs[:, 1:].flat:
+            for label in ax.get_yticklabels():
+                label.set_visible(False)
+    return axs
+
+
+def _frame_to_layer(frame):
+    """Converts a dataframe into a layer for geom.plot_layer()
+
+    A layer is a dict of {aes: array}, which holds the column arrays of the
+    frame without boxing every value into python objects. The arrays can be
+    views into the plot data, so geoms must not change them inplace.
+    """
+    layer = {}
+    for ae in frame.columns:
+        column = frame[ae]
+        if column.dtype.kind == "M":
+            # matplotlib and the geoms expect datetime objects (Timestamp),
+            # not numpy datetime64 values
+            layer[ae] = column.astype(object).values
+        else:
+            layer[ae] = column.values
+    return layer
+
+
+def _column_fingerprints(data, columns):
+    """Returns a hash of the content of each of the given columns of data"""
+    return dict((col, make_key(data[col])[0]) for col in columns)
+
+
+def _column_values(data, mappings):
+    """Returns (name, column) pairs of the columns used by the aes mappings"""
+    return [(col, data[col]) for col in _referenced_columns(data, mappings)]
+
+
 def _is_identity(x):
     if x in colors.COLORS:
         return True
@@ -517,7 +1015,80 @@ def _is_identity(x):
         return False
 
 
-def _apply_transforms(data, aes):
+def _expression_names(expr):
+    """Returns all names which are used in the python expression expr"""
+    try:
+        tree = ast.parse(expr.strip(), mode="eval")
+    except SyntaxError:
+        return []
+    return [node.id for node in ast.walk(tree) if isinstance(node, ast.Name)]
+
+
+def _referenced_columns(data, mappings):
+    """Returns the columns of data which are used in the given aes mappings
+
+    Columns can be referenced directly (`aes(x="price")`) or as part of an
+    expression (`aes(x="np.log(price)")`).
+
+    Parameters
+    ----------
+    data : DataFrame
+        the original dataframe
+    mappings : list of aesthetics or dicts
+        the aes mappings which are used on data
+
+    Returns
+    -------
+    columns : list
+        the referenced column names, in order of their first use
+    """
+    columns = []
+    for mapping in mappings:
+        for name in mapping.values():
+            if not isinstance(name, six.string_types):
+                continue
+            if name in data:
+                names = [name]
+            else:
+                names = _expression_names(name)
+            for col in names:
+                if col in data and col not in columns:
+                    columns.append(col)
+    return columns
+
+
+# compiled aes expressions, keyed by expression text and compiler flags
+_compiled_expressions = {}
+
+
+def _compile_expression(expr, flags=0):
+    """Compiles an aes expression; each expression is only compiled once"""
+    key = (expr, flags)
+    code = _compiled_expressions.get(key)
+    if code is None:
+        code = compile(expr.strip(), "<aes>", "eval", flags, False)
+        _compiled_expressions[key] = code
+    return code
+
+
+def _factor(s, levels=None, labels=None):
+    """Converts a column to a discrete variable (strings)
+
+    Only the unique values are converted to strings, all rows are filled in
+    from their categorical codes.
+    """
+    # TODO: This factor implementation needs improvements...
+    # probably only gonna happen after https://github.com/pydata/pandas/issues/5313 is
+    # implemented in pandas ...
+    if levels or labels:
+        print("factor levels or labels are not yet implemented.")
+    codes, uniques = pd.factorize(s)
+    # missing values have the code -1, which picks the last entry
+    uniques = np.array([str(u) for u in uniques] + [str(np.nan)], dtype=object)
+    return pd.Series(uniques.take(codes), index=getattr(s, "index", None))
+
+
+def _apply_transforms(data, aes, columns=None, cache=None, fingerprints=None):
     """Adds columns from the aes included transformations
 
     Possible transformations are "factor(<col>)" and
@@ -529,39 +1100,67 @@ def _apply_transforms(data, aes):
         the original dataframe
     aes : aesthetics
         the aesthetic
+    columns : list
+        the columns of data which should be included in the result;
+        defaults to the columns referenced by aes
+    cache : dict
+        cache for the evaluated expressions, keyed by the expression. An
+        entry is only reused if the columns used by the expression are
+        unchanged. The cache must only be used with this dataframe.
+    fingerprints : dict
+        the fingerprints of the columns of data (see _column_fingerprints),
+        if they are already known; missing ones are computed
 
     Returns
     -------
     data : DateFrame
-        Transformed DataFrame
+        Transformed DataFrame, which only holds the given columns and the
+        transformed ones
     """
-    data = data.copy()
+    if columns is None:
+        columns = _referenced_columns(data, [aes])
+    source = data
+    fingerprints = dict(fingerprints or {})
+    # only the used columns end up in the new dataframe
+    data = pd.DataFrame(source, columns=columns)
+    env = None
     for ae, name in aes.items():
-        if (isinstance(name, six.string_types) and (name not in data)):
+        if (isinstance(name, six.string_types) and (name not in source)):
             # here we assume that it is a transformation
             # if the mapping is to a single value (color="red"), this will be handled by pandas and
             # assigned to the whole index. See also the last case in mapping building in get_layer!
-            from patsy.eval import EvalEnvironment
-            def factor(s, levels=None, labels=None):
-                # TODO: This factor implementation needs improvements...
-                # probably only gonna happen after https://github.com/pydata/pandas/issues/5313 is
-                # implemented in pandas ...
-                if levels or labels:
-                    print("factor levels or labels are not yet implemented.")
-                return s.apply(str)
-            # use either the captured eval_env from aes or use the env one steps up
-            env = EvalEnvironment.capture(eval_env=(aes.__eval_env__ or 1))
-            # add factor as a special case
-            env.add_outer_namespace({"factor":factor})
-            try:
-                new_val = env.eval(name, inner_namespace=data)
-            except Exception as e:
-                msg = "Could not evaluate the '%s' mapping: '%s' (original error: %s)"
-                raise Exception(msg % (ae, name, str(e)))
+            if env is None:
+                from patsy.eval import EvalEnvironment
+                # use either the captured eval_env from aes or use the env one steps up
+                env = EvalEnvironment.capture(eval_env=(aes.__eval_env__ or 1))
+            cached = cache.get(name) if cache is not None else None
+            key = None
+            if cache is not None:
+                used = [col for col in _expression_names(name) if col in source]
+                missing = [col for col in used if col not in fingerprints]
+                fingerprints.update(_column_fingerprints(source, missing))
+                key = tuple((col, fingerprints[col]) for col in used)
+            # the same expression can mean something else in another env
+            # or with other data
+            if cached is not None and cached[0] is env and cached[1] == key:
+                new_val = cached[2]
+            else:
+                from patsy.eval import VarLookupDict
+                # columns first, then the env and factor as a special case
+                namespace = VarLookupDict([source, env.namespace,
+                                           {"factor": _factor}])
+                try:
+                    code = _compile_expression(name, env.flags)
+                    new_val = eval(code, {}, namespace)
+                except Exception as e:
+                    msg = "Could not evaluate the '%s' mapping: '%s' (original error: %s)"
+                    raise Exception(msg % (ae, name, str(e)))
+                if cache is not None:
+                    cache[name] = (env, key, new_val)
             try:
                 data[name] = new_val
             except Exception as e:
                 msg = """The '%s' mapping: '%s' produced a value of type '%s', but only single items
                 and lists/arrays can be used. (original error: %s)"""
-                raise Exception(msg % (ae, name, str(type(_new_val)), str(e)))
+                raise Exception(msg % (ae, name, str(type(new_val)), str(e)))
     return data
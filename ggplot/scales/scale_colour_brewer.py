@@ -1,5 +1,5 @@
 from .scale import scale
-from copy import deepcopy
+from copy import copy
 import brewer2mpl
 
 
@@ -44,7 +44,7 @@ class scale_colour_brewer(scale):
     VALID_SCALES = ['type', 'palette'] 
     
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
 
         if self.type:
             ctype = self.type
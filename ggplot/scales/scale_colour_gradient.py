@@ -1,7 +1,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from .scale import scale
-from copy import deepcopy
+from copy import copy
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap, rgb2hex, ColorConverter
 
@@ -14,7 +14,7 @@ class scale_colour_gradient(scale):
     VALID_SCALES = ['name', 'limits', 'low', 'mid', 'high']
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         if self.name:
             gg.color_label = self.name
         if self.limits:
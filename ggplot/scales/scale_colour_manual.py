@@ -1,7 +1,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from .scale import scale
-from copy import deepcopy
+from copy import copy
 
 
 class scale_colour_manual(scale):
@@ -28,7 +28,7 @@ class scale_colour_manual(scale):
     """
     VALID_SCALES = ['values']
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         if self.values:
             n_colors_needed = gg.data[gg.aesthetics['color']].nunique()
             n_colors_provided = len(self.values)
@@ -5,16 +5,18 @@ from __future__ import (absolute_import, division, print_function,
 # condensed into a lot less code, but it's working for now
 
 import numpy as np
-import matplotlib.pyplot as plt
 from .utils import calc_axis_breaks_and_limits
+from ..utils.utils import get_subplot
 import sys
 
 
-def scale_facet_wrap(rows, cols, positions, scaletype):
+def scale_facet_wrap(fig, rows, cols, positions, scaletype):
     """Set the scales on each subplot for wrapped faceting.
 
     Parameters
     ----------
+    fig : Figure
+        the figure with the subplots
     rows : int 
         number of rows in the faceted plot
     cols : int
@@ -36,7 +38,7 @@ def scale_facet_wrap(rows, cols, positions, scaletype):
         # Work on the subplot at the current position (adding 1 to pos because
         # matplotlib 1-indexes their subplots)
         
-        plt.subplot(rows, cols, pos + 1)
+        ax = get_subplot(fig, rows, cols, pos + 1)
 
         # Update the x extents for each column
 
@@ -46,7 +48,7 @@ def scale_facet_wrap(rows, cols, positions, scaletype):
             column = pos % cols
             row = int(pos / cols)
 
-        limits = plt.xlim()
+        limits = ax.get_xlim()
 
         # Get the current bounds for this column. Default lower limit is
         # infinity (because all values < infinity) and the default upper limit
@@ -64,7 +66,7 @@ def scale_facet_wrap(rows, cols, positions, scaletype):
             column = pos % cols
             row = int(pos / cols)
 
-        limits = plt.ylim()
+        limits = ax.get_ylim()
 
         # Get the current bounds for this column. Default lower limit is
         # infinity (because all values < infinity) and the default upper limit
@@ -77,7 +79,7 @@ def scale_facet_wrap(rows, cols, positions, scaletype):
         y_extents[(column, row)] = (lower, upper)
 
     for pos in positions:
-        plt.subplot(rows, cols, pos + 1)
+        ax = get_subplot(fig, rows, cols, pos + 1)
         
         row = int(pos / cols)
         column = pos % cols
@@ -104,8 +106,9 @@ def scale_facet_wrap(rows, cols, positions, scaletype):
         if scaletype in ["free", "free_x"] or pos in positions[-cols:]:
             x_labs = x_scale
 
-        plt.xticks(x_scale, x_labs)
-        plt.xlim(x_min, x_max )
+        ax.set_xticks(x_scale)
+        ax.set_xticklabels(x_labs)
+        ax.set_xlim(x_min, x_max )
 
         # Set the y-axis scale and labels
         y_scale, y_min, y_max = calc_axis_breaks_and_limits(ymin, ymax, 4)
@@ -117,21 +120,22 @@ def scale_facet_wrap(rows, cols, positions, scaletype):
         if scaletype in ["free", "free_y"] or column == 0:
             y_labs = y_scale
 
-        plt.yticks(y_scale, y_labs)
-        plt.ylim(y_min, y_max)
+        ax.set_yticks(y_scale)
+        ax.set_yticklabels(y_labs)
+        ax.set_ylim(y_min, y_max)
 
-def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
+def scale_facet_grid(fig, xdim, ydim, facet_pairs, scaletype):
     # everyone gets the same scales
     if scaletype is None:
         min_x, max_x = 999999999, -999999999
         min_y, max_y = 999999999, -999999999
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
-            min_x = min(min_x, min(plt.xlim()))
-            max_x = max(max_x, max(plt.xlim()))
-            min_y = min(min_y, min(plt.ylim()))
-            max_y = max(max_y, max(plt.ylim()))
+            ax = get_subplot(fig, xdim, ydim, pos)
+            min_x = min(min_x, min(ax.get_xlim()))
+            max_x = max(max_x, max(ax.get_xlim()))
+            min_y = min(min_y, min(ax.get_ylim()))
+            max_y = max(max_y, max(ax.get_ylim()))
 
         y_scale, y_min, y_max = calc_axis_breaks_and_limits(min_y, max_y, 4)
         y_scale = np.round(y_scale, 2)
@@ -141,19 +145,21 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
         # for all axis set the individual axis limits and ticks
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
+            ax = get_subplot(fig, xdim, ydim, pos)
 
             y_labs = y_scale
             if pos % ydim!=1:
                 y_labs = []
-            plt.yticks(y_scale, y_labs)
-            plt.ylim(y_min, y_max)
+            ax.set_yticks(y_scale)
+            ax.set_yticklabels(y_labs)
+            ax.set_ylim(y_min, y_max)
             
             x_labs = x_scale
             if pos <= (len(facet_pairs) - ydim):
                 x_labs = []
-            plt.xticks(x_scale, x_labs)
-            plt.xlim(x_min, x_max)
+            ax.set_xticks(x_scale)
+            ax.set_xticklabels(x_labs)
+            ax.set_xlim(x_min, x_max)
 
     elif scaletype=="free_y":
         min_x, max_x = 999999999, -999999999
@@ -161,21 +167,21 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
 
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
+            ax = get_subplot(fig, xdim, ydim, pos)
             
             y_bucket = int((pos-1) / ydim)
 
             min_ys[y_bucket] = min_ys.get(y_bucket, 999999999)
             max_ys[y_bucket] = max_ys.get(y_bucket, -999999999)
 
-            min_x = min(min_x, min(plt.xlim()))
-            max_x = max(max_x, max(plt.xlim()))
-            min_ys[y_bucket] = min(min_ys[y_bucket], min(plt.ylim()))
-            max_ys[y_bucket] = max(max_ys[y_bucket], max(plt.ylim()))
+            min_x = min(min_x, min(ax.get_xlim()))
+            max_x = max(max_x, max(ax.get_xlim()))
+            min_ys[y_bucket] = min(min_ys[y_bucket], min(ax.get_ylim()))
+            max_ys[y_bucket] = max(max_ys[y_bucket], max(ax.get_ylim()))
         
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
+            ax = get_subplot(fig, xdim, ydim, pos)
             
             y_bucket = int((pos-1) / ydim)
 
@@ -184,16 +190,18 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
             y_labs = y_scale
             if pos % ydim!=1:
                 y_labs = []
-            plt.yticks(y_scale, y_labs)
-            plt.ylim(y_min, y_max)
+            ax.set_yticks(y_scale)
+            ax.set_yticklabels(y_labs)
+            ax.set_ylim(y_min, y_max)
             
             x_scale, x_min, x_max = calc_axis_breaks_and_limits(min_x, max_x, 4)
             x_scale = np.round(x_scale, 2)
             x_labs = x_scale
             if pos <= (len(facet_pairs) - ydim):
                 x_labs = []
-            plt.xticks(x_scale, x_labs)
-            plt.xlim(x_min, x_max)
+            ax.set_xticks(x_scale)
+            ax.set_xticklabels(x_labs)
+            ax.set_xlim(x_min, x_max)
 
     elif scaletype=="free_x":
         min_y, max_y = 999999999, -999999999
@@ -201,21 +209,21 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
 
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
+            ax = get_subplot(fig, xdim, ydim, pos)
             
             x_bucket = int((pos-1) / xdim)
 
             min_xs[x_bucket] = min_xs.get(x_bucket, 999999999)
             max_xs[x_bucket] = max_xs.get(x_bucket, -999999999)
 
-            min_y = min(min_y, min(plt.ylim()))
-            max_y = max(max_y, max(plt.ylim()))
-            min_xs[x_bucket] = min(min_xs[x_bucket], min(plt.xlim()))
-            max_xs[x_bucket] = max(max_xs[x_bucket], max(plt.xlim()))
+            min_y = min(min_y, min(ax.get_ylim()))
+            max_y = max(max_y, max(ax.get_ylim()))
+            min_xs[x_bucket] = min(min_xs[x_bucket], min(ax.get_xlim()))
+            max_xs[x_bucket] = max(max_xs[x_bucket], max(ax.get_xlim()))
         
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
+            ax = get_subplot(fig, xdim, ydim, pos)
             
             x_bucket = int((pos-1) / xdim)
 
@@ -224,16 +232,18 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
             x_labs = x_scale
             if pos <= ((len(facet_pairs) - ydim)):
                 x_labs = []
-            plt.xticks(x_scale, x_labs)
-            plt.xlim(x_min, x_max)
+            ax.set_xticks(x_scale)
+            ax.set_xticklabels(x_labs)
+            ax.set_xlim(x_min, x_max)
 
             y_scale, y_min, y_max = calc_axis_breaks_and_limits(min_y, max_y, 4)
             y_scale = np.round(y_scale, 2)
             y_labs = y_scale
             if pos % ydim!=1:
                 y_labs = []
-            plt.yticks(y_scale, y_labs)
-            plt.ylim(y_min, y_max)
+            ax.set_yticks(y_scale)
+            ax.set_yticklabels(y_labs)
+            ax.set_ylim(y_min, y_max)
     
     else:
         min_xs, max_xs = {}, {}
@@ -241,25 +251,25 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
 
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
+            ax = get_subplot(fig, xdim, ydim, pos)
             
             x_bucket = int((pos-1) / xdim)
             min_xs[x_bucket] = min_xs.get(x_bucket, 999999999)
             max_xs[x_bucket] = max_xs.get(x_bucket, -999999999)
 
-            min_xs[x_bucket] = min(min_xs[x_bucket], min(plt.xlim()))
-            max_xs[x_bucket] = max(max_xs[x_bucket], max(plt.xlim()))
+            min_xs[x_bucket] = min(min_xs[x_bucket], min(ax.get_xlim()))
+            max_xs[x_bucket] = max(max_xs[x_bucket], max(ax.get_xlim()))
 
             y_bucket = int((pos-1) / ydim)
             min_ys[y_bucket] = min_ys.get(y_bucket, 999999999)
             max_ys[y_bucket] = max_ys.get(y_bucket, -999999999)
 
-            min_ys[y_bucket] = min(min_ys[y_bucket], min(plt.ylim()))
-            max_ys[y_bucket] = max(max_ys[y_bucket], max(plt.ylim()))
+            min_ys[y_bucket] = min(min_ys[y_bucket], min(ax.get_ylim()))
+            max_ys[y_bucket] = max(max_ys[y_bucket], max(ax.get_ylim()))
         
         for pos, _ in enumerate(facet_pairs):
             pos += 1
-            plt.subplot(xdim, ydim, pos)
+            ax = get_subplot(fig, xdim, ydim, pos)
             
             x_bucket = int((pos-1) / xdim)
 
@@ -268,8 +278,9 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
             x_labs = x_scale
             if pos <= ((len(facet_pairs) - ydim)):
                 x_labs = []
-            plt.xticks(x_scale, x_labs)
-            plt.xlim(x_min, x_max)
+            ax.set_xticks(x_scale)
+            ax.set_xticklabels(x_labs)
+            ax.set_xlim(x_min, x_max)
 
             y_bucket = int((pos-1) / ydim)
             y_scale, y_min, y_max = calc_axis_breaks_and_limits(min_ys[y_bucket], max_ys[y_bucket],4)
@@ -277,5 +288,6 @@ def scale_facet_grid(xdim, ydim, facet_pairs, scaletype):
             y_labs = y_scale
             if pos % ydim!=1:
                 y_labs = []
-            plt.yticks(y_scale, y_labs)
-            plt.ylim(y_min, y_max)
+            ax.set_yticks(y_scale)
+            ax.set_yticklabels(y_labs)
+            ax.set_ylim(y_min, y_max)
@@ -1,7 +1,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from .scale import scale
-from copy import deepcopy
+from copy import copy
 
 class scale_x_continuous(scale):
     """
@@ -24,7 +24,7 @@ class scale_x_continuous(scale):
     """
     VALID_SCALES = ['name', 'limits', 'labels', 'breaks', 'trans']
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         if self.name:
             gg.xlab = self.name
         if self.limits:
@@ -2,7 +2,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from ..utils import date_breaks, date_format
 from .scale import scale
-from copy import deepcopy
+from copy import copy
 import six
 
 
@@ -32,7 +32,7 @@ class scale_x_date(scale):
     """
     VALID_SCALES = ['name', 'labels', 'limits', 'breaks', 'trans']
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         if self.name:
             gg.xlab = self.name.title()
         if self.labels:
@@ -1,5 +1,5 @@
 from .scale import scale
-from copy import deepcopy
+from copy import copy
 
 class scale_x_discrete(scale):
     """
@@ -22,7 +22,7 @@ class scale_x_discrete(scale):
     """
     VALID_SCALES = ['name', 'limits', 'labels', 'breaks', 'trans']
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         if self.name:
             gg.xlab = self.name
         if self.limits:
@@ -1,7 +1,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from .scale import scale
-from copy import deepcopy
+from copy import copy
 from matplotlib.pyplot import FuncFormatter
 
 dollar   = lambda x,pos: '$%1.2f' % x
@@ -19,7 +19,7 @@ LABEL_FORMATS = {
 class scale_y_continuous(scale):
     VALID_SCALES = ['name', 'labels', 'limits', 'breaks', 'trans']
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
         if self.name:
             gg.ylab = self.name.title()
         if self.labels and self.labels in LABEL_FORMATS:
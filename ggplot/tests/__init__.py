@@ -18,6 +18,7 @@ default_test_modules = [
     'ggplot.tests.test_basic',
     'ggplot.tests.test_readme_examples',
     'ggplot.tests.test_ggplot_internals',
+    'ggplot.tests.test_chunked_data',
     'ggplot.tests.test_geom',
     'ggplot.tests.test_geom_rect',
     'ggplot.tests.test_faceting',
@@ -120,13 +120,11 @@ def test_stats_smooth():
 
 @cleanup
 def test_stats_bin2d():
-    import matplotlib.pyplot as plt
-    if not hasattr(plt, "hist2d"):
-        import nose
-        raise nose.SkipTest("stat_bin2d only works with newer matplotlib (1.3) versions.")
     df = _build_testing_df()
     gg = ggplot(aes(x='x', y='y', shape='cat', color='cat2'), data=df)
     assert_same_ggplot(gg + stat_bin2d(), "stat_bin2d")
+    assert_same_ggplot(gg + stat_bin2d(hex=True), "stat_bin2d_hex")
+    assert_same_ggplot(gg + stat_bin2d(aes(z='z'), fun="mean"), "stat_bin2d_mean")
 
 @cleanup
 def test_alpha_density():
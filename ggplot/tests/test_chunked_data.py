@@ -0,0 +1,76 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from nose.tools import assert_equal, assert_true, assert_raises
+from ggplot.tests import cleanup
+import numpy as np
+import pandas as pd
+
+from ggplot import *
+from ggplot.components.stream import bin_reducer
+
+
+def _chunks(df, n=7):
+    return (df.iloc[i::n] for i in range(n))
+
+
+def test_chunked_bar_counts():
+    gg = ggplot(aes(x="factor(cyl)"), _chunks(mtcars)) + geom_bar()
+    layer = gg.build().panels[0][1][0][1]
+    counts = mtcars.cyl.value_counts()
+    for label, weight in zip(layer["labels"], layer["counts"]):
+        assert_equal(counts[int(label)], weight)
+
+
+@cleanup
+def test_chunked_histogram():
+    gg = ggplot(aes(x="price"), _chunks(diamonds, 20)) + geom_histogram()
+    reduced = gg._reduce_chunks()
+    data = reduced.geoms[0].data
+    assert_true(len(data) <= 1024)
+    assert_equal(len(diamonds), data["..count.."].sum())
+    # the bin centers are at most half a bin width off
+    width = np.diff(np.sort(data["price"])).min()
+    assert_true(abs(data["price"].min() - diamonds.price.min()) <= width / 2)
+    layer = gg.build().panels[0][1][0][1]
+    assert_equal(len(diamonds), layer["counts"].sum())
+    gg.draw()
+
+
+def test_bin_reducer_merges_bins():
+    reducer = bin_reducer({"x": "x"}, ["x"], n_bins=8)
+    for start in range(0, 64, 16):
+        reducer.update(pd.DataFrame({"x": np.arange(start, start + 16.)}))
+    result = reducer.result()
+    assert_true(len(result) <= 8)
+    assert_equal(64, result["..count.."].sum())
+
+
+def test_chunked_sample():
+    data = chunked_data(_chunks(diamonds, 20), sample_size=1000)
+    gg = ggplot(aes(x="carat", y="price"), data) + geom_point()
+    assert_equal(1000, len(gg.data))
+    assert_true(set(gg.data.price) <= set(diamonds.price))
+    # the chunks are read once, later copies share the result
+    gg2 = gg + geom_point(color="red")
+    assert_equal(1000, len(gg2.data))
+    assert_raises(Exception, lambda: (gg + geom_histogram()).build())
+    assert_raises(Exception, lambda: gg + facet_wrap("cut"))
+
+
+def test_chunked_moving_average():
+    # 5 rows per x, so a window of 50 rows is 10 bins
+    rs = np.random.RandomState(0)
+    df = pd.DataFrame({"x": np.repeat(np.arange(100.), 5),
+                       "y": rs.standard_normal(500)})
+    smooth = stat_smooth(method="ma", window=50)
+    layer = (ggplot(aes(x="x", y="y"), _chunks(df)) +
+             smooth).build().panels[0][1][0][1]
+    assert_equal(100, len(layer["x"]))
+    expected = pd.rolling_mean(df["y"], 50).values[4::5]
+    assert_true(np.isnan(layer["y"][:9]).all())
+    assert_true(np.allclose(expected[9:], layer["y"][9:]))
+    # the default window is a tenth of the rows as well
+    layer = (ggplot(aes(x="x", y="y"), _chunks(df)) +
+             stat_smooth(method="ma")).build().panels[0][1][0][1]
+    assert_true(np.allclose(expected[9:], layer["y"][9:]))
@@ -1,8 +1,11 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-from nose.tools import assert_equal, assert_is, assert_is_not
-from ggplot.tests import image_comparison
+import numpy as np
+import six
+import pandas as pd
+from nose.tools import assert_equal, assert_is, assert_is_not, assert_true
+from ggplot.tests import image_comparison, cleanup
 
 from ggplot import *
 from ggplot.geoms.geom import geom
@@ -41,3 +44,318 @@ def test_geom_with_data():
     _text = geom_text(aes(label="name"), data=mtcars[mtcars.cyl == 6])
     g2 = gg + _text
     assert_is_not(g2.data, _text.data, "Adding a dataset to a geom replaced the data in ggplot")
+
+def test_geom_data_is_shared():
+    from copy import deepcopy
+    _text = geom_text(aes(label="name"), data=mtcars[mtcars.cyl == 6])
+    gg = ggplot(mtcars, aes("wt", "mpg")) + _text
+    gg = gg + geom_point() + xlab("wt") + ylab("mpg") + ggtitle("mtcars")
+    assert_is(_text.data, gg.geoms[0].data)
+    g2 = deepcopy(gg)
+    assert_is_not(gg.geoms[0], g2.geoms[0])
+    assert_is(gg.geoms[0].data, g2.geoms[0].data)
+    assert_equal(gg.geoms[0].aes, g2.geoms[0].aes)
+    assert_is_not(gg.geoms[0].aes, g2.geoms[0].aes)
+
+@cleanup
+def test_geom_point_raster():
+    gg = ggplot(diamonds, aes("carat", "price", color="cut"))
+    fig = (gg + geom_point(raster=True)).draw()
+    ax = fig.axes[0]
+    # one image for all color levels instead of the markers
+    assert_equal(1, len(ax.images))
+    assert_equal(0, len(ax.collections))
+    fig = (gg + geom_point(raster=False)).draw()
+    assert_equal(0, len(fig.axes[0].images))
+    # automatically for large layers
+    threshold = geom_point.RASTER_THRESHOLD
+    geom_point.RASTER_THRESHOLD = 1000
+    try:
+        fig = (ggplot(diamonds, aes("carat", "price")) + geom_point()).draw()
+    finally:
+        geom_point.RASTER_THRESHOLD = threshold
+    ax = fig.axes[0]
+    # one image pixel per screen pixel
+    height, width = ax.images[0].get_array().shape[:2]
+    assert_true(abs(width - ax.bbox.width) < 1)
+    assert_true(abs(height - ax.bbox.height) < 1)
+    # saving with a higher dpi gives a finer raster
+    widths = []
+    for dpi in [50, 200]:
+        fig.savefig(six.BytesIO(), dpi=dpi)
+        widths.append(ax.images[0].get_array().shape[1])
+    assert_true(abs(widths[1] - 4 * widths[0]) <= 4)
+    assert_true(abs(widths[1] - ax.bbox.width * 200 / fig.dpi) < 1)
+    # the opacity follows the number of points in a pixel
+    alpha = ax.images[0].get_array()[:, :, 3]
+    assert_true(0 < alpha[alpha > 0].min() < alpha.max())
+    # every raster adds to the data limits, like scatter
+    df = pd.DataFrame({"x": [0, 1, 5, 6], "y": [0, 1, 0, 1],
+                       "g": ["a", "a", "b", "b"]})
+    fig = (ggplot(df, aes("x", "y", shape="g")) + geom_point(raster=True)).draw()
+    ax = fig.axes[0]
+    assert_equal(2, len(ax.images))
+    x0, x1 = ax.get_xlim()
+    assert_true(x0 <= 0 and x1 >= 6)
+
+@cleanup
+def test_geom_point_one_collection_per_shape():
+    gg = ggplot(diamonds, aes("carat", "price", color="clarity"))
+    fig = (gg + geom_point(raster=False)).draw()
+    ax = fig.axes[0]
+    assert_equal(1, len(ax.collections))
+    assert_equal(len(diamonds), len(ax.collections[0].get_facecolors()))
+    gg = ggplot(diamonds, aes("carat", "price", color="clarity", shape="cut"))
+    fig = (gg + geom_point(raster=False)).draw()
+    assert_equal(diamonds.cut.nunique(), len(fig.axes[0].collections))
+
+@cleanup
+def test_geom_line_groups():
+    from matplotlib.collections import LineCollection
+    df = pd.DataFrame({"x": np.tile(np.arange(10), 30),
+                       "y": np.arange(300),
+                       "series": np.repeat(np.arange(30), 10)[::-1]})
+    for g in [geom_line(), geom_step()]:
+        fig = (ggplot(df, aes("x", "y", group="series")) + g).draw()
+        ax = fig.axes[0]
+        assert_equal(0, len(ax.lines))
+        assert_equal(1, len(ax.collections))
+        lines = ax.collections[0]
+        assert_true(isinstance(lines, LineCollection))
+        assert_equal(30, len(lines.get_segments()))
+    # one line per color level, in the same collection
+    df["kind"] = np.where(df.series % 3, "a", "b")
+    fig = (ggplot(df, aes("x", "y", color="kind")) + geom_line()).draw()
+    lines = fig.axes[0].collections[0]
+    assert_equal(2, len(lines.get_segments()))
+
+def test_geom_step_vertices():
+    from ggplot.geoms.geom_step import _steps, _grouped_steps
+    x = np.arange(5)
+    y = np.array([10, 11, 12, 13, 14])
+    xs, ys = _steps(x, y)
+    assert_equal([0, 1, 1, 2, 2, 3, 3, 4], list(xs))
+    assert_equal([10, 10, 11, 11, 12, 12, 13, 13], list(ys))
+    xs, ys, offsets = _grouped_steps(x, y, np.array([0, 3, 5]))
+    assert_equal([0, 1, 1, 2, 3, 4], list(xs))
+    assert_equal([10, 10, 11, 11, 13, 13], list(ys))
+    assert_equal([0, 4, 6], list(offsets))
+
+@cleanup
+def test_geom_text_check_overlap():
+    df = pd.DataFrame({"x": np.r_[np.zeros(100), 10], "y": np.r_[np.zeros(100), 10],
+                       "name": ["label%d" % i for i in range(101)],
+                       "rank": np.arange(101) % 50})
+    gg = ggplot(df, aes("x", "y", label="name"))
+    fig = (gg + geom_text()).draw()
+    assert_equal(101, len(fig.axes[0].texts))
+    # the labels are checked when they are drawn
+    fig = (gg + geom_text(check_overlap=True)).draw()
+    fig.canvas.draw()
+    texts = [t.get_text() for t in fig.axes[0].artists[0].get_texts()]
+    assert_equal(["label0", "label100"], texts)
+    fig = (gg + geom_text(aes(priority="rank"), check_overlap=True)).draw()
+    fig.canvas.draw()
+    texts = [t.get_text() for t in fig.axes[0].artists[0].get_texts()]
+    assert_equal(["label49", "label100"], texts)
+    # a row of long labels: rotated, they don't overlap
+    df = pd.DataFrame({"x": np.arange(20.), "y": np.zeros(20),
+                       "name": ["a long label %d" % i for i in range(20)]})
+    gg = ggplot(df, aes("x", "y", label="name"))
+    fig = (gg + geom_text(check_overlap=True)).draw()
+    fig.set_size_inches(8, 6)
+    fig.canvas.draw()
+    labels = fig.axes[0].artists[0]
+    assert_true(2 < len(labels.get_texts()) < 20)
+    fig = (gg + geom_text(angle=90, check_overlap=True)).draw()
+    fig.set_size_inches(8, 6)
+    fig.canvas.draw()
+    assert_equal(20, len(fig.axes[0].artists[0].get_texts()))
+    # nor in a wide figure
+    fig = (gg + geom_text(check_overlap=True)).draw()
+    fig.set_size_inches(40, 6)
+    fig.savefig(six.BytesIO(), format="png", dpi=50)
+    assert_equal(20, len(fig.axes[0].artists[0].get_texts()))
+
+def test_geom_bar_counts():
+    df = pd.DataFrame({"x": ["b", "a", "c", "a", "b", "a"],
+                       "w": [1., 2., 3., 4., 5., 6.]})
+    layer = (ggplot(df, aes("x")) + geom_bar()).build().panels[0][1][0][1]
+    assert_equal(["a", "b", "c"], list(layer["labels"]))
+    assert_equal([3, 2, 1], list(layer["counts"]))
+    gg = ggplot(df, aes("x", weight="w")) + geom_bar()
+    layer = gg.build().panels[0][1][0][1]
+    assert_equal([12., 6., 3.], list(layer["counts"]))
+    # weighted dates are summed per bucket, empty buckets are zero
+    df = pd.DataFrame({"t": pd.to_datetime(["2014-01-01", "2014-01-02",
+                                            "2014-01-04 12:00"]),
+                       "w": [1., 2., 3.]})
+    gg = ggplot(df, aes("t", weight="w")) + geom_bar(bucket="1D")
+    layer = gg.build().panels[0][1][0][1]
+    assert_equal([1., 2., 0., 3.], list(layer["counts"]))
+    assert_equal(pd.Timestamp("2014-01-04"), layer["labels"][-1])
+    layer = (ggplot(df, aes("t", weight="w")) + geom_bar()).build().panels[0][1][0][1]
+    # 2014-01-01 is a wednesday: all in the week of monday 2013-12-30
+    assert_equal([6.], list(layer["counts"]))
+    assert_equal(pd.Timestamp("2013-12-30"), layer["labels"][0])
+
+def test_geom_histogram_shared_bins():
+    gg = ggplot(diamonds, aes("price")) + geom_histogram(bins=20)
+    panels = (gg + facet_wrap("cut")).build().panels
+    edges = panels[0][1][0][1]["edges"]
+    assert_equal(21, len(edges))
+    assert_equal(diamonds.price.min(), edges[0])
+    assert_equal(diamonds.price.max(), edges[-1])
+    total = 0
+    for facet, items in panels:
+        layer = items[0][1]
+        assert_is(edges, layer["edges"])
+        assert_equal((diamonds.cut == facet).sum(), layer["counts"].sum())
+        total += layer["counts"].sum()
+    assert_equal(len(diamonds), total)
+    gg = ggplot(diamonds, aes("price")) + geom_histogram(binwidth=1000)
+    layer = gg.build().panels[0][1][0][1]
+    assert_equal(1000, np.diff(layer["edges"])[0])
+
+def test_geom_density_fft():
+    from ggplot.components import density
+    x = np.random.RandomState(0).standard_normal(10000)
+    grid = np.linspace(x.min(), x.max(), 1000)
+    bw = density.bandwidth(x)
+    exact = density.kde_exact(x, grid, bw)
+    fft = density.kde_fft(x, grid, bw)
+    assert_true(np.abs(exact - fft).max() < 5e-3 * exact.max())
+    weights = np.where(x > 0, 2., 1.)
+    exact = density.kde_exact(x, grid, bw, weights)
+    fft = density.kde_fft(x, grid, bw, weights)
+    assert_true(np.abs(exact - fft).max() < 5e-3 * exact.max())
+    gg = ggplot(pd.DataFrame({"x": x}), aes("x"))
+    layer = (gg + geom_density(fft=True)).build().panels[0][1][0][1]
+    assert_equal(1000, len(layer["x"]))
+    assert_true(np.abs(layer["y"] - density.kde_fft(x, grid, bw)).max() < 1e-12)
+    # a bandwidth far below the grid spacing still gives a density
+    delta = grid[1] - grid[0]
+    for small in [delta / 2, delta / 10, delta / 1000]:
+        fft = density.kde_fft(x, grid, small)
+        assert_true(np.isfinite(fft).all() and (fft >= 0).all())
+        assert_true(abs(np.trapz(fft, grid) - 1) < 1e-3, small)
+
+@cleanup
+def test_stat_bin2d():
+    gg = ggplot(diamonds, aes("carat", "price"))
+    plan = (gg + stat_bin2d(bins=(20, 10)) + facet_wrap("cut")).build()
+    first = plan.panels[0][1][0][1]
+    assert_equal((10, 20), first["values"].shape)
+    total = 0
+    for facet, items in plan.panels:
+        layer = items[0][1]
+        assert_is(first["xedges"], layer["xedges"])
+        assert_equal(first["vmax"], layer["vmax"])
+        total += np.nansum(layer["values"])
+    assert_equal(len(diamonds), total)
+    layer = (gg + stat_bin2d(aes(z="depth"), fun="mean")).build().panels[0][1][0][1]
+    assert_true(np.nanmax(layer["values"]) <= diamonds.depth.max())
+    fig = (gg + stat_bin2d(hex=True)).draw()
+    ax = fig.axes[0]
+    assert_equal(1, len(ax.collections))
+    assert_equal(len(diamonds), ax.collections[0].get_array().sum())
+    fig = (gg + stat_bin2d()).draw()
+    assert_equal(1, len(fig.axes[0].images))
+    # the layers of a color are binned into one grid
+    gg = ggplot(diamonds, aes("carat", "price", color="cut"))
+    fig = (gg + stat_bin2d()).draw()
+    assert_equal(1, len(fig.axes[0].images))
+    assert_equal(len(diamonds), np.nansum(fig.axes[0].images[0].get_array()))
+
+@cleanup
+def test_geom_tile_grid():
+    df = pd.DataFrame({"x": ["b", "a", "b", "c"], "y": [2, 1, 1, 2],
+                       "v": [1., 2., 3., 4.]})
+    gg = ggplot(df, aes(x="x", y="y", fill="v")) + geom_tile()
+    layer = gg.build().panels[0][1][0][1]
+    assert_equal(["a", "b", "c"], list(layer["x_levels"]))
+    assert_equal([1, 2], list(layer["y_levels"]))
+    grid = layer["grid"]
+    assert_equal([2., 3.], [grid[0, 0], grid[0, 1]])
+    assert_equal([1., 4.], [grid[1, 1], grid[1, 2]])
+    assert_true(np.isnan(grid[0, 2]) and np.isnan(grid[1, 0]))
+    ax = gg.draw().axes[0]
+    assert_equal(1, len(ax.images))
+    assert_equal(["a", "b", "c"], [t.get_text() for t in ax.get_xticklabels()])
+
+@cleanup
+def test_reference_lines():
+    gg = ggplot(mtcars, aes("wt", "mpg")) + geom_point()
+    limits = np.arange(0, 40, 0.1)
+    fig = (gg + geom_hline(y=limits) + geom_vline(x=[2, 3, 4]) +
+           geom_abline(slope=[1, -1], intercept=[10, 40])).draw()
+    ax = fig.axes[0]
+    assert_equal(0, len(ax.lines))
+    hlines, vlines, ablines = ax.collections[1:]
+    assert_equal(len(limits), len(hlines.get_segments()))
+    assert_equal(3, len(vlines.get_segments()))
+    # the ablines span the x axis
+    fig.canvas.draw()
+    xmin, xmax = ax.get_xlim()
+    start, stop = ablines.get_segments()[1]
+    assert_equal([xmin, xmax], [start[0], stop[0]])
+    assert_equal([40 - xmin, 40 - xmax], [start[1], stop[1]])
+    # the hlines are part of the y range
+    assert_true(ax.get_ylim()[1] >= limits.max())
+    # the end points don't depend on the order of the layers and follow
+    # the final limits
+    gg = ggplot(mtcars, aes("wt", "mpg")) + geom_abline(slope=2, intercept=1)
+    fig = (gg + geom_point() + xlim(-5, 20)).draw()
+    fig.canvas.draw()
+    start, stop = fig.axes[0].collections[0].get_segments()[0]
+    assert_equal([-5, 20], [start[0], stop[0]])
+    assert_equal([-9, 41], [start[1], stop[1]])
+    fig.axes[0].set_xlim(0, 10)
+    fig.canvas.draw()
+    start, stop = fig.axes[0].collections[0].get_segments()[0]
+    assert_equal([0, 10], [start[0], stop[0]])
+
+@cleanup
+def test_line_decimation():
+    from ggplot.components.decimate import lttb_indices, minmax_indices
+    n = 200000
+    x = np.arange(n, dtype=float)
+    y = np.sin(x / 1000.) + np.random.RandomState(0).standard_normal(n)
+    rows = minmax_indices(x, [y], 100, np.array([0, n]))
+    assert_true(len(rows) <= 400)
+    # the envelope is kept
+    assert_equal(y.max(), y[rows].max())
+    assert_equal(y.min(), y[rows].min())
+    rows = lttb_indices(x, y, 500)
+    assert_equal(500, len(rows))
+    assert_equal([0, n - 1], [rows[0], rows[-1]])
+    assert_true((np.diff(rows) > 0).all())
+
+    df = pd.DataFrame({"x": x, "y": y})
+    ax = (ggplot(df, aes("x", "y")) + geom_line()).draw().axes[0]
+    vertices = ax.collections[0].get_segments()[0]
+    assert_true(len(vertices) <= 4 * ax.bbox.width + 4)
+    assert_equal(y.max(), vertices[:, 1].max())
+    ax = (ggplot(df, aes("x", "y")) + geom_line(decimate=False)).draw().axes[0]
+    assert_equal(n, len(ax.lines[0].get_xdata()))
+    ax = (ggplot(df, aes("x", "y")) + geom_line(decimate="lttb")).draw().axes[0]
+    assert_true(len(ax.collections[0].get_segments()[0]) <= 2 * ax.bbox.width + 1)
+    # the decimation is repeated for the size and dpi of the saved figure
+    for geom in [geom_line(), geom_step(), geom_area()]:
+        gg = ggplot(df, aes("x", "y", ymin="y - 1", ymax="y + 1")) + geom
+        fig = gg.draw()
+        ax = fig.axes[0]
+        lines = ax.collections[0]
+        fig.set_size_inches(2, 2)
+        fig.savefig(six.BytesIO(), format="png", dpi=50)
+        small = sum(len(path.vertices) for path in lines.get_paths())
+        # up to 4 rows per pixel column, steps and areas have two vertices
+        # per row
+        assert_true(small <= 2 * (4 * 2 * 50 + 4), "%s: %d" % (geom, small))
+        fig.set_size_inches(20, 10)
+        fig.savefig(six.BytesIO(), format="png", dpi=100)
+        large = sum(len(path.vertices) for path in lines.get_paths())
+        assert_true(large > 4 * small, "%s: %d" % (geom, large))
+        assert_equal(y.max(), max(path.vertices[:, 1].max()
+                                  for path in lines.get_paths()) -
+                     (1 if isinstance(geom, geom_area) else 0))
@@ -1,13 +1,15 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-from nose.tools import assert_raises
+from nose.tools import assert_equal, assert_raises, assert_true
 
 from . import get_assert_same_ggplot, cleanup
 assert_same_ggplot = get_assert_same_ggplot(__file__)
 
 from ggplot import *
 from ggplot.exampledata import diamonds
+import numpy as np
+import pandas as pd
 
 
 @cleanup
@@ -37,3 +39,20 @@ def test_geom_rect():
 def test_geom_rect_missing_req_aes():
     with assert_raises(Exception):
         print(ggplot(diamonds, aes(x=x, y=y)) + geom_point() + geom_rect())
+
+
+@cleanup
+def test_geom_rect_one_collection():
+    n = 1000
+    df = pd.DataFrame({'start': np.arange(n), 'end': np.arange(n) + 2,
+                       'job': np.arange(n) % 7,
+                       'state': np.where(np.arange(n) % 3, 'ok', 'failed')})
+    p = ggplot(df, aes(xmin='start', xmax='end', ymin='job', ymax='job + 0.8',
+                       colour='state'))
+    fig = (p + geom_rect()).draw()
+    ax = fig.axes[0]
+    assert_equal(0, len(ax.patches))
+    assert_equal(1, len(ax.collections))
+    assert_equal(n, len(ax.collections[0].get_paths()))
+    xmin, xmax = ax.get_xlim()
+    assert_true(xmin <= 0 and xmax >= n + 1)
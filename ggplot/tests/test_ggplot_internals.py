@@ -10,15 +10,76 @@ from nose.tools import (assert_true, assert_raises, assert_is, assert_is_not, as
 from ggplot import *
 
 import six
+import numpy as np
 import pandas as pd
 
 
 def test_data_transforms():
     import numpy as np
     p = ggplot(aes(x="np.log(price)"), data=diamonds)
+    p.data
+    # transformations are only evaluated once the data is needed
+    p = ggplot(aes(x="ap.log(price)"), data=diamonds)
     with assert_raises(Exception):
         #no numpy available
-        p = ggplot(aes(x="ap.log(price)"), data=diamonds)
+        p.data
+
+
+def test_factor_transform():
+    p = ggplot(aes(x="wt", y="mpg", color="factor(cyl)"), data=mtcars)
+    assert_same_elements(p.data["factor(cyl)"], mtcars.cyl.apply(str))
+    # the evaluated expression is reused when the data is recomputed
+    cached = p._data_cache["transforms"]["factor(cyl)"][-1]
+    p2 = p + facet_wrap("gear")
+    assert_true("gear" in p2.data.columns)
+    assert_is(p2._data_cache["transforms"]["factor(cyl)"][-1], cached)
+
+
+def test_data_changed_in_place():
+    df = pd.DataFrame({"x": [1., 2., 3.], "y": [1., 10., 100.]})
+    p = ggplot(aes(x="x", y="np.log10(y)"), data=df) + geom_point()
+    assert_same_elements(p.data["np.log10(y)"], [0, 1, 2])
+    df["y"] *= 10
+    assert_same_elements(p.data["np.log10(y)"], [1, 2, 3])
+    assert_same_elements(p.data["y"], [10, 100, 1000])
+    geom, layer = p.build().panels[0][1][0]
+    assert_same_elements(layer["y"], [1, 2, 3])
+    # unchanged data reuses the evaluated expression
+    cached = p._data_cache["transforms"]["np.log10(y)"][-1]
+    df["x"] += 1
+    assert_same_elements(p.data["x"], [2, 3, 4])
+    assert_is(p._data_cache["transforms"]["np.log10(y)"][-1], cached)
+
+
+def test_data_only_includes_used_columns():
+    import numpy as np
+    p = ggplot(aes(x="np.log(price)", y="carat"), data=diamonds)
+    assert_equal(set(p.data.columns), set(["price", "carat", "np.log(price)"]))
+    # geoms without their own data use the plot data
+    p2 = p + geom_text(aes(label="cut"))
+    assert_true("cut" in p2.data.columns)
+    assert_true("cut" not in p.data.columns)
+    p3 = p + facet_wrap("color")
+    assert_true("color" in p3.data.columns)
+    # the transformed data is cached and shared with copies
+    assert_is(p.data, p.data)
+    assert_is(p.data, (p + xlab("log price")).data)
+
+
+def test_set_data():
+    p = ggplot(aes(x="carat", y="price"), data=diamonds)
+    p2 = p + geom_point()
+    assert_equal(len(diamonds), len(p2.data))
+    p2.data = diamonds.head(10)
+    assert_equal(10, len(p2.data))
+    # the copy gets its own data, the original keeps its own
+    assert_equal(len(diamonds), len(p.data))
+    with assert_raises(Exception):
+        ggplot(aes(x="carat"), data=None)
+    with assert_raises(Exception):
+        ggplot(aes(x="carat"), data=5)
+    with assert_raises(Exception):
+        p2.data = None
 
 
 def test_no_data_leak():
@@ -54,6 +115,141 @@ def test_deepcopy():
     assert_is_not(p.aesthetics, p2.aesthetics)
     assert_is(p.aesthetics.__eval_env__, p2.aesthetics.__eval_env__)
 
+def test_copy_on_write():
+    p = ggplot(aes(x="price"), data=diamonds) + geom_histogram()
+    p2 = p + xlab("price in $")
+    assert_is_not(p, p2)
+    assert_is(p.data, p2.data)
+    assert_is(p.geoms, p2.geoms)
+    assert_is(p.aesthetics, p2.aesthetics)
+    assert_is(p.xlab, None)
+    p3 = p + geom_density()
+    assert_equal(len(p.geoms), 1)
+    assert_equal(len(p3.geoms), 2)
+    assert_is(p.geoms[0], p3.geoms[0])
+    p4 = p + theme_bw()
+    assert_equal(p.rcParams, {})
+    assert_equal(p.post_plot_callbacks, [])
+    assert_true(len(p4.rcParams) > 0)
+    p.add_to_legend("color", {"#333333": "a"})
+    p2.add_to_legend("size", {1: "b"})
+    assert_true("size" not in p.legend)
+    assert_true("color" not in p2.legend)
+
+
+def test_visual_mapping_is_cached():
+    df = pd.DataFrame({"x": [1, 2], "y": [1, 2], "a": ["a", "b"]})
+    gg = ggplot(aes(x="x", y="y", color="a"), data=df) + geom_point()
+    cols_before = gg.data.columns.copy()
+    visual = gg._get_visual_mapping()
+    assert_true("color" in gg.legend)
+    assert_same_elements(cols_before, gg.data.columns)
+    gg2 = gg + xlab("x")
+    assert_is(visual, gg2._get_visual_mapping())
+    assert_equal(gg.legend, gg2.legend)
+    # another color scale needs another mapping
+    gg3 = gg + scale_colour_manual(values=["red", "blue"])
+    assert_is_not(visual, gg3._get_visual_mapping())
+    assert_same_elements(gg3._get_visual_mapping()["color"], ["red", "blue"])
+
+
+def test_panels_and_layers():
+    from ggplot.components import assign_visual_mapping
+    df = pd.DataFrame({"x": [1, 2, 3, 4, 5, 6], "y": [1, 2, 3, 4, np.nan, 6],
+                       "a": ["a", "b", "a", "b", "a", "b"],
+                       "f": ["f2", "f1", "f2", "f2", "f1", "f1"]})
+    gg = ggplot(aes(x="x", y="y", color="a"), data=df) + facet_wrap("f")
+    visual = assign_visual_mapping(gg.data, gg.aesthetics, gg)
+    panels = gg._get_panels(gg.data, facets=gg.facets, visual=visual)
+    # sorted like a groupby, NA values are dropped
+    assert_equal([facet for facet, layers in panels], ["f1", "f2"])
+    assert_equal(len(panels[0][1]), 1)
+    assert_same_elements(panels[0][1][0]["x"], [2, 6])
+    f2_layers = sorted(list(layer["x"]) for layer in panels[1][1])
+    assert_equal(f2_layers, [[1, 3], [4]])
+    # without facets, all rows are in one panel
+    layers = sorted(list(layer["x"]) for layer in gg._get_layers(gg.data))
+    assert_equal(layers, [[1, 3], [2, 4, 6]])
+
+
+@cleanup
+def test_build_plot_plan():
+    import pickle
+    gg = ggplot(aes(x="wt", y="mpg", color="factor(cyl)"), data=mtcars)
+    gg = gg + geom_point() + stat_smooth(method="lm")
+    plan = gg.build()
+    # one panel; geom_point merges the cyl layers into one, stat_smooth
+    # keeps one layer per cyl
+    assert_equal(len(plan.panels), 1)
+    facet, items = plan.panels[0]
+    assert_equal(len(items), 4)
+    assert_equal(len([1 for geom, layer in items
+                      if isinstance(geom, geom_point)]), 1)
+    assert_equal(sorted(plan.legend), ["color"])
+    assert_equal(plan.legend_names["color"], "factor(cyl)")
+    # the stats are computed in the plan
+    smooth_layers = [layer for geom, layer in items if isinstance(geom, stat_smooth)]
+    assert_true(all("y1" in layer for layer in smooth_layers))
+    # the plan does not need the data and can be drawn more than once
+    plan = pickle.loads(pickle.dumps(plan))
+    assert_equal(len(plan.draw().axes), 1)
+    assert_equal(len(plan.draw().axes), 1)
+
+
+@cleanup
+def test_draw_in_threads():
+    import io
+    import threading
+    import matplotlib.pyplot as plt
+    from ggplot.utils.utils import render_lock
+    plots = [ggplot(aes(x="wt", y="mpg"), data=mtcars) + geom_point(),
+             ggplot(aes(x="wt", y="mpg"), data=mtcars) + geom_line() + theme_bw(),
+             ggplot(aes(x="wt", y="mpg"), data=mtcars) + geom_point() + facet_wrap("cyl")]
+
+    def render(gg):
+        fig = gg.draw(pyplot=False)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=30)
+        return buf.getvalue()
+
+    expected = [render(gg) for gg in plots] * 3
+    results = [None] * len(expected)
+
+    def worker(i):
+        results[i] = render(plots[i % len(plots)])
+    fignums = plt.get_fignums()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(expected))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert_true(results == expected, "plots drawn in threads differ")
+    # the figures are not managed by pyplot
+    assert_equal(plt.get_fignums(), fignums)
+
+    # only creating the artists is serialized: ggsave renders the current
+    # figure while another thread holds the lock
+    plots[2].draw()
+    locked = threading.Event()
+    unlock = threading.Event()
+
+    def hold_lock():
+        with render_lock:
+            locked.set()
+            unlock.wait(30)
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait(30)
+    try:
+        saver = threading.Thread(target=ggsave, args=(io.BytesIO(),),
+                                 kwargs={"format": "png", "width": 2, "height": 2})
+        saver.start()
+        saver.join(20)
+        assert_true(not saver.is_alive(), "rendering waits for the render_lock")
+    finally:
+        unlock.set()
+        holder.join()
+
 
 @cleanup
 def test_axis_changes_applied_to_all_axis():
@@ -89,10 +285,14 @@ def test_different_markers():
     # Do shapes show up in the transformed layer?
     df = pd.DataFrame({"x":[1,2],"y":[1,2], "a":["a","b"], "b":["c","d"]})
     gg = ggplot(aes(x="x", y="y", shape="a", color="b"), data=df)
-    new_df = assign_visual_mapping(df,aes(x="x", y="y", shape="a", color="b"), gg)
-    layer = gg._get_layers(new_df)
+    visual = assign_visual_mapping(df,aes(x="x", y="y", shape="a", color="b"), gg)
+    # the visual mapping is kept out of the data
+    assert_same_elements(sorted(df.columns), ["a", "b", "x", "y"])
+    layer = gg._get_layers(df, visual=visual)
     assert_true("shape" in layer[0], "no shape was assigned")
     assert_true(layer[0]["shape"] != layer[1]["shape"], "wrong marker was assigned")
+    # layers hold the values as arrays
+    assert_true(isinstance(layer[0]["x"], np.ndarray), "layer values are not arrays")
     # And now a visual test that both shapes are there. Make them big so that the test is failing
     # if something is wrong
     gg = ggplot(aes(x="x", y="y", shape="a", color="b"), data=df)
@@ -139,6 +139,95 @@ def test_ggsave_close_plot():
     assert_exist_and_clean(fn, "exist")
     assert_true(plt.get_fignums() == [], "ggsave did not close the plot")
     
+@cleanup
+def test_ggsave_cache():
+    gg = ggplot(aes(x='wt',y='mpg',label='name'),data=mtcars) + geom_text()
+    fn = "filename.png"
+    plot_cache.clear()
+    ggsave(fn, gg, width=2, height=2)
+    assert_exist_and_clean(fn, "first save")
+    assert_equal((plot_cache.hits, plot_cache.misses), (0, 2))
+    # the same plot again is only written
+    ggsave(fn, gg + xlab(None), width=2, height=2)
+    assert_exist_and_clean(fn, "cached save")
+    assert_equal(plot_cache.hits, 1)
+    # but not if the arguments, the plot or the data change
+    ggsave(fn, gg, width=2, height=3)
+    assert_exist_and_clean(fn, "other size")
+    ggsave(fn, gg + xlab("weight"), width=2, height=2)
+    assert_exist_and_clean(fn, "other plot")
+    df = mtcars.copy()
+    df.loc[0, "mpg"] = 100
+    ggsave(fn, ggplot(aes(x='wt',y='mpg',label='name'),data=df) + geom_text(),
+           width=2, height=2)
+    assert_exist_and_clean(fn, "other data")
+    assert_equal(plot_cache.hits, 2)
+    # without an extension, the default format is used and its extension
+    # added, like savefig does (the png is in the cache already)
+    ggsave("filename", gg, width=2, height=2)
+    assert_true(not os.path.exists("filename"))
+    assert_exist_and_clean("filename.png", "no extension")
+    assert_equal(plot_cache.hits, 3)
+    ggsave("filename", gg, width=3, height=3)
+    assert_true(not os.path.exists("filename"))
+    assert_exist_and_clean("filename.png", "no extension, not cached")
+    # only the build was cached
+    assert_equal(plot_cache.hits, 4)
+    # the size limits
+    cache = render_cache(maxsize=2, maxbytes=10)
+    cache.put("a", b"12345", 5)
+    cache.put("b", b"12345", 5)
+    assert_equal(cache.get("a"), b"12345")
+    cache.put("c", b"12", 2)
+    assert_equal(len(cache), 2)
+    assert_true("a" in cache and "b" not in cache)
+    cache.put("d", b"12345678901", 11)
+    assert_true("d" not in cache)
+    assert_equal((cache.hits, cache.misses, cache.nbytes), (1, 0, 7))
+    plot_cache.clear()
+
+
+def test_ggsave_many():
+    fns = ["filename%d.png" % i for i in range(4)]
+    jobs = [(ggplot(aes(x='wt',y='mpg'),data=mtcars[mtcars.cyl == cyl]) + geom_point(), fn)
+            for cyl, fn in zip([4, 6, 8], fns)]
+    # errors are reported per job
+    jobs.append((ggplot(aes(x='wt',y='mpg'),data=mtcars) + geom_point(), fns[3],
+                 {"format": "unknown"}))
+    errors = ggsave_many(iter(jobs), processes=2, max_pending=1)
+    assert_equal(len(errors), 4)
+    assert_equal(errors[:3], [None, None, None])
+    assert_true("Unknown format" in errors[3])
+    for fn in fns[:3]:
+        assert_exist_and_clean(fn)
+    assert_true(not os.path.exists(fns[3]))
+
+
+def _fail_to_load():
+    raise ValueError("can't be loaded")
+
+
+class _unloadable(object):
+    """Can be pickled, but fails when it's loaded"""
+    def __reduce__(self):
+        return _fail_to_load, ()
+
+
+def test_ggsave_many_failed_job():
+    if six.PY2:
+        from nose import SkipTest
+        raise SkipTest("no error_callback in python 2")
+    fns = ["filename%d.png" % i for i in range(3)]
+    gg = ggplot(aes(x='wt',y='mpg'),data=mtcars) + geom_point()
+    jobs = [(gg, fns[0]), (gg, fns[1], {"metadata": _unloadable()}),
+            (gg, fns[2])]
+    # the failed job releases its slot, so the other jobs are still saved
+    with assert_raises(ValueError):
+        ggsave_many(iter(jobs), processes=1, max_pending=1)
+    assert_exist_and_clean(fns[0])
+    assert_exist_and_clean(fns[2])
+    assert_true(not os.path.exists(fns[1]))
+
 
 def test_aes_mixed_args():
     result = aes("weight", "hp", color="qsec")
@@ -1,5 +1,5 @@
 import matplotlib.pyplot as plt
-from copy import deepcopy
+from copy import copy
 
 class theme(object):
     def __init__(self, *args, **kwargs):
@@ -7,6 +7,10 @@ class theme(object):
             setattr(self, k, v)
 
     def __radd__(self, gg):
-        gg = deepcopy(gg)
+        gg = copy(gg)
+        # themes change rcParams and callbacks in place, so they get their
+        # own copy of these two; everything else is shared with the original
+        gg.rcParams = gg.rcParams.copy()
+        gg.post_plot_callbacks = list(gg.post_plot_callbacks)
         gg.theme_applied = True
         return gg
@@ -1,8 +1,10 @@
-from .utils import ggsave
+from .utils import ggsave, ggsave_many
+from .cache import plot_cache, render_cache
 from .date_breaks import date_breaks
 from .date_format import date_format
 
-__ALL__ = ["ggsave", "date_breaks", "date_format", "add_ggplotrc_params"]
+__ALL__ = ["ggsave", "ggsave_many", "date_breaks", "date_format", "add_ggplotrc_params",
+           "plot_cache", "render_cache"]
 
 class _rc_context(object):
     def __init__(self, fname=None):
@@ -0,0 +1,191 @@
+"""An in-memory cache for rendered plots.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+import hashlib
+import threading
+import types
+
+import numpy as np
+import pandas as pd
+import six
+
+try:
+    from pandas.util import hash_array
+except ImportError:
+    # pandas < 0.20
+    hash_array = None
+
+__ALL__ = ["render_cache", "plot_cache", "make_key"]
+
+
+class render_cache(object):
+    """A least recently used cache for rendered plots
+
+    Entries are dropped (least recently used first) when there are more
+    than `maxsize` entries or they need more than `maxbytes` bytes.
+
+    Parameters
+    ----------
+    maxsize : int
+        maximal number of entries, None for no limit
+    maxbytes : int
+        maximal size of all entries in bytes, None for no limit
+
+    Attributes
+    ----------
+    hits : int
+        number of lookups which found an entry
+    misses : int
+        number of lookups which found nothing
+    nbytes : int
+        size of all entries in bytes
+
+    Examples
+    --------
+    >>> from ggplot import plot_cache
+    >>> plot_cache.maxbytes = 256 * 2**20
+    >>> print(plot_cache.hits, plot_cache.misses)
+    """
+
+    def __init__(self, maxsize=32, maxbytes=64 * 2**20):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        # key -> (value, nbytes, refs)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Returns the entry of key (or default) and counts the hit or miss"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return default
+            # move to the end: the most recently used
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=0, refs=()):
+        """Adds an entry to the cache
+
+        Parameters
+        ----------
+        key : hashable
+            the key of the entry, see make_key()
+        value : object
+            the cached value
+        nbytes : int
+            the size of value in bytes
+        refs : list
+            objects which are kept alive as long as the entry exists (the
+            objects which are part of the key by their identity)
+        """
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if self.maxbytes is not None and nbytes > self.maxbytes:
+                # would evict everything else and still not fit
+                return
+            self._entries[key] = (value, nbytes, list(refs))
+            self.nbytes += nbytes
+            self._shrink()
+
+    def clear(self):
+        """Removes all entries and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _shrink(self):
+        while self._entries and (
+                (self.maxsize is not None and len(self._entries) > self.maxsize) or
+                (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+            _, (_, nbytes, _) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+
+
+# the cache which is used by ggplot.__repr__ and ggsave
+plot_cache = render_cache()
+
+
+def make_key(*parts):
+    """Returns a hash of parts and the objects which are hashed by identity
+
+    Strings, numbers, lists, tuples, dicts, numpy arrays and pandas objects
+    are hashed by their content and modules by their name. All other objects
+    (functions, matplotlib objects, ...) are hashed by their identity, so
+    they are returned as `refs`, which have to be kept alive as long as the
+    key is used.
+
+    Returns
+    -------
+    key : str
+        hex digest of the content of parts
+    refs : list
+        the objects which are part of the key by their identity
+    """
+    digest = hashlib.sha1()
+    refs = []
+    _update(digest, parts, refs)
+    return digest.hexdigest(), refs
+
+
+def _update(digest, value, refs):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, float, complex,
+                                           six.integer_types,
+                                           six.string_types, bytes)):
+        digest.update(repr((type(value).__name__, value)).encode("utf-8"))
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"(")
+        for item in value:
+            _update(digest, item, refs)
+        digest.update(b")")
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for k in sorted(value, key=repr):
+            _update(digest, k, refs)
+            _update(digest, value[k], refs)
+        digest.update(b"}")
+    elif isinstance(value, pd.DataFrame):
+        _update(digest, ("DataFrame", list(value.columns)), refs)
+        for col in value.columns:
+            _update(digest, value[col].values, refs)
+    elif isinstance(value, (pd.Series, pd.Index)):
+        _update(digest, np.asarray(value), refs)
+    elif isinstance(value, np.ndarray):
+        _update(digest, ("ndarray", value.dtype.str, value.shape), refs)
+        if value.dtype.kind in "biufcmM":
+            digest.update(np.ascontiguousarray(value).view(np.uint8))
+        elif hash_array is None:
+            _update(digest, value.ravel().tolist(), refs)
+        else:
+            try:
+                hashed = hash_array(value.ravel())
+            except (TypeError, ValueError):
+                # e.g. lists in an object column
+                _update(digest, value.ravel().tolist(), refs)
+            else:
+                digest.update(hashed.view(np.uint8))
+    elif isinstance(value, types.ModuleType):
+        digest.update(("module %s" % value.__name__).encode("utf-8"))
+    else:
+        digest.update(("id %s %d" % (type(value).__name__, id(value))).encode("utf-8"))
+        refs.append(value)
@@ -3,13 +3,64 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
                         
+import matplotlib as mpl
 import matplotlib.pyplot as plt
+import functools
+import io
 import json
+import multiprocessing
 import os
+import pickle
 import sys
+import threading
+import traceback
 
 import six
 
+from .cache import plot_cache, make_key
+
+# matplotlib reads its settings from the global rcParams when the artists
+# are created, so drawing a plot (see plot_plan.draw()) must not run in
+# parallel to another one changing them. Rendering and saving the figure
+# don't need the lock.
+render_lock = threading.RLock()
+
+
+def get_subplot(fig, rows, cols, pos):
+    """Returns a subplot of a figure, like plt.subplot() does for the current
+    figure: an existing subplot at this position of the grid is reused and
+    other subplots which it covers are removed.
+
+    Parameters
+    ----------
+    fig : Figure
+        the figure
+    rows, cols : int
+        the dimensions of the grid
+    pos : int
+        1-based position of the subplot in the grid
+
+    Returns
+    -------
+    ax : Axes
+        the subplot
+    """
+    for ax in fig.axes:
+        get_spec = getattr(ax, "get_subplotspec", None)
+        spec = get_spec() if get_spec else None
+        if spec is None:
+            continue
+        nrows, ncols, start, stop = spec.get_geometry()
+        if (nrows, ncols, start + 1) == (rows, cols, pos) and stop in (None, start):
+            subplot = ax
+            break
+    else:
+        subplot = fig.add_subplot(rows, cols, pos)
+    for ax in fig.axes[:]:
+        if ax is not subplot and subplot.bbox.fully_overlaps(ax.bbox):
+            fig.delaxes(ax)
+    return subplot
+
 # API-docs from ggplot2: GPL-2 licensed
 
 def ggsave(filename = None, plot = None, device = None, format = None,
@@ -69,6 +120,8 @@ def ggsave(filename = None, plot = None, device = None, format = None,
     
     - `format` can be use as a alternative to `device`
     - ggsave will happily save matplotlib plots, if that was the last plot
+    - saved ggplots are kept in the render cache (`plot_cache`), so saving
+      the same plot with the same arguments again only writes the file
     """
     fig_kwargs = {}
     fig_kwargs.update(kwargs)
@@ -77,23 +130,14 @@ def ggsave(filename = None, plot = None, device = None, format = None,
     if hasattr(filename, "draw"):
         plot, filename = filename, plot
     
-    if plot is None:
-        figure = plt.gcf()
-    else:
-        if hasattr(plot, "draw"):
-            figure = plot.draw()
-        else:
-            raise Exception("plot is not a ggplot object")
+    if plot is not None and not hasattr(plot, "draw"):
+        raise Exception("plot is not a ggplot object")
 
     if format and device:
         raise Exception("Both 'format' and 'device' given: only use one")
     # in the end the imageformat is in format
     if device:
         format = device
-    if format:
-        if not format in figure.canvas.get_supported_filetypes():
-            raise Exception("Unknown format: {0}".format(format))
-        fig_kwargs["format"] = format
 
     if filename is None:
         if plot:
@@ -110,6 +154,40 @@ def ggsave(filename = None, plot = None, device = None, format = None,
     
     if path:
         filename = os.path.join(path, filename)
+
+    # A ggplot which was saved the same way before is in the cache
+    cache_key = None
+    if hasattr(plot, "_cache_key"):
+        if format is None and isinstance(filename, six.string_types):
+            # savefig would guess the format from the file name and add the
+            # extension of the default format if there is none
+            format = os.path.splitext(filename)[1][1:].lower()
+            if not format:
+                format = mpl.rcParams["savefig.format"]
+                filename = filename.rstrip(".") + "." + format
+        plot_key, refs = plot._cache_key()
+        cache_key, save_refs = make_key(plot_key, format, scale, width, height,
+                                        units, dpi, limitsize, fig_kwargs,
+                                        dict(mpl.rcParams))
+        refs = refs + save_refs
+        cached = plot_cache.get(cache_key)
+        if cached is not None:
+            content, msg = cached
+            if msg:
+                sys.stderr.write(msg)
+            _write_file(filename, content)
+            return
+        # not a pyplot figure, so ggsave can be used from several threads
+        figure = plot._cached_build().draw(pyplot=False)
+    elif plot is None:
+        figure = plt.gcf()
+    else:
+        figure = plot.draw()
+
+    if format:
+        if not format in figure.canvas.get_supported_filetypes():
+            raise Exception("Unknown format: {0}".format(format))
+        fig_kwargs["format"] = format
         
     if units not in ["in", "cm", "mm"]:
         raise Exception("units not 'in', 'cm', or 'mm'")
@@ -138,6 +216,7 @@ def ggsave(filename = None, plot = None, device = None, format = None,
     width = width * scale
     height = height * scale
     
+    msg = None
     if issue_size:
         msg = "Saving {0} x {1} {2} image.\n".format(from_inch[units](width), from_inch[units](height), units)
         sys.stderr.write(msg)
@@ -153,16 +232,145 @@ def ggsave(filename = None, plot = None, device = None, format = None,
     #    orientation='portrait', papertype=None, format=None,
     #    transparent=False, bbox_inches=None, pad_inches=0.1,
     #    frameon=None)
+    # rendering doesn't need the render_lock: the themes only set rcParams
+    # which are read when the artists are created in plot_plan.draw()
     try:
         figure.set_size_inches(width,height)
-        figure.savefig(filename, **fig_kwargs)
+        if cache_key is None:
+            figure.savefig(filename, **fig_kwargs)
+        else:
+            buf = io.BytesIO()
+            figure.savefig(buf, **fig_kwargs)
+            content = buf.getvalue()
+            plot_cache.put(cache_key, (content, msg), len(content), refs)
+            _write_file(filename, content)
     finally:
         # restore the sizes
         figure.set_size_inches(w,h)
     # close figure, if it was drawn by ggsave
-    if not plot is None:
+    if not plot is None and cache_key is None:
         plt.close(figure)
 
+def _write_file(filename, content):
+    """Writes content to a file name or a file object"""
+    if isinstance(filename, six.string_types):
+        with open(filename, "wb") as f:
+            f.write(content)
+    else:
+        filename.write(content)
+
+def ggsave_many(jobs, processes=None, max_pending=None):
+    """Save many plots in parallel
+
+    The plots are built (aes mapping, stats, ...) in this process, while a
+    pool of worker processes draws and saves the already built ones.
+
+    Parameters
+    ----------
+    jobs : iterable
+        (plot, filename) or (plot, filename, kwargs) tuples, where kwargs
+        is a dict of additional arguments to ggsave. It's consumed lazily,
+        so it can be a generator.
+    processes : int
+        number of worker processes, defaults to the number of CPUs
+    max_pending : int
+        maximal number of built plots which wait for a worker, defaults to
+        twice the number of processes
+
+    Returns
+    -------
+    errors : list
+        one entry per job: None if the plot was saved, otherwise the
+        traceback of the error as a string
+
+    Raises
+    ------
+    Exception
+        the error of a job which failed in the pool without a result, e.g.
+        because the worker could not load it; it's raised once all other
+        jobs are done
+
+    Examples
+    --------
+    >>> from ggplot import *
+    >>> jobs = [(ggplot(aes(x='wt', y='mpg'), data=mtcars[mtcars.cyl == cyl]) +
+    ...          geom_point(), "cyl%d.png" % cyl) for cyl in (4, 6, 8)]
+    >>> errors = ggsave_many(jobs, processes=2)
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if max_pending is None:
+        max_pending = 2 * processes
+    errors = []
+    failures = []
+    pending = threading.BoundedSemaphore(max_pending)
+
+    def _done(result):
+        index, error = result
+        errors[index] = error
+        pending.release()
+
+    def _failed(index, exception):
+        errors[index] = "".join(traceback.format_exception_only(
+            type(exception), exception))
+        failures.append(exception)
+        pending.release()
+
+    pool = multiprocessing.Pool(processes, initializer=_init_worker)
+    try:
+        for index, job in enumerate(jobs):
+            errors.append(None)
+            try:
+                plot, filename = job[:2]
+                kwargs = job[2] if len(job) > 2 else {}
+                if filename is None:
+                    # like ggsave, but the name must be taken from the plot
+                    format = kwargs.get("format") or kwargs.get("device")
+                    filename = str(plot.__hash__()) + "." + (format or "pdf")
+                if hasattr(plot, "build"):
+                    plot = plot.build()
+                # fails here (and not silently in the pool) if it can't be pickled
+                task = pickle.dumps((plot, filename, kwargs), protocol=2)
+            except Exception:
+                errors[index] = traceback.format_exc()
+                continue
+            pending.acquire()
+            callbacks = {"callback": _done}
+            if not six.PY2:
+                # python 2 has no error_callback, a job without a result
+                # would never release its slot
+                callbacks["error_callback"] = functools.partial(_failed, index)
+            pool.apply_async(_save_job, (index, task), **callbacks)
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+    if failures:
+        raise failures[0]
+    return errors
+
+def _init_worker():
+    # the workers only draw to files
+    plt.switch_backend("agg")
+
+def _save_job(index, task):
+    """Runs one job of ggsave_many in a worker process
+
+    The errors of ggsave are returned, a job which can't be loaded fails.
+    """
+    try:
+        plot, filename, kwargs = pickle.loads(task)
+    except Exception:
+        if six.PY2:
+            # there is no error_callback, see ggsave_many()
+            return index, traceback.format_exc()
+        raise
+    try:
+        ggsave(filename, plot, **kwargs)
+    except Exception:
+        return index, traceback.format_exc()
+    return index, None
+
 def add_ggplotrc_params(obj):
     # ggplotrc defaults
     if "HOME" in os.environ: